@@ -1,106 +1,98 @@
 import streamlit as st
-import pandas as pd
-from fpdf import FPDF
-from datetime import datetime
-from io import BytesIO
-import os
-import base64
+from datetime import datetime, timedelta
 from pathlib import Path
 
+from lts_core import deriva, exportacion, recursos
+from lts_core.almacen import obtener_almacen
+from lts_core.cola_informes import enviar_informe, nombre_archivo, obtener_cola
+from lts_core.control_estadistico import MUESTRAS_BASE, serie_parametro
+from lts_core.especificaciones import ESPECIFICACIONES, resultados_modulo
+from lts_core.perfilado import cronometrado, etapa
+from lts_core.recursos import LOGO_PATH
+from panel_hidratos import calculadora_hidratos
+from panel_informes import mostrar_trabajo, panel_sesion, seguir_trabajo
+from panel_perfilado import cerrar_corrida, iniciar_corrida
+
 # --------------------------- CONFIGURACIÓN GENERAL --------------------------- #
 st.set_page_config(page_title="LTS Lab Analyzer", layout="wide")
-LOGO_PATH = "logopetrogas.png"
-
-# --------------------------- FUNCIONES UTILITARIAS --------------------------- #
-def limpiar_pdf_texto(texto):
-    reemplazos = {
-        "₀": "0", "₁": "1", "₂": "2", "₃": "3", "₄": "4",
-        "₅": "5", "₆": "6", "₇": "7", "₈": "8", "₉": "9",
-        "⁰": "0", "¹": "1", "²": "2", "³": "3",
-        "°": " grados ", "º": "", "“": '"', "”": '"',
-        "‘": "'", "’": "'", "–": "-", "—": "-", "•": "-",
-        "→": "->", "←": "<-", "⇒": "=>", "≠": "!=", "≥": ">=", "≤": "<=",
-        "✓": "OK", "✅": "OK", "❌": "NO"
-    }
-    for k, v in reemplazos.items():
-        texto = texto.replace(k, v)
-    return texto
+iniciar_corrida("LTS_LAB_ANALYZER_FINAL")
 
 # --------------------------- ESTILO VISUAL --------------------------- #
-st.markdown("""
-    <style>
-        .stApp { background-color: #1e1e1e; color: white; }
-        .stButton>button, .stDownloadButton>button {
-            background-color: #0d6efd; color: white; border-radius: 8px; border: none;
-        }
-        input, textarea, .stTextInput, .stTextArea, .stNumberInput input {
-            background-color: #2e2e2e !important; color: white !important; border: 1px solid #555 !important;
-        }
-        .stSelectbox div { background-color: #2e2e2e !important; color: white !important; }
-    </style>
-""", unsafe_allow_html=True)
+st.markdown(recursos.ESTILO_APP, unsafe_allow_html=True)
 
 # --------------------------- LOGO --------------------------- #
-if Path(LOGO_PATH).exists():
-    with open(LOGO_PATH, "rb") as f:
-        logo_base64 = base64.b64encode(f.read()).decode("utf-8")
-    st.markdown(f"""
-        <div style='text-align:center;'>
-            <img src='data:image/png;base64,{logo_base64}' width='200'/>
-        </div>
-    """, unsafe_allow_html=True)
+logo = recursos.logo_html(LOGO_PATH, 200)
+if logo:
+    st.markdown(logo, unsafe_allow_html=True)
 else:
     st.warning("⚠️ No se encontró el logo 'logopetrogas.png'")
 
 st.markdown("<h2 style='text-align:center;'>🧪 LTS Lab Analyzer</h2>", unsafe_allow_html=True)
 
+almacen = obtener_almacen()
+motor_deriva = deriva.obtener_motor(almacen)
+# Las alarmas registradas antes de abrir la sesión no se anuncian como nuevas
+st.session_state.setdefault("alarma_vista", deriva.ultima_alarma(almacen))
+
+def registrar(modulo, valores, operador, muestreo_en, muestra_por):
+    almacen.registrar_analisis(modulo, valores, operador, muestreo_en, muestra_por)
+    motor_deriva.sincronizar(almacen)
+    # Las nuevas desde la última vez, vengan de esta sesión, de otra, de la API o de la carpeta vigilada
+    nuevas = deriva.alarmas(almacen, st.session_state["alarma_vista"], limite=None)
+    if nuevas:
+        st.session_state["alarma_vista"] = nuevas[0].id
+    for alarma in reversed(nuevas):
+        if alarma.modulo == modulo:
+            st.warning(f"📉 {deriva.describir(alarma)}.")
+    otras = sum(alarma.modulo != modulo for alarma in nuevas)
+    if otras:
+        st.info(f"📉 {otras} alarmas de deriva nuevas en otros módulos (ver la barra lateral).")
+
+def panel_alarmas():
+    with st.sidebar.expander("📉 Alarmas de deriva"):
+        recientes = deriva.alarmas(almacen, limite=deriva.ULTIMAS)
+        if not recientes:
+            st.caption("Sin alarmas registradas.")
+        for alarma in recientes:
+            st.markdown(f"**{alarma.fecha}** - {deriva.describir(alarma)}")
+
+def tabla_resultados(resultados):
+    # Columnas como listas: st.dataframe las acepta y la app no importa pandas al arrancar
+    return {"Parámetro": list(resultados), "Resultado": list(resultados.values())}
+
 # --------------------------- PDF --------------------------- #
-class PDF(FPDF):
-    def header(self):
-        if os.path.exists(LOGO_PATH):
-            self.image(LOGO_PATH, 10, 8, 33)
-        self.set_font("Arial", "B", 12)
-        self.cell(0, 10, "INFORME DE ANÁLISIS DE LABORATORIO", 0, 1, "C")
-        self.set_font("Arial", "", 10)
-        self.cell(0, 10, f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M')}", 0, 1, "R")
-        self.ln(5)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font("Arial", "I", 8)
-        self.cell(0, 10, "Confidencial - Uso interno PETROGAS", 0, 0, "C")
-
-    def add_section(self, title, content):
-        self.set_font("Arial", "B", 11)
-        self.cell(0, 10, title, 0, 1)
-        self.set_font("Arial", "", 10)
-        if isinstance(content, dict):
-            for k, v in content.items():
-                self.cell(0, 8, f"{k}: {v}", 0, 1)
-        else:
-            self.multi_cell(0, 8, str(content))
-        self.ln(2)
-
-def exportar_pdf(nombre, operador, explicacion, resultados, observaciones, muestreo_en, muestra_por):
-    pdf = PDF()
-    pdf.add_page()
-    pdf.add_section("Operador", limpiar_pdf_texto(operador))
-    pdf.add_section("Muestreo en", limpiar_pdf_texto(muestreo_en))
-    pdf.add_section("Muestra tomada por", limpiar_pdf_texto(muestra_por))
-    pdf.add_section("Explicación técnica", limpiar_pdf_texto(explicacion))
-    pdf.add_section("Resultados", resultados)
-    pdf.add_section("Observaciones", limpiar_pdf_texto(observaciones or "Sin observaciones."))
-    output = pdf.output(dest='S').encode('latin-1', errors='ignore')
-    st.download_button("⬇️ Descargar informe PDF", data=BytesIO(output), file_name=nombre, mime="application/pdf")
+cola = obtener_cola()
+
+def exportar_pdf(modulo, prefijo, operador, resultados, observaciones, muestreo_en, muestra_por):
+    # Solo registra el análisis; el PDF se arma recién cuando el operador lo pide
+    from lts_core.informes_pdf import EXPLICACIONES
+    st.session_state[f"analisis_{modulo}"] = {
+        "prefijo": prefijo,
+        "datos": dict(operador=operador, explicacion=EXPLICACIONES[modulo], resultados=resultados,
+                      observaciones=observaciones, muestreo_en=muestreo_en, muestra_por=muestra_por),
+    }
+    st.session_state.pop(f"informe_{modulo}", None)  # el informe del análisis anterior ya no corresponde
+
+@cronometrado("exportar_pdf")
+def encolar_pdf(modulo):
+    # Se arma en segundo plano y queda guardado en informes/<modulo>/
+    analisis = st.session_state[f"analisis_{modulo}"]
+    seguir_trabajo(f"informe_{modulo}", enviar_informe(cola, modulo, analisis["prefijo"], analisis["datos"]))
+
+def ofrecer_pdf(modulo):
+    if f"analisis_{modulo}" in st.session_state and st.button("📄 Generar informe PDF", key=f"pdf_{modulo}"):
+        encolar_pdf(modulo)
+    mostrar_trabajo(f"informe_{modulo}")
 
 # --------------------------- TABS --------------------------- #
 tabs = st.tabs([
-    "Gas Natural", "Gasolina Estabilizada", "MEG", "TEG", "Agua Desmineralizada", "Aminas"
+    "Gas Natural", "Gasolina Estabilizada", "MEG", "TEG", "Agua Desmineralizada", "Aminas", "Tendencias",
+    "Informe de turno", "Exportación"
 ])
 
 # --------------------------- MODULOS --------------------------- #
 # GAS NATURAL
-with tabs[0]:
+with tabs[0], etapa("tab:Gas Natural"):
     st.subheader("🔥 Análisis de Gas Natural")
     h2s = st.number_input("H₂S (ppm)", 0.0, step=0.1)
     co2 = st.number_input("CO₂ (%)", 0.0, step=0.1)
@@ -109,36 +101,37 @@ with tabs[0]:
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por")
     obs = st.text_area("📝 Observaciones")
     if st.button("📊 Analizar Gas"):
-        resultados = {
-            "H₂S (ppm)": f"{h2s} - {'✅' if h2s <= 2.1 else '❌'}",
-            "CO₂ (%)": f"{co2} - {'✅' if co2 <= 2.0 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"Gas_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Evaluación de H₂S y CO₂.", resultados, obs, muestreo_en, muestra_por)
+        valores = {"H₂S": h2s, "CO₂": co2}
+        with etapa("calculo"):
+            resultados = resultados_modulo("Gas Natural", valores)
+            registrar("Gas Natural", valores, operador, muestreo_en, muestra_por)
+        st.dataframe(tabla_resultados(resultados))
+        exportar_pdf("Gas Natural", f"Gas_{operador}",
+                     operador, resultados, obs, muestreo_en, muestra_por)
+    ofrecer_pdf("Gas Natural")
 
 # GASOLINA
-with tabs[1]:
+with tabs[1], etapa("tab:Gasolina Estabilizada"):
     st.subheader("⛽ Análisis de Gasolina Estabilizada")
     tvr = st.number_input("TVR (psia)", 0.0, step=0.1)
-    sales = st.number_input("Sales (mg/m²)", 0.0, step=0.1)
+    sales = st.number_input("Sales (mg/m³)", 0.0, step=0.1)
     agua = st.number_input("Agua y sedimentos (%)", 0.0, step=0.1)
     operador = st.text_input("👤 Operador", key="op_gasolina")
     muestreo_en = st.text_input("📍 Muestreo en", key="m_gasolina")
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_gasolina")
     obs = st.text_area("📝 Observaciones", key="obs_gasolina")
     if st.button("📊 Analizar Gasolina"):
-        resultados = {
-            "TVR (psia)": f"{tvr} - {'✅' if tvr <= 12 else '❌'}",
-            "Sales (mg/m²)": f"{sales} - {'✅' if sales <= 100 else '❌'}",
-            "Agua y sedimentos (%)": f"{agua} - {'✅' if agua <= 1 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"Gasolina_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Control de TVR, sales y sedimentos.", resultados, obs, muestreo_en, muestra_por)
+        valores = {"TVR": tvr, "Sales": sales, "Agua y sedimentos": agua}
+        with etapa("calculo"):
+            resultados = resultados_modulo("Gasolina Estabilizada", valores)
+            registrar("Gasolina Estabilizada", valores, operador, muestreo_en, muestra_por)
+        st.dataframe(tabla_resultados(resultados))
+        exportar_pdf("Gasolina Estabilizada", f"Gasolina_{operador}",
+                     operador, resultados, obs, muestreo_en, muestra_por)
+    ofrecer_pdf("Gasolina Estabilizada")
 
 # MEG
-with tabs[2]:
+with tabs[2], etapa("tab:MEG"):
     st.subheader("🧪 Análisis de MEG")
     ph = st.number_input("pH", 0.0, 14.0, step=0.1)
     conc = st.number_input("Concentración (%wt)", 0.0, 100.0, step=0.1)
@@ -148,17 +141,18 @@ with tabs[2]:
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_meg")
     obs = st.text_area("📝 Observaciones", key="obs_meg")
     if st.button("📊 Analizar MEG"):
-        resultados = {
-            "pH": f"{ph} - {'✅' if 6.5 <= ph <= 8 else '❌'}",
-            "Concentración (%wt)": f"{conc} - {'✅' if 60 <= conc <= 84 else '❌'}",
-            "Cloruros (ppm)": f"{cl} - {'✅' if cl <= 50 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"MEG_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Control del inhibidor de formación de hidratos.", resultados, obs, muestreo_en, muestra_por)
+        valores = {"pH": ph, "Concentración": conc, "Cloruros": cl}
+        with etapa("calculo"):
+            resultados = resultados_modulo("MEG", valores)
+            registrar("MEG", valores, operador, muestreo_en, muestra_por)
+        st.dataframe(tabla_resultados(resultados))
+        exportar_pdf("MEG", f"MEG_{operador}",
+                     operador, resultados, obs, muestreo_en, muestra_por)
+    ofrecer_pdf("MEG")
+    calculadora_hidratos(conc, "meg")
 
 # TEG
-with tabs[3]:
+with tabs[3], etapa("tab:TEG"):
     st.subheader("🧪 Análisis de TEG")
     ph = st.number_input("pH", 0.0, 14.0, step=0.1, key="ph_teg")
     conc = st.number_input("Concentración (%wt)", 0.0, 100.0, step=0.1, key="conc_teg")
@@ -168,35 +162,37 @@ with tabs[3]:
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_teg")
     obs = st.text_area("📝 Observaciones", key="obs_teg")
     if st.button("📊 Analizar TEG"):
-        resultados = {
-            "pH": f"{ph} - {'✅' if 6.5 <= ph <= 8.5 else '❌'}",
-            "Concentración (%wt)": f"{conc} - {'✅' if conc >= 99 else '❌'}",
-            "Cloruros (ppm)": f"{cl} - {'✅' if cl <= 50 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"TEG_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Análisis del glicol para deshidratación.", resultados, obs, muestreo_en, muestra_por)
+        valores = {"pH": ph, "Concentración": conc, "Cloruros": cl}
+        with etapa("calculo"):
+            resultados = resultados_modulo("TEG", valores)
+            registrar("TEG", valores, operador, muestreo_en, muestra_por)
+        st.dataframe(tabla_resultados(resultados))
+        exportar_pdf("TEG", f"TEG_{operador}",
+                     operador, resultados, obs, muestreo_en, muestra_por)
+    ofrecer_pdf("TEG")
 
 # AGUA DESMINERALIZADA
-with tabs[4]:
+with tabs[4], etapa("tab:Agua Desmineralizada"):
     st.subheader("💧 Análisis de Agua Desmineralizada")
-    cl = st.number_input("Cloruros (ppm)", 0.0, step=0.1)
+    cl = st.number_input("Cloruros (ppm)", 0.0, step=0.1, key="cl_agua")
     operador = st.text_input("👤 Operador", key="op_agua")
     muestreo_en = st.text_input("📍 Muestreo en", key="m_agua")
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_agua")
     obs = st.text_area("📝 Observaciones", key="obs_agua")
     if st.button("📊 Analizar Agua"):
-        resultados = {
-            "Cloruros (ppm)": f"{cl} - {'✅' if cl <= 10 else '❌'}"
-        }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"Agua_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Control de cloruros en agua desmineralizada.", resultados, obs, muestreo_en, muestra_por)
+        valores = {"Cloruros": cl}
+        with etapa("calculo"):
+            resultados = resultados_modulo("Agua Desmineralizada", valores)
+            registrar("Agua Desmineralizada", valores, operador, muestreo_en, muestra_por)
+        st.dataframe(tabla_resultados(resultados))
+        exportar_pdf("Agua Desmineralizada", f"Agua_{operador}",
+                     operador, resultados, obs, muestreo_en, muestra_por)
+    ofrecer_pdf("Agua Desmineralizada")
 
 # AMINAS
-with tabs[5]:
+with tabs[5], etapa("tab:Aminas"):
     st.subheader("☠️ Análisis de Aminas")
-    conc = st.number_input("Concentración (%wt)", 0.0, 100.0, step=0.1)
+    conc = st.number_input("Concentración (%wt)", 0.0, 100.0, step=0.1, key="conc_aminas")
     cl_amina = st.number_input("Cloruros en amina (ppm)", 0.0, step=1.0)
     cl_caldera = st.number_input("Cloruros en caldera (ppm)", 0.0, step=0.1)
     carga_pobre = st.number_input("Carga ácida amina pobre (mol/mol)", 0.0, step=0.001)
@@ -206,13 +202,100 @@ with tabs[5]:
     muestra_por = st.text_input("🧑‍🔬 Muestra tomada por", key="t_aminas")
     obs = st.text_area("📝 Observaciones", key="obs_aminas")
     if st.button("📊 Analizar Aminas"):
-        resultados = {
-            "Concentración (%wt)": f"{conc} - {'✅' if 48 <= conc <= 52 else '❌'}",
-            "Cloruros en amina": f"{cl_amina} - {'✅' if cl_amina <= 1000 else '❌'}",
-            "Cloruros en caldera": f"{cl_caldera} - {'✅' if cl_caldera <= 10 else '❌'}",
-            "Carga ácida pobre": f"{carga_pobre} - {'✅' if carga_pobre <= 0.025 else '❌'}",
-            "Carga ácida rica": f"{carga_rica} - {'✅' if carga_rica <= 0.45 else '❌'}"
+        valores = {
+            "Concentración": conc,
+            "Cloruros en amina": cl_amina,
+            "Cloruros en caldera": cl_caldera,
+            "Carga ácida pobre": carga_pobre,
+            "Carga ácida rica": carga_rica
         }
-        st.dataframe(pd.DataFrame(resultados.items(), columns=["Parámetro", "Resultado"]))
-        exportar_pdf(f"Aminas_{operador}_{datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                     operador, "Evaluación de solvente amínico y cargas ácidas.", resultados, obs, muestreo_en, muestra_por)
+        with etapa("calculo"):
+            resultados = resultados_modulo("Aminas", valores)
+            registrar("Aminas", valores, operador, muestreo_en, muestra_por)
+        st.dataframe(tabla_resultados(resultados))
+        exportar_pdf("Aminas", f"Aminas_{operador}",
+                     operador, resultados, obs, muestreo_en, muestra_por)
+    ofrecer_pdf("Aminas")
+
+# TENDENCIAS
+with tabs[6], etapa("tab:Tendencias"):
+    st.subheader("📈 Cartas de control por parámetro")
+    modulo_t = st.selectbox("Módulo", list(ESPECIFICACIONES), key="modulo_tendencia")
+    param_t = st.selectbox("Parámetro", [p["nombre"] for p in ESPECIFICACIONES[modulo_t]], key="param_tendencia")
+    with etapa("calculo"):
+        serie = serie_parametro(almacen, modulo_t, param_t)
+    if serie.estadistica.n < 2:
+        st.info("Se necesitan al menos dos resultados registrados para armar la carta de control.")
+    else:
+        lci, lc, lcs = serie.limites_shewhart()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Resultados", serie.estadistica.n)
+        c2.metric("Línea central", f"{lc:.4g}", help="Media de la línea base")
+        c3.metric("Desvío base", f"{serie.base.desvio:.4g}")
+        c4.metric("EWMA actual", f"{serie.ewma:.4g}")
+        if not serie.base_completa:
+            st.caption(f"Límites provisorios: la línea base se fija con los primeros {MUESTRAS_BASE} resultados "
+                       f"por fecha (van {serie.base.n}).")
+        tabla = serie.tabla()
+        st.markdown("**Shewhart (media ± 3σ)**")
+        st.line_chart(tabla[["Valor", "LC", "LCS", "LCI"]])
+        st.markdown(f"**EWMA (λ = {serie.lambda_ewma})**")
+        st.line_chart(tabla[["EWMA", "LC", "LCS EWMA", "LCI EWMA"]])
+        ultimo = serie.valores[-1]
+        if not lci <= ultimo <= lcs:
+            st.warning(f"⚠️ El último resultado ({ultimo:.4g}) está fuera de los límites de control.")
+
+# INFORME DE TURNO
+with tabs[7], etapa("tab:Informe de turno"):
+    st.subheader("🗂️ Informe de turno")
+    st.caption("Todos los análisis registrados en el período, en un solo PDF con resumen de cumplimiento.")
+    ahora = datetime.now()
+    c1, c2 = st.columns(2)
+    dia_desde = c1.date_input("Desde (día)", ahora - timedelta(hours=12), key="turno_dia_desde")
+    hora_desde = c1.time_input("Desde (hora)", (ahora - timedelta(hours=12)).time(), key="turno_hora_desde")
+    dia_hasta = c2.date_input("Hasta (día)", ahora, key="turno_dia_hasta")
+    hora_hasta = c2.time_input("Hasta (hora)", ahora.time(), key="turno_hora_hasta")
+    supervisor = st.text_input("👤 Generado por", key="sup_turno")
+    if st.button("🗂️ Generar informe de turno"):
+        from lts_core.informe_turno import CARPETA_TURNO, escribir_informe_turno, nombre_informe
+        desde = datetime.combine(dia_desde, hora_desde)
+        hasta = datetime.combine(dia_hasta, hora_hasta).replace(second=59)  # incluye el minuto elegido
+        # El mismo período pedido desde dos sesiones no se pisa
+        ruta = str(Path(CARPETA_TURNO) / nombre_archivo(Path(nombre_informe(desde, hasta)).stem))
+        seguir_trabajo("informe_turno", cola.enviar(
+            f"Informe de turno - {Path(ruta).name}", ruta,
+            lambda temporal: escribir_informe_turno(almacen, temporal, desde, hasta, supervisor),
+        ))
+    mostrar_trabajo("informe_turno")
+
+# EXPORTACIÓN
+with tabs[8], etapa("tab:Exportación"):
+    st.subheader("📤 Exportación de resultados históricos")
+    st.caption("Se arma en segundo plano, de a páginas: millones de filas no frenan la app ni a las otras sesiones.")
+    modulos_e = st.multiselect("Módulos (vacío = todos)", list(ESPECIFICACIONES), key="modulos_exportacion")
+    opciones_e = sorted({p["nombre"] for m in (modulos_e or ESPECIFICACIONES) for p in ESPECIFICACIONES[m]})
+    parametros_e = st.multiselect("Parámetros (vacío = todos)", opciones_e, key="parametros_exportacion")
+    c1, c2, c3 = st.columns(3)
+    desde_e = c1.date_input("Desde", datetime.now() - timedelta(days=365), key="exportacion_desde")
+    hasta_e = c2.date_input("Hasta", datetime.now(), key="exportacion_hasta")
+    formato_e = c3.selectbox("Formato", exportacion.formatos(), key="formato_exportacion",
+                             help="csv.gz pesa unas diez veces menos; xlsx requiere openpyxl y es más lento")
+    filtros_e = dict(modulo=modulos_e, parametro=parametros_e, desde=desde_e, hasta=hasta_e)
+    # El COUNT(*) recorre el índice (décimas de segundo con millones de filas): solo se
+    # cuenta a pedido, y el número vale mientras no cambien los filtros
+    c1, c2 = st.columns(2)
+    if c1.button("🔢 Contar resultados"):
+        with etapa("contar"):
+            st.session_state["conteo_exportacion"] = (filtros_e, exportacion.contar(almacen, **filtros_e))
+    contados, filas_e = st.session_state.get("conteo_exportacion", (None, None))
+    if contados == filtros_e:
+        st.caption(f"{filas_e:,} resultados en la selección.")
+    if c2.button("📤 Exportar", disabled=contados == filtros_e and not filas_e):
+        seguir_trabajo("exportacion", exportacion.enviar_exportacion(
+            exportacion.obtener_cola_exportaciones(), almacen, formato_e, **filtros_e))
+    mostrar_trabajo("exportacion")
+
+# --------------------------- INFORMES DE LA SESIÓN --------------------------- #
+panel_sesion()
+panel_alarmas()
+cerrar_corrida("LTS_LAB_ANALYZER_FINAL")
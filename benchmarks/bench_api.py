@@ -0,0 +1,100 @@
+# BENCHMARK - RESULTADOS POR SEGUNDO QUE ACEPTA LA API DE INGESTA
+#
+# Levanta el servidor en un puerto libre con una base temporal (o usa --url
+# para medir uno que ya esté corriendo) y envía lotes desde varios clientes
+# con conexiones persistentes, como harían los instrumentos.
+# Uso: python benchmarks/bench_api.py [--clientes 4] [--lote 500] [--total 100000] [--formato csv]
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lts_core.api_ingesta import crear_servidor  # noqa: E402
+from lts_core.especificaciones import ESPECIFICACIONES  # noqa: E402
+
+
+# --------------------------- DATOS --------------------------- #
+def lote(n, formato, semilla):
+    azar = random.Random(semilla)
+    filas = []
+    for _ in range(n):
+        modulo = azar.choice(list(ESPECIFICACIONES))
+        p = azar.choice(ESPECIFICACIONES[modulo])
+        centro, ancho = (p["min"] + p["max"]) / 2, (p["max"] - p["min"]) or 1
+        filas.append((modulo, p["nombre"], round(azar.gauss(centro, ancho / 3), 4)))
+    if formato == "csv":
+        texto = "modulo,parametro,valor\n" + "".join(f"{m},{p},{v}\n" for m, p, v in filas)
+        return texto.encode("utf-8"), "text/csv"
+    cuerpo = json.dumps([{"modulo": m, "parametro": p, "valor": v} for m, p, v in filas], ensure_ascii=False)
+    return cuerpo.encode("utf-8"), "application/json"
+
+
+# --------------------------- CLIENTE --------------------------- #
+def cliente(host, puerto, cuerpos):
+    # Envía los lotes por una sola conexión; devuelve (filas guardadas, latencias)
+    con = http.client.HTTPConnection(host, puerto)
+    guardados, latencias = 0, []
+    for cuerpo, tipo in cuerpos:
+        inicio = time.perf_counter()
+        con.request("POST", "/resultados", body=cuerpo, headers={"Content-Type": tipo})
+        respuesta = con.getresponse()
+        datos = json.loads(respuesta.read())
+        latencias.append(time.perf_counter() - inicio)
+        if respuesta.status != 200:
+            raise RuntimeError(datos)
+        guardados += datos["guardados"]
+    con.close()
+    return guardados, latencias
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resultados por segundo de la API de ingesta")
+    parser.add_argument("--url", help="servidor ya levantado (default: uno local con base temporal)")
+    parser.add_argument("--clientes", type=int, default=4)
+    parser.add_argument("--lote", type=int, default=500, help="resultados por petición")
+    parser.add_argument("--total", type=int, default=100_000, help="resultados a enviar")
+    parser.add_argument("--formato", choices=["json", "csv"], default="json")
+    args = parser.parse_args(argv)
+
+    servidor = None
+    if args.url:
+        partes = urlsplit(args.url)
+        host, puerto = partes.hostname, partes.port
+    else:
+        carpeta = tempfile.mkdtemp(prefix="bench_api_")
+        servidor = crear_servidor("127.0.0.1", 0, os.path.join(carpeta, "resultados.db"))
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        host, puerto = servidor.server_address
+
+    peticiones = max(1, args.total // args.lote)
+    cuerpos = [lote(args.lote, args.formato, i) for i in range(peticiones)]
+    repartos = [cuerpos[i::args.clientes] for i in range(args.clientes)]
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(args.clientes) as pool:
+        resultados = list(pool.map(lambda c: cliente(host, puerto, c), repartos))
+    segundos = time.perf_counter() - inicio
+
+    guardados = sum(g for g, _ in resultados)
+    latencias = sorted(t for _, ls in resultados for t in ls)
+    print(f"{peticiones} peticiones de {args.lote} ({args.formato}), {args.clientes} clientes: "
+          f"{guardados:,} resultados en {segundos:.2f} s -> {guardados / segundos:,.0f} resultados/s")
+    print(f"latencia por lote: mediana {latencias[len(latencias) // 2] * 1e3:.1f} ms, "
+          f"p95 {latencias[int(len(latencias) * 0.95)] * 1e3:.1f} ms")
+    if servidor is not None:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
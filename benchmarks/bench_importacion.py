@@ -0,0 +1,126 @@
+# BENCHMARK - TIEMPO DE IMPORTACIÓN (ARRANQUE EN FRÍO)
+#
+# Cada punto de entrada se importa en un intérprete nuevo con -X importtime,
+# alternado con una importación de referencia de la biblioteca estándar
+# (REFERENCIA). El presupuesto es un múltiplo del tiempo de la referencia y
+# se compara con la mediana de los cocientes: así no depende de la velocidad
+# de la máquina ni de la carga del momento. Para las aplicaciones de
+# Streamlit se ejecutan solo sus imports de nivel superior (el script en sí
+# necesita el servidor). Además se verifica que ninguna dependencia pesada se
+# cargue donde no hace falta.
+# Uso: python benchmarks/bench_importacion.py [--repeticiones 7] [--detalle 8] [--factor 1.0]
+# Sale con código 1 si algún punto de entrada supera su presupuesto.
+
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PESADOS = ("streamlit", "pandas", "numpy", "fpdf", "pyarrow")
+
+# Unos 30-40 ms en una máquina de escritorio; mezcla módulos en Python y extensiones en C
+REFERENCIA = "import argparse, csv, decimal, email.message, http.client, json, sqlite3, xml.dom.minidom"
+
+# punto de entrada -> (presupuesto en veces REFERENCIA, dependencias pesadas que no debe cargar).
+# Presupuestos: alrededor de 1,5 veces la mediana medida; los módulos livianos
+# tienen un piso de 0,3 porque ahí el cociente es casi todo ruido.
+PRESUPUESTOS = {
+    "lts_core": (0.3, PESADOS),
+    "lts_core.especificaciones": (0.3, PESADOS),
+    "lts_core.perfilado": (0.3, PESADOS),
+    "lts_core.almacen": (0.3, PESADOS),
+    "lts_core.deriva": (0.4, PESADOS),
+    "lts_core.cola_informes": (0.6, PESADOS),
+    "lts_core.exportacion": (1.0, PESADOS),
+    "lts_core.api_ingesta": (1.6, PESADOS),
+    "lts_core.informes_pdf": (2.5, ("streamlit", "pandas", "numpy", "pyarrow")),
+    "lts_core.generar_informes": (3.0, ("streamlit", "pandas", "numpy", "pyarrow")),
+    "lts_core.cromatografia": (17, ("streamlit", "fpdf")),  # pandas 3 trae pyarrow
+    "lts_core.hidratos": (3.0, ("streamlit", "pandas", "fpdf", "pyarrow")),
+    "lts_core.vigilancia": (18, ("streamlit", "fpdf")),
+    "panel_informes": (12, ("pandas", "numpy", "fpdf", "pyarrow")),
+    "panel_perfilado": (12, ("pandas", "numpy", "fpdf", "pyarrow")),
+    "panel_hidratos": (12, ("pandas", "numpy", "fpdf", "pyarrow")),
+    "LTS_LAB_ANALYZER_APP.py": (12, ("pandas", "numpy", "fpdf", "pyarrow")),
+    "SIERRACHATALAB.PY": (12, ("pandas", "numpy", "fpdf", "pyarrow")),
+    "LTS_LAB_ANALYZER_FINAL.py": (12, ("pandas", "numpy", "fpdf", "pyarrow")),
+}
+
+
+def codigo_importacion(entrada):
+    # "import x" para un módulo; los imports de nivel superior para un script
+    if not entrada.lower().endswith(".py"):
+        return f"import {entrada}"
+    with open(os.path.join(RAIZ, entrada), encoding="utf-8") as f:
+        arbol = ast.parse(f.read())
+    return "\n".join(ast.unparse(n) for n in arbol.body if isinstance(n, (ast.Import, ast.ImportFrom)))
+
+
+def _lineas(codigo):
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stderr
+    for linea in salida.splitlines():
+        if linea.startswith("import time:") and "|" in linea:
+            propio, acumulado, nombre = linea[len("import time:"):].split("|")
+            if propio.strip().isdigit():  # la primera línea es el encabezado
+                yield int(propio) / 1000, int(acumulado) / 1000, nombre
+
+
+def medir(codigo, arranque=frozenset()):
+    # (ms acumulados de los imports de nivel superior, {módulo: ms propios}, paquetes cargados).
+    # Lo que el intérprete carga al arrancar (arranque) no se cuenta.
+    total, propios, cargados = 0, {}, set()
+    for propio, acumulado, nombre in _lineas(codigo):
+        modulo = nombre.strip()
+        if modulo in arranque:
+            continue
+        cargados.add(modulo.split(".")[0])
+        propios[modulo] = propio
+        if nombre[1:2] != " ":  # sin sangría: importado directamente por el código
+            total += acumulado
+    return total, propios, cargados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de importación de cada punto de entrada")
+    parser.add_argument("--repeticiones", type=int, default=7)
+    parser.add_argument("--detalle", type=int, default=0, help="módulos más lentos a mostrar por entrada")
+    parser.add_argument("--factor", type=float, default=1.0, help="multiplica los presupuestos")
+    parser.add_argument("entradas", nargs="*", help="default: todas las de PRESUPUESTOS")
+    args = parser.parse_args(argv)
+
+    arranque = frozenset(nombre.strip() for _, _, nombre in _lineas("pass"))
+    fallas = 0
+    print(f"{'entrada':>28} {'ms':>8} {'ref ms':>7} {'veces':>6} {'presupuesto':>12}  pesados cargados")
+    for entrada in args.entradas or PRESUPUESTOS:
+        presupuesto, prohibidos = PRESUPUESTOS.get(entrada, (float("inf"), ()))
+        presupuesto *= args.factor
+        codigo = codigo_importacion(entrada)
+        corridas = []  # (cociente, ms de la entrada, ms de la referencia, propios, cargados)
+        for _ in range(args.repeticiones):
+            referencia = medir(REFERENCIA, arranque)[0]
+            total, propios, cargados = medir(codigo, arranque)
+            corridas.append((total / referencia, total, referencia, propios, cargados))
+        corridas.sort(key=lambda c: c[0])
+        cociente, total, referencia, propios, cargados = corridas[len(corridas) // 2]
+        cociente = statistics.median(c[0] for c in corridas)
+        cargados = set().union(*(c[4] for c in corridas))
+        indebidos = sorted(set(prohibidos) & cargados)
+        ok = cociente <= presupuesto and not indebidos
+        fallas += not ok
+        pesados = ", ".join(p if p not in indebidos else f"{p} (!)" for p in PESADOS if p in cargados) or "-"
+        print(f"{entrada:>28} {total:>8.1f} {referencia:>7.1f} {cociente:>6.2f} {presupuesto:>12.2f}  "
+              f"{pesados}{'' if ok else '  <- EXCEDIDO'}")
+        for modulo, ms in sorted(propios.items(), key=lambda m: -m[1])[:args.detalle]:
+            print(f"{'':>30}{ms:>8.1f}  {modulo}")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
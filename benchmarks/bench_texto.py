@@ -0,0 +1,89 @@
+# BENCHMARK - COSTO DE LIMPIEZA DE TEXTO POR INFORME
+#
+# Compara los limpiadores anteriores (reemplazos encadenados y regex sin
+# compilar) con texto_pdf.limpiar sobre informes con observaciones largas.
+# Uso: python benchmarks/bench_texto.py [--repeticiones N]
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lts_core.texto_pdf import limpiar  # noqa: E402
+
+
+# --------------------------- LIMPIADORES ANTERIORES --------------------------- #
+def limpiar_reemplazos(texto):
+    reemplazos = {
+        "₀": "0", "₁": "1", "₂": "2", "₃": "3", "₄": "4",
+        "₅": "5", "₆": "6", "₇": "7", "₈": "8", "₉": "9",
+        "⁰": "0", "¹": "1", "²": "2", "³": "3",
+        "°": " grados ", "º": "", "“": '"', "”": '"',
+        "‘": "'", "’": "'", "–": "-", "—": "-", "•": "-",
+        "→": "->", "←": "<-", "⇒": "=>", "≠": "!=", "≥": ">=", "≤": "<=",
+        "✓": "OK", "✅": "OK", "❌": "NO"
+    }
+    for k, v in reemplazos.items():
+        texto = texto.replace(k, v)
+    return texto
+
+
+def limpiar_regex(texto):
+    texto = str(texto).replace("–", "-").replace("—", "-").replace("“", '"').replace("”", '"')
+    texto = texto.replace("√", "sqrt")
+    return re.sub(r'[^\x00-\x7F]+', '', texto)
+
+
+# --------------------------- DATOS --------------------------- #
+PARRAFO = (
+    "Se tomó la muestra en el separador de entrada a 25 °C; presión 68 bar. Se observó "
+    "leve arrastre de MEG y espuma en la torre de aminas; el analista repitió la titulación "
+    "y obtuvo valores dentro de especificación. Próximo muestreo en el turno mañana. "
+)
+SIMBOLOS = "H₂S ≤ 2 mg/m³ ✅ "
+PARRAFO_DENSO = (
+    "Muestra tomada a 25 °C en el separador de entrada; se observó arrastre de MEG — "
+    "el contenido de H₂S fue ≤ 2,1 mg/m³ y el CO₂ se mantuvo en 1,8 %. "
+    "El operador señaló “espuma leve” en la torre de aminas → se recomienda revisar el antiespumante. "
+)
+
+# Observaciones: texto del operador, con un símbolo por párrafo o con símbolos en cada frase
+ESTILOS = {
+    "típico": PARRAFO,
+    "con símbolos": PARRAFO + SIMBOLOS,
+    "denso": PARRAFO_DENSO,
+}
+
+
+def informe(largo_observaciones, parrafo):
+    resultados = {
+        f"Parámetro {i} (mg/m³)": f"{i * 1.37:.2f} - {'✅' if i % 3 else '❌'}" for i in range(12)
+    }
+    observaciones = parrafo * (largo_observaciones // len(parrafo) + 1)
+    return ["Juan Pérez", "Planta LTS", "Técnico de turno", "Evaluación de H₂S y CO₂.", observaciones,
+            *resultados, *resultados.values()]
+
+
+def medir(funcion, textos, repeticiones):
+    return min(timeit.repeat(lambda: [funcion(t) for t in textos], number=1, repeat=repeticiones))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo de limpieza de texto por informe PDF")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'estilo':>13} {'observaciones':>14} {'reemplazos':>12} {'regex':>12} {'texto_pdf':>12} {'mejora':>8}")
+    for estilo, parrafo in ESTILOS.items():
+        for largo in (200, 2_000, 20_000, 200_000):
+            textos = informe(largo, parrafo)
+            tiempos = [medir(f, textos, args.repeticiones) for f in (limpiar_reemplazos, limpiar_regex, limpiar)]
+            print(f"{estilo:>13} {largo:>14,} " + " ".join(f"{t * 1e6:>10.1f}µs" for t in tiempos)
+                  + f" {min(tiempos[:2]) / tiempos[2]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# DATOS SINTÉTICOS - GENERADORES REPRODUCIBLES PARA LOS BENCHMARKS
+#
+# Cada generador recibe la cantidad de muestras y una semilla: con la misma
+# semilla se obtienen siempre los mismos datos, así dos corridas de la suite
+# miden exactamente el mismo trabajo.
+#   cromatogramas      tabla larga del cromatógrafo (muestra, componente, fraccion)
+#   resultados         una muestra por fila y un parámetro por columna (como validar_lote)
+#   resultados_largos  formato LIMS: modulo, parametro, valor, fecha (como validar_historico)
+#   observaciones      textos de operador con símbolos fuera de latin-1
+#   informes           datos completos de informes (como construir_pdf)
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lts_core.cromatografia import ALIAS, COMPONENTES  # noqa: E402
+from lts_core.especificaciones import ESPECIFICACIONES  # noqa: E402
+from lts_core.informes_pdf import EXPLICACIONES  # noqa: E402
+
+# Gas de venta típico (fracción molar); cada muestra varía alrededor de esta composición
+COMPOSICION_TIPICA = {
+    "Methane": 0.880, "Ethane": 0.055, "Propane": 0.020, "i-Butane": 0.004, "n-Butane": 0.005,
+    "i-Pentane": 0.0015, "n-Pentane": 0.0012, "Hexane": 0.0008, "Nitrogen": 0.015, "CO2": 0.0175,
+}
+CONCENTRACION = 2000  # Dirichlet: cuanto mayor, menos se apartan las muestras de la típica
+
+# Glicoles, aminas y agua, como se cargan en las pestañas
+MODULOS = ("MEG", "TEG", "Aminas", "Agua Desmineralizada")
+FUERA_DE_ESPECIFICACION = 0.05  # fracción de valores fuera de límites
+
+FRASES = [
+    "Muestra tomada a 25 °C en el separador de entrada; presión 68 bar.",
+    "Se observó leve arrastre de MEG — el analista repitió la titulación.",
+    "H₂S ≤ 2,1 mg/m³ y CO₂ dentro de especificación ✅",
+    "El operador señaló “espuma leve” en la torre de aminas → revisar antiespumante.",
+    "Cloruros en caldera elevados ⚠️ se drenó el purgador.",
+    "Sin novedades. Próximo muestreo en el turno mañana.",
+]
+
+
+def cromatogramas(n, semilla=0, alias=0.1):
+    # n muestras x 10 componentes. Una fracción `alias` de las muestras usa los
+    # nombres alternativos del exporte (C1, C2, N2, ...) para ejercitar la resolución.
+    azar = np.random.default_rng(semilla)
+    tipica = np.array([COMPOSICION_TIPICA[c] for c in COMPONENTES])
+    fracciones = azar.dirichlet(tipica * CONCENTRACION, size=n)
+    nombres = np.tile(np.array(COMPONENTES, dtype=object), (n, 1))
+    con_alias = azar.random(n) < alias
+    nombres[con_alias] = [ALIAS[c][0] for c in COMPONENTES]
+    return pd.DataFrame({
+        "muestra": np.repeat([f"M{i:07d}" for i in range(n)], len(COMPONENTES)),
+        "componente": nombres.ravel(),
+        "fraccion": fracciones.ravel().round(6),
+    })
+
+
+def cromatogramas_csv(n, semilla=0):
+    # El mismo cromatograma como lo exporta el instrumento (bytes CSV)
+    return cromatogramas(n, semilla).to_csv(index=False).encode("utf-8")
+
+
+def _valores(azar, param, n, fuera=FUERA_DE_ESPECIFICACION):
+    minimo, maximo = param["min"], param["max"]
+    ancho = (maximo - minimo) or 1.0
+    valores = azar.uniform(minimo + 0.05 * ancho, maximo - 0.05 * ancho, n)
+    desvio = azar.random(n) < fuera
+    valores[desvio] = np.where(azar.random(desvio.sum()) < 0.5, minimo - 0.1 * ancho, maximo + 0.1 * ancho)
+    return valores.round(4)
+
+
+def resultados(modulo, n, semilla=0, fuera=FUERA_DE_ESPECIFICACION):
+    # n análisis de un módulo, un parámetro por columna (por nombre)
+    azar = np.random.default_rng(semilla)
+    return pd.DataFrame({p["nombre"]: _valores(azar, p, n, fuera) for p in ESPECIFICACIONES[modulo]})
+
+
+def resultados_largos(n, semilla=0, modulos=MODULOS, dias=365):
+    # n resultados sueltos de los módulos dados, con fechas repartidas en los últimos `dias`
+    azar = np.random.default_rng(semilla)
+    pares = [(m, p) for m in modulos for p in ESPECIFICACIONES[m]]
+    elegidos = azar.integers(len(pares), size=n)
+    valores = np.empty(n)
+    for i, (_, param) in enumerate(pares):
+        filas = elegidos == i
+        valores[filas] = _valores(azar, param, int(filas.sum()))
+    fin = datetime(2024, 6, 30)
+    segundos = azar.integers(dias * 86400, size=n)
+    return pd.DataFrame({
+        "modulo": [pares[i][0] for i in elegidos],
+        "parametro": [pares[i][1]["nombre"] for i in elegidos],
+        "valor": valores,
+        "fecha": pd.to_datetime(fin) - pd.to_timedelta(segundos, unit="s"),
+    })
+
+
+def observaciones(n, semilla=0, frases=3):
+    azar = np.random.default_rng(semilla)
+    return [" ".join(FRASES[j] for j in azar.integers(len(FRASES), size=frases)) for _ in range(n)]
+
+
+def informes(n, semilla=0, modulos=MODULOS):
+    # Datos de n informes con los argumentos de construir_pdf
+    azar = np.random.default_rng(semilla)
+    textos = observaciones(n, semilla)
+    datos = []
+    for i in range(n):
+        modulo = modulos[i % len(modulos)]
+        valores = {p["nombre"]: _valores(azar, p, 1)[0] for p in ESPECIFICACIONES[modulo]}
+        datos.append(dict(
+            operador=f"Operador {i % 17}", explicacion=EXPLICACIONES[modulo],
+            resultados={k: f"{v:g}" for k, v in valores.items()}, observaciones=textos[i],
+            muestreo_en="Separador de entrada", muestra_por="Técnico de turno",
+            fecha=datetime(2024, 6, 30) - timedelta(minutes=i),
+        ))
+    return datos
@@ -0,0 +1,248 @@
+# BENCHMARK - SUITE DE RENDIMIENTO CON DATOS SINTÉTICOS
+#
+# Mide los caminos calientes con 1, 1.000 y 100.000 muestras generadas por
+# benchmarks/sinteticos.py (siempre las mismas, por semilla):
+#   gas          PCS/Wobbe del cromatograma (calcular_lote, calcular_por_bloques)
+#   validacion   especificaciones (validar_lote, evaluar, validar_historico, la API)
+#   texto        limpieza de texto para el PDF (limpiar)
+#   pdf          armado del PDF (PDF.add_section con n renglones, construir_pdf por informe)
+#   hidratos     dosificación de MEG sobre una grilla de n puntos presión x temperatura
+#   exportacion  extracto CSV de n resultados históricos (SQLite temporal, de a páginas)
+# De cada caso se toma el mejor tiempo de varias repeticiones. --guardar deja
+# los tiempos en un JSON de línea base; --comparar mide de nuevo y marca los
+# casos más lentos que la línea base por encima del umbral.
+# Uso: python benchmarks/suite.py [--casos gas,pdf] [--tamanos 1,1000] [--guardar benchmarks/linea_base.json]
+#      python benchmarks/suite.py --comparar benchmarks/linea_base.json [--umbral 0.2]
+# Con --comparar sale con código 1 si hay regresiones.
+
+import argparse
+import atexit
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sinteticos  # noqa: E402 (agrega la raíz del repositorio a sys.path)
+
+from lts_core import api_ingesta, cromatografia, especificaciones, exportacion, hidratos  # noqa: E402
+from lts_core.almacen import AlmacenResultados  # noqa: E402
+from lts_core.informes_pdf import PDF, construir_pdf  # noqa: E402
+from lts_core.texto_pdf import limpiar  # noqa: E402
+
+TAMANOS = (1, 1_000, 100_000)
+LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base.json")
+UMBRAL = 0.20          # regresión: más de un 20 % más lento que la línea base...
+PISO_SEGUNDOS = 5e-4   # ...y al menos medio milisegundo (debajo de eso es ruido)
+PRESUPUESTO = 0.5      # segundos de repeticiones por caso y tamaño
+
+
+# --------------------------- CASOS --------------------------- #
+# Cada caso recibe n y devuelve la función a medir: los datos se generan
+# antes, fuera del tiempo medido.
+def gas_calcular_lote(n):
+    df = sinteticos.cromatogramas(n)
+    return lambda: cromatografia.calcular_lote(df)
+
+
+def gas_por_bloques(n):
+    datos = sinteticos.cromatogramas_csv(n)
+    return lambda: cromatografia.calcular_por_bloques(io.BytesIO(datos))
+
+
+def _validar_lote(modulo):
+    def caso(n):
+        df = sinteticos.resultados(modulo, n)
+        return lambda: especificaciones.validar_lote(df, modulo)
+    return caso
+
+
+def validacion_evaluar(n):
+    # Una llamada por muestra, como al cargar resultados en las pestañas
+    tablas = {m: sinteticos.resultados(m, n).to_dict("records") for m in sinteticos.MODULOS}
+    modulos = sinteticos.MODULOS
+    muestras = [(modulos[i % len(modulos)], tablas[modulos[i % len(modulos)]][i]) for i in range(n)]
+    return lambda: [especificaciones.evaluar(m, valores) for m, valores in muestras]
+
+
+def validacion_historico(n):
+    df = sinteticos.resultados_largos(n)
+    return lambda: especificaciones.validar_historico(df)
+
+
+def validacion_api(n):
+    # Lote de instrumento tal como lo recibe la API de ingesta
+    df = sinteticos.resultados_largos(n)
+    df["fecha"] = df["fecha"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    filas = df.to_dict("records")
+    return lambda: api_ingesta.validar(filas)
+
+
+def texto_limpiar(n):
+    textos = sinteticos.observaciones(n)
+    return lambda: [limpiar(t) for t in textos]
+
+
+def texto_limpiar_unicode(n):
+    textos = sinteticos.observaciones(n)
+    return lambda: [limpiar(t, unicode=True) for t in textos]
+
+
+def pdf_add_section(n):
+    # Un solo informe con n renglones de resultados (informe de turno grande)
+    df = sinteticos.resultados_largos(n)
+    renglones = {f"{i:06d} {m} {p}": f"{v:g}" for i, (m, p, v) in enumerate(zip(df["modulo"], df["parametro"], df["valor"]))}
+
+    def medir():
+        pdf = PDF()
+        pdf.add_page()
+        pdf.add_section("Resultados", renglones)
+        return pdf.output(dest="S")
+    return medir
+
+
+def pdf_construir(n):
+    # n informes completos, uno por muestra
+    informes = sinteticos.informes(n)
+    return lambda: [construir_pdf(**datos) for datos in informes]
+
+
+def hidratos_grilla(n):
+    import numpy as np
+    filas = max(1, int(n ** 0.5))
+    presiones, temperaturas = np.linspace(10, 150, filas), np.linspace(-30, 30, n // filas)
+    return lambda: hidratos.grilla(presiones, temperaturas, 0.65, 80.0, 500.0, "Nielsen-Bucklin", caudal_actual=300.0)
+
+
+def exportacion_csv(n):
+    # Base temporal con n resultados; el CSV se descarta (se mide leer y formatear)
+    df = sinteticos.resultados_largos(n)
+    carpeta = tempfile.mkdtemp(prefix="bench_exportacion_")
+    atexit.register(shutil.rmtree, carpeta, True)
+    almacen = AlmacenResultados(os.path.join(carpeta, "resultados.db"))
+    almacen.escribir([
+        (f"{fecha:%Y-%m-%d %H:%M:%S}", m, p, v, 1, "Operador", "Separador", "Técnico", None)
+        for fecha, m, p, v in zip(df["fecha"], df["modulo"], df["parametro"], df["valor"])
+    ])
+    return lambda: exportacion.exportar(almacen, os.devnull, "csv")
+
+
+CASOS = {
+    "gas.calcular_lote": gas_calcular_lote,
+    "gas.por_bloques": gas_por_bloques,
+    **{f"validacion.lote.{m}": _validar_lote(m) for m in sinteticos.MODULOS},
+    "validacion.evaluar": validacion_evaluar,
+    "validacion.historico": validacion_historico,
+    "validacion.api": validacion_api,
+    "texto.limpiar": texto_limpiar,
+    "texto.limpiar_unicode": texto_limpiar_unicode,
+    "pdf.add_section": pdf_add_section,
+    "pdf.construir_pdf": pdf_construir,
+    "hidratos.grilla": hidratos_grilla,
+    "exportacion.csv": exportacion_csv,
+}
+
+
+# --------------------------- MEDICIÓN --------------------------- #
+def cronometrar(funcion, repeticiones, presupuesto=PRESUPUESTO):
+    # Mejor tiempo de hasta `repeticiones` corridas; corta antes si se pasa del
+    # presupuesto (los casos de 100k suelen correr una o dos veces). La primera
+    # corrida calienta cachés (compilar, fuentes, memo de límites): el mínimo la descarta sola.
+    mejor, gastado, corridas = float("inf"), 0.0, 0
+    while corridas < repeticiones and (corridas == 0 or gastado < presupuesto):
+        inicio = time.perf_counter()
+        funcion()
+        segundos = time.perf_counter() - inicio
+        mejor, gastado, corridas = min(mejor, segundos), gastado + segundos, corridas + 1
+    return mejor, corridas
+
+
+def entorno():
+    import fpdf
+    import numpy as np
+    import pandas as pd
+    return {
+        "python": platform.python_version(), "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "numpy": np.__version__, "pandas": pd.__version__, "fpdf": getattr(fpdf, "__version__", "?"),
+    }
+
+
+def correr(casos, tamanos, repeticiones):
+    resultados = {}
+    for nombre in casos:
+        resultados[nombre] = {}
+        for n in tamanos:
+            funcion = CASOS[nombre](n)
+            segundos, corridas = cronometrar(funcion, repeticiones)
+            resultados[nombre][str(n)] = {"segundos": segundos, "us_por_muestra": segundos / n * 1e6, "corridas": corridas}
+            print(f"{nombre:>36} {n:>8,} {segundos * 1e3:>11.3f} ms {segundos / n * 1e6:>11.2f} µs/muestra  ({corridas}x)", flush=True)
+    return resultados
+
+
+# --------------------------- COMPARACIÓN --------------------------- #
+def comparar(base, actual, umbral=UMBRAL, piso=PISO_SEGUNDOS):
+    # [(caso, n, segundos base, segundos actuales, razón, regresión)] de lo medido en ambos
+    filas = []
+    for nombre, por_tamano in actual.items():
+        for n, medida in por_tamano.items():
+            previa = base.get(nombre, {}).get(n)
+            if previa is None:
+                continue
+            antes, ahora = previa["segundos"], medida["segundos"]
+            razon = ahora / antes if antes else float("inf")
+            filas.append((nombre, n, antes, ahora, razon, razon > 1 + umbral and ahora - antes > piso))
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite de rendimiento con datos sintéticos")
+    parser.add_argument("--casos", help="prefijos separados por coma (gas, validacion, texto, pdf, hidratos, o un caso)")
+    parser.add_argument("--tamanos", default=",".join(map(str, TAMANOS)))
+    parser.add_argument("--repeticiones", type=int, default=20, help="máximo por caso y tamaño")
+    parser.add_argument("--guardar", nargs="?", const=LINEA_BASE, help=f"JSON de línea base (default: {LINEA_BASE})")
+    parser.add_argument("--comparar", nargs="?", const=LINEA_BASE, help="línea base contra la cual comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help="fracción de lentitud tolerada (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    prefijos = args.casos.split(",") if args.casos else [""]
+    casos = [c for c in CASOS if any(c == p or c.startswith(p) for p in prefijos)]
+    if not casos:
+        parser.error(f"ningún caso coincide con {args.casos!r}; casos: {', '.join(CASOS)}")
+    tamanos = [int(t) for t in args.tamanos.split(",")]
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+
+    print(f"{'caso':>36} {'muestras':>8} {'mejor':>14} {'':>11}")
+    resultados = correr(casos, tamanos, args.repeticiones)
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump({"creado": datetime.now().isoformat(timespec="seconds"), "entorno": entorno(),
+                       "casos": resultados}, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {args.guardar}")
+
+    if base is None:
+        return 0
+    if base.get("entorno") != entorno():
+        print("Aviso: la línea base se midió en otro entorno; los tiempos pueden no ser comparables.")
+    filas = comparar(base["casos"], resultados, args.umbral)
+    regresiones = [f for f in filas if f[5]]
+    print(f"\n{'caso':>36} {'muestras':>8} {'base ms':>11} {'actual ms':>11} {'razón':>7}")
+    for nombre, n, antes, ahora, razon, regresion in filas:
+        print(f"{nombre:>36} {int(n):>8,} {antes * 1e3:>11.3f} {ahora * 1e3:>11.3f} {razon:>7.2f}"
+              f"{'  <- REGRESIÓN' if regresion else ''}")
+    print(f"{len(regresiones)} regresión(es) por encima de {args.umbral:.0%} sobre {len(filas)} mediciones.")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
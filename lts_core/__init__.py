@@ -0,0 +1,40 @@
+# LTS CORE - CÁLCULO, VALIDACIÓN E INFORMES SIN INTERFAZ
+#
+# Todo lo que no es Streamlit: las aplicaciones, los procesos en lote y la
+# API lo importan igual (from lts_core.especificaciones import evaluar).
+# Importar el paquete no carga ningún submódulo; lts_core.<modulo> los carga
+# recién cuando se usan. NumPy, pandas, FPDF y pyarrow entran solo con los
+# módulos (o funciones) que los necesitan: ver benchmarks/bench_importacion.py.
+#
+#   especificaciones    límites por módulo y parámetro, vigentes e históricos
+#   almacen             resultados de cada análisis (SQLite)
+#   cromatografia       propiedades del gas por cromatografía (GPA 2145)
+#   archivo_gas         histórico Parquet de composiciones
+#   control_estadistico cartas Shewhart/EWMA
+#   deriva              alarmas CUSUM/EWMA en línea
+#   texto_pdf           limpieza de texto y clase base de los PDF
+#   informes_pdf        diseño común de los informes
+#   cache_informes      PDF memorizados por contenido
+#   cola_informes       generación de informes en segundo plano
+#   informe_turno       informe consolidado de un período
+#   recursos            archivos estáticos, estilos y carpetas de informes
+#   generar_informes    generación masiva por línea de comandos
+#   vigilancia          ingesta de la carpeta de entrada
+#   api_ingesta         API HTTP de ingesta
+#   perfilado           tiempos por etapa de cada rerun (opcional)
+#   hidratos            inhibición con MEG sobre grillas presión x temperatura
+#   exportacion         extractos históricos a CSV/XLSX de a páginas
+
+import importlib
+
+__all__ = [
+    "especificaciones", "almacen", "cromatografia", "archivo_gas", "control_estadistico", "deriva",
+    "texto_pdf", "informes_pdf", "cache_informes", "cola_informes", "informe_turno", "recursos",
+    "generar_informes", "vigilancia", "api_ingesta", "perfilado", "hidratos", "exportacion",
+]
+
+
+def __getattr__(nombre):
+    if nombre in __all__:
+        return importlib.import_module(f".{nombre}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
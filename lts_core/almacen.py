@@ -0,0 +1,192 @@
+# ALMACÉN DE RESULTADOS - REGISTRO PERSISTENTE DE CADA ANÁLISIS (SQLITE)
+#
+# Una fila por parámetro medido. La base usa WAL para que varios operadores
+# escriban y consulten a la vez sin bloquearse, y un índice por
+# (modulo, parametro, fecha) para que tendencias y auditorías respondan en
+# menos de un segundo aun con millones de filas.
+
+import atexit
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from . import especificaciones
+
+RUTA_BASE = os.path.join("informes", "resultados.db")
+TAMANO_LOTE = 500  # filas acumuladas antes de escribir en una sola transacción
+TAMANO_PAGINA = 20_000  # filas por consulta al recorrer exportaciones o el motor de deriva
+
+COLUMNAS = ["fecha", "modulo", "parametro", "valor", "cumple", "operador", "muestreo_en", "muestra_por", "muestra"]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    modulo TEXT NOT NULL,
+    parametro TEXT NOT NULL,
+    valor REAL,
+    cumple INTEGER,
+    operador TEXT,
+    muestreo_en TEXT,
+    muestra_por TEXT,
+    muestra TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_resultados_modulo_parametro_fecha ON resultados (modulo, parametro, fecha);
+CREATE INDEX IF NOT EXISTS ix_resultados_modulo_parametro_id ON resultados (modulo, parametro, id);
+CREATE INDEX IF NOT EXISTS ix_resultados_fecha ON resultados (fecha);
+"""
+
+_INSERTAR = f"INSERT INTO resultados ({', '.join(COLUMNAS)}) VALUES ({', '.join('?' for _ in COLUMNAS)})"
+
+
+def _fecha(fecha=None):
+    return (fecha or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _filtro(modulo=None, parametro=None, desde=None, hasta=None):
+    # Cláusula WHERE (con espacio inicial, o vacía) y sus argumentos.
+    # modulo y parametro pueden ser un valor o una lista de valores.
+    condiciones, argumentos = [], []
+    for columna, operador, valor in (
+        ("modulo", "=", modulo), ("parametro", "=", parametro),
+        ("fecha", ">=", desde), ("fecha", "<=", hasta),
+    ):
+        if valor is None:
+            continue
+        if isinstance(valor, (list, tuple, set)):
+            valor = list(valor)
+            condiciones.append(f"{columna} IN ({', '.join('?' for _ in valor)})")
+            argumentos.extend(valor)
+        else:
+            condiciones.append(f"{columna} {operador} ?")
+            argumentos.append(_fecha(valor) if columna == "fecha" and not isinstance(valor, str) else valor)
+    return (" WHERE " + " AND ".join(condiciones) if condiciones else ""), argumentos
+
+
+class AlmacenResultados:
+    def __init__(self, ruta=RUTA_BASE, tamano_lote=TAMANO_LOTE):
+        self.ruta = ruta
+        self.tamano_lote = tamano_lote
+        self._pendientes = []
+        self._lock = threading.Lock()
+        self._local = threading.local()  # sqlite3 no comparte conexiones entre hilos
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        self.conexion().executescript(ESQUEMA)
+        atexit.register(self.vaciar)
+
+    def conexion(self):
+        con = getattr(self._local, "conexion", None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=30)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = con
+        return con
+
+    # --------------------------- ESCRITURA --------------------------- #
+    def escribir(self, filas):
+        # filas: tuplas en el orden de COLUMNAS; todas en una sola transacción
+        con = self.conexion()
+        with con:
+            con.executemany(_INSERTAR, filas)
+
+    def agregar(self, filas):
+        # Acumula filas y las escribe de a lotes de tamano_lote
+        with self._lock:
+            self._pendientes.extend(filas)
+            if len(self._pendientes) < self.tamano_lote:
+                return
+            lote, self._pendientes = self._pendientes, []
+        self.escribir(lote)
+
+    def vaciar(self):
+        with self._lock:
+            lote, self._pendientes = self._pendientes, []
+        if lote:
+            self.escribir(lote)
+
+    def registrar_analisis(self, modulo, valores, operador="", muestreo_en="", muestra_por="", muestra=None, fecha=None):
+        # Guarda un análisis completo, con el cumplimiento de cada parámetro según especificación
+        fecha = _fecha(fecha)
+        filas = [
+            (fecha, modulo, nombre, float(valor), int(cumple), operador, muestreo_en, muestra_por, muestra)
+            for nombre, _, valor, cumple in especificaciones.evaluar(modulo, valores)
+        ]
+        self.escribir(filas)
+        return filas
+
+    # --------------------------- CONSULTAS --------------------------- #
+    def consultar(self, modulo=None, parametro=None, desde=None, hasta=None, limite=None):
+        import pandas as pd
+        donde, argumentos = _filtro(modulo, parametro, desde, hasta)
+        sql = f"SELECT id, {', '.join(COLUMNAS)} FROM resultados{donde} ORDER BY fecha"
+        if limite:
+            sql += f" LIMIT {int(limite)}"
+        df = pd.read_sql_query(sql, self.conexion(), params=argumentos)
+        df["fecha"] = pd.to_datetime(df["fecha"])
+        return df
+
+    def filas_desde(self, ultimo_id=0, limite=TAMANO_PAGINA):
+        # (id, fecha, modulo, parametro, valor) de lo cargado después de ultimo_id, en
+        # orden de carga y de a limite filas: se sigue desde el último id devuelto
+        return self.conexion().execute(
+            "SELECT id, fecha, modulo, parametro, valor FROM resultados WHERE id > ? ORDER BY id LIMIT ?",
+            (ultimo_id, limite),
+        ).fetchall()
+
+    def resumen(self, desde=None, hasta=None):
+        # Por módulo y parámetro: (modulo, parametro, análisis, cumplen, mínimo, máximo, promedio)
+        donde, argumentos = _filtro(desde=desde, hasta=hasta)
+        return self.conexion().execute(
+            "SELECT modulo, parametro, COUNT(valor), SUM(cumple), MIN(valor), MAX(valor), AVG(valor) "
+            f"FROM resultados{donde} GROUP BY modulo, parametro ORDER BY modulo, parametro",
+            argumentos,
+        ).fetchall()
+
+    def contar(self, modulo=None, parametro=None, desde=None, hasta=None):
+        donde, argumentos = _filtro(modulo, parametro, desde, hasta)
+        return self.conexion().execute(f"SELECT COUNT(*) FROM resultados{donde}", argumentos).fetchone()[0]
+
+    def paginas(self, modulo=None, parametro=None, desde=None, hasta=None, tamano=TAMANO_PAGINA):
+        # Las filas filtradas (id y COLUMNAS) en orden de fecha, de a páginas de
+        # tamano filas. Cada página es una consulta corta que sigue desde la
+        # última (fecha, id) leída: una exportación de millones de filas no
+        # mantiene abierta una lectura que frene los checkpoints del WAL, y las
+        # filas que se cargan mientras tanto no corren las páginas.
+        donde, argumentos = _filtro(modulo, parametro, desde, hasta)
+        # Con un solo módulo y parámetro el índice compuesto ya da el orden por fecha;
+        # si no, SQLite ordenaría en cada página todo lo filtrado: se recorre por fecha.
+        unico = all(v is not None and not isinstance(v, (list, tuple, set)) for v in (modulo, parametro))
+        indice = "" if unico else " INDEXED BY ix_resultados_fecha"
+        sql = (f"SELECT id, {', '.join(COLUMNAS)} FROM resultados{indice}{donde}{' AND' if donde else ' WHERE'} "
+               "(fecha, id) > (?, ?) ORDER BY fecha, id LIMIT ?")
+        ultima = ("", 0)
+        while True:
+            filas = self.conexion().execute(sql, [*argumentos, *ultima, tamano]).fetchall()
+            if not filas:
+                return
+            yield filas
+            ultima = (filas[-1][1], filas[-1][0])
+
+    def nuevos_desde(self, modulo, parametro, ultimo_id=0, limite=TAMANO_PAGINA):
+        # (id, fecha, valor) cargados después de ultimo_id, en orden de carga y de a limite filas
+        return self.conexion().execute(
+            "SELECT id, fecha, valor FROM resultados WHERE modulo = ? AND parametro = ? AND id > ? ORDER BY id LIMIT ?",
+            (modulo, parametro, ultimo_id, limite),
+        ).fetchall()
+
+
+_almacen = None
+_lock_almacen = threading.Lock()
+
+
+def obtener_almacen(ruta=RUTA_BASE):
+    # Instancia compartida por todas las sesiones del proceso
+    global _almacen
+    with _lock_almacen:
+        if _almacen is None or _almacen.ruta != ruta:
+            _almacen = AlmacenResultados(ruta)
+        return _almacen
@@ -0,0 +1,352 @@
+# API DE INGESTA - RECEPCIÓN DE RESULTADOS DE INSTRUMENTOS Y DEL LIMS POR HTTP
+#
+# Uso:
+#   python -m lts_core.api_ingesta [--host 127.0.0.1] [--puerto 8600] [--base informes/resultados.db]
+#
+# Corre al lado de la app de Streamlit y escribe en el mismo almacén de resultados.
+#   GET  /especificaciones       módulos y parámetros aceptados, con sus límites vigentes
+#   GET  /salud                  para monitoreo
+#   GET  /exportacion            resultados históricos transmitidos de a páginas (CSV por defecto);
+#                                filtros: modulo y parametro (repetibles), desde, hasta, formato (csv, csv.gz, xlsx)
+#   GET  /alarmas                alarmas de deriva con id > desde_id, las más nuevas primero;
+#                                filtros: desde_id, modulo, limite
+#   POST /resultados             lote de resultados de cualquier módulo
+#   POST /resultados/<modulo>    lote de un solo módulo (las filas pueden omitir "modulo")
+#
+# El cuerpo es CSV con encabezado (Content-Type: text/csv) o JSON: una lista de
+# objetos, o {"resultados": [...]}. Cada objeto es un resultado (modulo,
+# parametro, valor) o un análisis completo (modulo, valores: {parametro: valor});
+# en ambos casos admite fecha, operador, muestreo_en, muestra_por y muestra.
+# El lote se valida con los límites vigentes en la fecha de cada resultado
+# (las mismas reglas que las pestañas) y se guarda en una sola transacción; la
+# respuesta trae el cumplimiento fila por fila apenas se confirma el lote. El
+# motor de deriva (lts_core.deriva) se sincroniza después, en un hilo de fondo
+# que agrupa los pedidos de lotes seguidos; la respuesta trae ultima_alarma y
+# las alarmas que dispare el lote se consultan con GET /alarmas?desde_id=<ultima_alarma>.
+# Las conexiones son HTTP/1.1 persistentes: un instrumento que envía lotes
+# seguidos reutiliza el mismo hilo y la misma conexión a la base.
+#
+# Ejemplo:
+#   curl -X POST localhost:8600/resultados/MEG -H "Content-Type: text/csv" \
+#        --data-binary $'parametro,valor\npH,7.1\nCloruros,12\n'
+#   curl -o meg.csv "localhost:8600/exportacion?modulo=MEG&desde=2024-01-01&hasta=2024-06-30"
+#   curl "localhost:8600/alarmas?desde_id=0&modulo=MEG"
+
+import argparse
+import csv
+import io
+import json
+import math
+import sys
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from . import deriva, especificaciones
+from .almacen import RUTA_BASE, obtener_almacen
+
+HOST = "127.0.0.1"
+PUERTO = 8600
+MAX_CUERPO = 64 * 1024 * 1024  # bytes por lote
+OPCIONALES = ("operador", "muestreo_en", "muestra_por", "muestra")
+
+
+# --------------------------- LECTURA DEL LOTE --------------------------- #
+def _registros_json(cuerpo):
+    try:
+        datos = json.loads(cuerpo)
+    except ValueError as e:
+        raise ValueError(f"JSON inválido: {e}")
+    if isinstance(datos, dict):
+        datos = datos.get("resultados")
+    if not isinstance(datos, list) or not all(isinstance(r, dict) for r in datos):
+        raise ValueError('se esperaba una lista de objetos o {"resultados": [...]}')
+    # Los análisis completos se expanden a un resultado por parámetro
+    filas = []
+    for registro in datos:
+        valores = registro.get("valores")
+        if isinstance(valores, dict):
+            comunes = {k: v for k, v in registro.items() if k != "valores"}
+            filas.extend(dict(comunes, parametro=p, valor=v) for p, v in valores.items())
+        else:
+            filas.append(registro)
+    return filas
+
+
+def _registros_csv(cuerpo):
+    try:
+        lector = csv.DictReader(io.StringIO(cuerpo.decode("utf-8-sig")), skipinitialspace=True)
+        lector.fieldnames = [c.strip().lower() for c in lector.fieldnames or []]
+        return list(lector)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ValueError(f"CSV inválido: {e}")
+
+
+def leer_lote(cuerpo, tipo="application/json", modulo=None):
+    # Cuerpo de la petición -> lista de resultados {modulo, parametro, valor, ...}
+    filas = _registros_csv(cuerpo) if "csv" in tipo else _registros_json(cuerpo)
+    if modulo is not None:
+        for fila in filas:
+            fila["modulo"] = modulo
+    return filas
+
+
+# --------------------------- VALIDACIÓN --------------------------- #
+def _numero(valor):
+    if isinstance(valor, bool):
+        return None
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return numero if math.isfinite(numero) else None
+
+
+def _leer_fecha(valor, ahora):
+    if valor is None or valor == "":
+        return ahora  # sin fecha cuenta como recibido ahora, igual que en las pestañas
+    try:
+        fecha = datetime.fromisoformat(str(valor).strip())
+    except ValueError:
+        return None
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone().replace(tzinfo=None)  # hora local de planta
+    return fecha.replace(microsecond=0)
+
+
+def validar(filas, ahora=None):
+    # Cada resultado contra los límites vigentes en su fecha (la misma tabla
+    # versionada que usan las pestañas y validar_historico). Fila a fila en
+    # Python: para lotes de instrumentos es más rápido que armar un DataFrame.
+    # Devuelve, en el orden recibido, {modulo, parametro, fecha, valor, min, max, cumple, motivo}.
+    ahora = (ahora or datetime.now()).replace(microsecond=0)
+    limites = {}  # (modulo, parametro, fecha) -> límites; en un lote se repiten mucho
+    validadas = []
+    for fila in filas:
+        modulo = str(fila.get("modulo") or "").strip()
+        parametro = especificaciones.nombre_canonico(modulo, str(fila.get("parametro") or "").strip())
+        valor = _numero(fila.get("valor"))
+        fecha = _leer_fecha(fila.get("fecha"), ahora)
+        minimo = maximo = cumple = None
+        if modulo not in especificaciones.ESPECIFICACIONES:
+            motivo = "módulo desconocido"
+        elif fecha is None:
+            motivo = "fecha ilegible"
+        elif valor is None:
+            motivo = "valor no numérico"
+        else:
+            clave = (modulo, parametro, fecha)
+            if clave not in limites:
+                limites[clave] = especificaciones.limites_vigentes(modulo, parametro, fecha)
+            if limites[clave] is None:
+                motivo = "sin especificación vigente en la fecha"
+            else:
+                minimo, maximo = map(float, limites[clave])
+                cumple = minimo <= valor <= maximo
+                motivo = ""
+        validadas.append({
+            "modulo": modulo, "parametro": parametro, "fecha": fecha and fecha.strftime("%Y-%m-%d %H:%M:%S"),
+            "valor": valor, "min": minimo, "max": maximo, "cumple": cumple, "motivo": motivo,
+        })
+    return validadas
+
+
+def ingerir(almacen, filas):
+    # Valida el lote y guarda en una sola transacción los resultados con
+    # especificación; devuelve el resumen y el cumplimiento de cada fila.
+    validadas = validar(filas)
+    almacen.escribir([
+        (v["fecha"], v["modulo"], v["parametro"], v["valor"], int(v["cumple"]),
+         *(str(f.get(c) or "") for c in OPCIONALES))
+        for v, f in zip(validadas, filas) if v["cumple"] is not None
+    ])
+    guardados = sum(v["cumple"] is not None for v in validadas)
+    cumplen = sum(v["cumple"] is True for v in validadas)
+    respuesta = {
+        "recibidos": len(validadas),
+        "guardados": guardados,
+        "cumplen": cumplen,
+        "no_cumplen": guardados - cumplen,
+        "rechazados": len(validadas) - guardados,
+        "filas": validadas,
+    }
+    return respuesta
+
+
+def _especificaciones():
+    return {
+        modulo: [{"nombre": p["nombre"], "unidad": p["unidad"], "min": p["min"], "max": p["max"]} for p in params]
+        for modulo, params in especificaciones.ESPECIFICACIONES.items()
+    }
+
+
+# --------------------------- SERVIDOR --------------------------- #
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # conexiones persistentes
+    server_version = "LTSIngesta/1.0"
+    disable_nagle_algorithm = True  # encabezado y cuerpo salen en dos escrituras: sin esto cada respuesta espera ~40 ms
+
+    def _responder(self, estado, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _ruta(self):
+        return [unquote(p) for p in urlsplit(self.path).path.split("/") if p]
+
+    def _transmitir(self, tipo, nombre, bloques):
+        # Respuesta por partes (chunked): la exportación se envía a medida que se lee
+        self.send_response(200)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Disposition", f'attachment; filename="{nombre}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for bloque in bloques:
+                if bloque:
+                    self.wfile.write(b"%X\r\n%s\r\n" % (len(bloque), bloque))
+        except Exception as e:
+            # El estado ya salió: se corta sin el bloque final y el cliente ve la descarga incompleta
+            self.close_connection = True
+            self.log_error("exportación interrumpida: %s", e)
+            return
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _exportar(self):
+        from . import exportacion
+        consulta = parse_qs(urlsplit(self.path).query)
+        formato = consulta.get("formato", ["csv"])[-1]
+        modulos = consulta.get("modulo", [])
+        filtros = dict(modulo=modulos, parametro=consulta.get("parametro", []),
+                       desde=consulta.get("desde", [None])[-1], hasta=consulta.get("hasta", [None])[-1])
+        if formato not in exportacion.formatos():
+            self._responder(400, {"error": f"formato no disponible: {formato} (válidos: {', '.join(exportacion.formatos())})"})
+            return
+        desconocidos = [m for m in modulos if m not in especificaciones.ESPECIFICACIONES]
+        if desconocidos:
+            self._responder(404, {"error": f"módulo desconocido: {', '.join(desconocidos)}"})
+            return
+        try:
+            exportacion.periodo(filtros["desde"], filtros["hasta"])
+        except ValueError as e:
+            self._responder(400, {"error": f"fecha ilegible: {e}"})
+            return
+        if formato == "csv":
+            bloques = exportacion.iterar_csv(self.server.almacen, **filtros)
+        else:
+            bloques = exportacion.iterar_archivo(self.server.almacen, formato, **filtros)
+        nombre = exportacion.nombre_exportacion(formato, modulos, filtros["desde"], filtros["hasta"])
+        self._transmitir(exportacion.FORMATOS[formato], nombre, bloques)
+
+    def _alarmas(self):
+        consulta = parse_qs(urlsplit(self.path).query)
+        modulo = consulta.get("modulo", [None])[-1]
+        desde_id, limite = consulta.get("desde_id", ["0"])[-1], consulta.get("limite", [str(deriva.ULTIMAS)])[-1]
+        if not (desde_id.isdigit() and limite.isdigit()):
+            self._responder(400, {"error": "desde_id y limite deben ser enteros no negativos"})
+            return
+        if modulo is not None and modulo not in especificaciones.ESPECIFICACIONES:
+            self._responder(404, {"error": f"módulo desconocido: {modulo}"})
+            return
+        alarmas = deriva.alarmas(self.server.almacen, int(desde_id), modulo, int(limite))
+        self._responder(200, {"ultima_alarma": deriva.ultima_alarma(self.server.almacen),
+                              "alarmas": [a._asdict() for a in alarmas]})
+
+    def do_GET(self):
+        ruta = self._ruta()
+        if ruta == ["especificaciones"]:
+            self._responder(200, _especificaciones())
+        elif ruta == ["salud"]:
+            self._responder(200, {"estado": "ok"})
+        elif ruta == ["exportacion"]:
+            self._exportar()
+        elif ruta == ["alarmas"]:
+            self._alarmas()
+        else:
+            self._responder(404, {"error": f"ruta desconocida: {self.path}"})
+
+    def do_POST(self):
+        largo = self.headers.get("Content-Length", "")
+        if not largo.isdigit() or int(largo) > MAX_CUERPO:
+            self.close_connection = True  # el cuerpo queda sin leer
+            if not largo.isdigit():
+                self._responder(411, {"error": "falta Content-Length"})
+            else:
+                self._responder(413, {"error": f"el lote supera {MAX_CUERPO // (1024 * 1024)} MB"})
+            return
+        cuerpo = self.rfile.read(int(largo))
+
+        ruta = self._ruta()
+        if not ruta or ruta[0] != "resultados" or len(ruta) > 2:
+            self._responder(404, {"error": f"ruta desconocida: {self.path}"})
+            return
+        modulo = ruta[1] if len(ruta) == 2 else None
+        if modulo is not None and modulo not in especificaciones.ESPECIFICACIONES:
+            self._responder(404, {"error": f"módulo desconocido: {modulo}"})
+            return
+        try:
+            lote = leer_lote(cuerpo, self.headers.get("Content-Type", "application/json"), modulo)
+        except ValueError as e:
+            self._responder(400, {"error": str(e)})
+            return
+        try:
+            # Antes de guardar: las alarmas que dispare este lote tendrán id mayor
+            ultima = deriva.ultima_alarma(self.server.almacen)
+            respuesta = ingerir(self.server.almacen, lote)
+        except Exception as e:
+            self._responder(500, {"error": str(e)})
+            return
+        self.server.sincronizador.pedir()
+        self._responder(200, dict(respuesta, ultima_alarma=ultima))
+
+    def log_request(self, code="-", size="-"):
+        if self.server.registrar:
+            super().log_request(code, size)
+
+
+class ServidorIngesta(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, direccion, almacen, registrar=False):
+        super().__init__(direccion, _Manejador)
+        self.almacen = almacen
+        self.sincronizador = deriva.SincronizadorDeriva(almacen)
+        self.registrar = registrar  # una línea por petición en stderr
+
+    def server_close(self):
+        super().server_close()
+        self.sincronizador.detener()
+
+
+def crear_servidor(host=HOST, puerto=PUERTO, ruta_base=RUTA_BASE, registrar=False):
+    # Servidor listo para serve_forever(); puerto 0 elige uno libre (server_address[1])
+    especificaciones.precargar()
+    servidor = ServidorIngesta((host, puerto), obtener_almacen(ruta_base), registrar)
+    servidor.sincronizador.pedir()  # lo atrasado se procesa en el fondo, sin demorar el arranque
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP de ingesta de resultados de laboratorio.")
+    parser.add_argument("--host", default=HOST, help="interfaz donde escuchar (default: 127.0.0.1)")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--base", default=RUTA_BASE, help="base de resultados (default: informes/resultados.db)")
+    parser.add_argument("--registrar", action="store_true", help="mostrar cada petición")
+    args = parser.parse_args(argv)
+
+    servidor = crear_servidor(args.host, args.puerto, args.base, args.registrar)
+    print(f"Ingesta escuchando en http://{args.host}:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# ARCHIVO DE GAS NATURAL - HISTÓRICO COLUMNAR DE COMPOSICIÓN Y PROPIEDADES
+#
+# Cada muestra archivada guarda su fecha, las fracciones molares y las
+# propiedades calculadas (HHV, LHV, densidad relativa, Wobbe) en Parquet,
+# particionado por día (informes/archivo_gas/dia=AAAA-MM-DD/). Cada tanda
+# agrega un archivo nuevo por día; cuando un día junta UMBRAL_COMPACTAR
+# archivos se fusionan en uno solo, ordenado por fecha, para que las lecturas
+# no abran cientos de archivos chicos; el compactado anota los archivos que
+# reemplaza y las lecturas los ignoran aunque sigan en disco. Las lecturas
+# usan memory-map, leen solo las columnas pedidas y no listan los días fuera
+# del filtro de fechas.
+
+import json
+import os
+import time
+import uuid
+from contextlib import suppress
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from .cromatografia import COMPONENTES
+
+RAIZ_ARCHIVO = os.path.join("informes", "archivo_gas")
+
+# Columnas de resultados de cromatografia -> nombres cortos en el archivo
+PROPIEDADES = {
+    "HHV (MJ/m³)": "hhv",
+    "LHV (MJ/m³)": "lhv",
+    "Densidad relativa": "densidad_relativa",
+    "Índice de Wobbe (MJ/m³)": "wobbe",
+}
+
+ESQUEMA = pa.schema(
+    [("fecha", pa.timestamp("ms")), ("muestra", pa.string())]
+    + [(c, pa.float64()) for c in COMPONENTES]
+    + [(c, pa.float64()) for c in PROPIEDADES.values()]
+)
+PARTICIONES = ds.partitioning(pa.schema([("dia", pa.string())]), flavor="hive")
+UMBRAL_COMPACTAR = 16  # archivos en un día a partir de los cuales se fusionan
+BLOQUEO = ".compactando"  # dentro de la carpeta del día, mientras se compacta
+VENCIMIENTO_BLOQUEO = 600  # segundos: un bloqueo más viejo quedó de un corte
+
+
+def _como_fechas(muestras):
+    # "mixed" acepta casi cualquier texto ("M1" es el año 1): se exige un año plausible
+    fechas = pd.to_datetime(muestras, errors="coerce", format="mixed")
+    return fechas if fechas.notna().all() and (fechas.dt.year >= 1970).all() else None
+
+
+def fechas_muestras(resultados, fecha=None):
+    # Fecha de cada muestra: el índice cuando es una marca de tiempo (el
+    # cromatógrafo en línea nombra así las muestras); si no, fecha o ahora
+    indice = resultados.index.to_series()
+    # Se prueba con la primera muestra antes de interpretar todo el índice (fecha por fecha es lento)
+    if len(indice) and _como_fechas(indice.iloc[:1]) is not None:
+        fechas = _como_fechas(indice)
+        if fechas is not None:
+            return fechas.to_numpy()
+    return pd.Series(pd.Timestamp(fecha or datetime.now()), index=resultados.index).to_numpy()
+
+
+def _partes(carpeta):
+    # Archivos visibles del día (los que empiezan con "." son temporales o el bloqueo)
+    return sorted(n for n in os.listdir(carpeta) if n.endswith(".parquet") and not n.startswith("."))
+
+
+_REEMPLAZA = {}  # ruta de un compactado -> archivos que reemplaza (un compactado no cambia)
+
+
+def _reemplazados(carpeta, partes):
+    # Archivos del día que un compactado ya publicado reemplaza: entre publicarlo
+    # y borrarlos (o si un corte lo impidió) siguen visibles y quedarían duplicados
+    viejos = set()
+    for nombre in partes:
+        if nombre.startswith("compacto-"):
+            ruta = os.path.join(carpeta, nombre)
+            if ruta not in _REEMPLAZA:
+                metadatos = pq.read_schema(ruta).metadata or {}
+                _REEMPLAZA[ruta] = json.loads(metadatos.get(b"reemplaza", b"[]"))
+            viejos.update(_REEMPLAZA[ruta])
+    return viejos
+
+
+def _terminar_compactaciones(carpeta):
+    for viejo in _reemplazados(carpeta, _partes(carpeta)):
+        with suppress(FileNotFoundError):
+            os.remove(os.path.join(carpeta, viejo))
+
+
+class ArchivoGas:
+    def __init__(self, raiz=RAIZ_ARCHIVO, umbral_compactar=UMBRAL_COMPACTAR):
+        self.raiz = raiz
+        self.umbral_compactar = umbral_compactar
+        self._fs = fs.LocalFileSystem(use_mmap=True)
+
+    def agregar(self, resultados, fecha=None):
+        # resultados: salida de cromatografia.calcular_lote(..., composicion=True).
+        # La fecha de cada muestra sale de la columna "fecha", si existe; si no, del
+        # índice cuando es una marca de tiempo; si no, del argumento o de ahora.
+        tabla = resultados.rename(columns=PROPIEDADES).reset_index()
+        if "fecha" not in tabla:
+            tabla["fecha"] = fechas_muestras(resultados, fecha)
+        tabla["fecha"] = pd.to_datetime(tabla["fecha"]).astype("datetime64[ms]")
+        tabla["muestra"] = tabla["muestra"].astype(str)
+        for columna in ESQUEMA.names:
+            if columna not in tabla:
+                tabla[columna] = float("nan")
+
+        escritos = 0
+        for dia, grupo in tabla.groupby(tabla["fecha"].dt.strftime("%Y-%m-%d")):
+            carpeta = os.path.join(self.raiz, f"dia={dia}")
+            os.makedirs(carpeta, exist_ok=True)
+            nombre = f"parte-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+            temporal = os.path.join(carpeta, f".{nombre}.tmp")
+            pq.write_table(
+                pa.Table.from_pandas(grupo[ESQUEMA.names], schema=ESQUEMA, preserve_index=False),
+                temporal, compression="zstd",
+            )
+            os.replace(temporal, os.path.join(carpeta, nombre))  # nunca queda un archivo a medio escribir
+            escritos += len(grupo)
+            self._compactar_dia(carpeta, self.umbral_compactar)
+        return escritos
+
+    def compactar(self, umbral=1):
+        # Fusiona en un solo archivo cada día con al menos umbral archivos (1 = todos
+        # los días con más de uno); devuelve los días compactados
+        if not os.path.isdir(self.raiz):
+            return []
+        dias = sorted(n for n in os.listdir(self.raiz) if n.startswith("dia="))
+        return [d.removeprefix("dia=") for d in dias if self._compactar_dia(os.path.join(self.raiz, d), max(umbral, 2))]
+
+    def _compactar_dia(self, carpeta, umbral):
+        bloqueo = os.path.join(carpeta, BLOQUEO)
+        try:
+            os.close(os.open(bloqueo, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            # Otro proceso (p. ej. otro trabajador de vigilancia) compacta este día
+            with suppress(OSError):
+                if time.time() - os.path.getmtime(bloqueo) > VENCIMIENTO_BLOQUEO:
+                    os.remove(bloqueo)  # quedó de un corte: se compacta en la próxima tanda
+            return False
+        try:
+            _terminar_compactaciones(carpeta)
+            partes = _partes(carpeta)
+            if len(partes) < umbral:
+                return False
+            tabla = pa.concat_tables(pq.ParquetFile(os.path.join(carpeta, p)).read() for p in partes)
+            tabla = tabla.sort_by("fecha").replace_schema_metadata({"reemplaza": json.dumps(partes)})
+            nombre = f"compacto-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+            temporal = os.path.join(carpeta, f".{nombre}.tmp")
+            pq.write_table(tabla, temporal, compression="zstd")
+            os.replace(temporal, os.path.join(carpeta, nombre))
+            for parte in partes:
+                os.remove(os.path.join(carpeta, parte))
+            return True
+        finally:
+            os.remove(bloqueo)
+
+    def _archivos(self, desde=None, hasta=None):
+        # Archivos vigentes de los días entre desde y hasta (AAAA-MM-DD), sin los
+        # que reemplaza un compactado ya publicado
+        rutas = []
+        for dia in sorted(os.listdir(self.raiz)):
+            fecha = dia.removeprefix("dia=")
+            if fecha == dia or (desde and fecha < desde) or (hasta and fecha > hasta):
+                continue
+            carpeta = os.path.join(self.raiz, dia)
+            partes = _partes(carpeta)
+            viejos = _reemplazados(carpeta, partes)
+            rutas += [os.path.join(carpeta, p) for p in partes if p not in viejos]
+        return rutas
+
+    def _dataset(self, desde=None, hasta=None):
+        return ds.dataset(
+            self._archivos(desde, hasta), schema=ESQUEMA.append(pa.field("dia", pa.string())), format="parquet",
+            partitioning=PARTICIONES, partition_base_dir=self.raiz, filesystem=self._fs,
+        )
+
+    def leer(self, desde=None, hasta=None, columnas=None):
+        # columnas: subconjunto de ESQUEMA (p. ej. ["wobbe"]); "fecha" siempre se incluye
+        if not os.path.isdir(self.raiz):
+            return pd.DataFrame(columns=["fecha"] + list(columnas or ESQUEMA.names[1:]))
+        filtro = dia_desde = dia_hasta = None
+        if desde is not None:
+            desde = pd.Timestamp(desde)
+            dia_desde = desde.strftime("%Y-%m-%d")
+            filtro = ds.field("fecha") >= pa.scalar(desde, pa.timestamp("ms"))
+        if hasta is not None:
+            hasta = pd.Timestamp(hasta)
+            dia_hasta = hasta.strftime("%Y-%m-%d")
+            condicion = ds.field("fecha") <= pa.scalar(hasta, pa.timestamp("ms"))
+            filtro = condicion if filtro is None else filtro & condicion
+        columnas = ["fecha"] + [c for c in (columnas or ESQUEMA.names) if c != "fecha"]
+        for intento in range(3):
+            try:
+                tabla = self._dataset(dia_desde, dia_hasta).to_table(columns=columnas, filter=filtro)
+                break
+            except FileNotFoundError:
+                # Una compactación borró un archivo entre el listado y la lectura
+                if intento == 2:
+                    raise
+        return tabla.to_pandas().sort_values("fecha", kind="stable").reset_index(drop=True)
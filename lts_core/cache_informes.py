@@ -0,0 +1,87 @@
+# CACHÉ DE INFORMES - PDF MEMORIZADOS POR CONTENIDO
+#
+# La clave es un hash del módulo, los resultados, el operador, las
+# observaciones y la fecha del encabezado (al minuto, como se imprime):
+# pedir dos veces el mismo informe (clics repetidos o reruns de Streamlit)
+# devuelve los mismos bytes sin volver a armar el PDF, y nunca un informe
+# con la fecha de otro momento.
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from . import perfilado
+from .informes_pdf import construir_pdf
+
+MAX_BYTES = 64 * 1024 * 1024  # tope de memoria de la caché
+MAX_INFORMES = 512
+
+
+class CacheLRU:
+    def __init__(self, max_bytes=MAX_BYTES, max_elementos=MAX_INFORMES):
+        self.max_bytes = max_bytes
+        self.max_elementos = max_elementos
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._datos)
+
+    def obtener(self, clave):
+        with self._lock:
+            datos = self._datos.get(clave)
+            if datos is None:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return datos
+
+    def guardar(self, clave, datos):
+        if len(datos) > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._datos.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior)
+            self._datos[clave] = datos
+            self.bytes += len(datos)
+            while self.bytes > self.max_bytes or len(self._datos) > self.max_elementos:
+                _, descartado = self._datos.popitem(last=False)
+                self.bytes -= len(descartado)
+
+    def obtener_o_generar(self, clave, generar):
+        datos = self.obtener(clave)
+        if datos is None:
+            # Se genera fuera del lock: otro informe puede servirse mientras tanto
+            datos = generar()
+            self.guardar(clave, datos)
+        return datos
+
+
+def clave_informe(modulo, **datos):
+    contenido = json.dumps([modulo, datos], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+
+informes = CacheLRU()
+
+
+@perfilado.cronometrado("pdf.informe")
+def informe_pdf(modulo, operador, explicacion, resultados, observaciones, muestreo_en=None, muestra_por=None,
+                fecha=None):
+    # fecha: la del encabezado (por defecto, ahora); el PDF la imprime al minuto
+    fecha = (fecha or datetime.now()).replace(second=0, microsecond=0)
+    clave = clave_informe(
+        modulo, operador=operador, explicacion=explicacion, resultados=resultados,
+        observaciones=observaciones, muestreo_en=muestreo_en, muestra_por=muestra_por, fecha=fecha,
+    )
+    return informes.obtener_o_generar(
+        clave,
+        lambda: construir_pdf(operador, explicacion, resultados, observaciones, muestreo_en, muestra_por, fecha=fecha),
+    )
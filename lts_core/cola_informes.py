@@ -0,0 +1,130 @@
+# COLA DE INFORMES - GENERACIÓN DE PDF EN SEGUNDO PLANO
+#
+# Las apps encolan el informe y siguen respondiendo; un grupo de hilos
+# compartido por todas las sesiones lo arma y lo guarda en la carpeta del
+# módulo (informes/<modulo>/) con escritura atómica. Cada trabajo tiene un id
+# y un estado ("en cola", "generando", "listo", "error") que la interfaz
+# consulta para mostrar el avance y el enlace de descarga.
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from .recursos import CARPETA_INFORMES, carpeta_modulo, nombre_seguro
+
+MAX_HILOS = 4
+MAX_TRABAJOS = 2000  # trabajos terminados que se recuerdan antes de olvidar los más viejos
+
+EN_COLA, GENERANDO, LISTO, ERROR = "en cola", "generando", "listo", "error"
+
+
+class Trabajo:
+    __slots__ = ("id", "descripcion", "ruta", "estado", "error", "creado", "terminado", "avance")
+
+    def __init__(self, descripcion, ruta):
+        self.id = uuid.uuid4().hex
+        self.descripcion = descripcion
+        self.ruta = ruta
+        self.estado = EN_COLA
+        self.error = ""
+        self.creado = time.time()
+        self.terminado = None
+        self.avance = None  # fracción hecha (0 a 1), si el trabajo la informa
+
+    @property
+    def nombre(self):
+        return os.path.basename(self.ruta)
+
+    @property
+    def pendiente(self):
+        return self.estado in (EN_COLA, GENERANDO)
+
+
+class ColaInformes:
+    def __init__(self, max_hilos=MAX_HILOS):
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="informes")
+        self._trabajos = {}
+        self._lock = threading.Lock()
+
+    def enviar(self, descripcion, ruta, generar, con_avance=False):
+        # generar(ruta_temporal) escribe el informe; se ejecuta en un hilo del grupo.
+        # Con con_avance=True se llama generar(ruta_temporal, avance) y avance(fracción)
+        # actualiza trabajo.avance.
+        trabajo = Trabajo(descripcion, ruta)
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+            self._olvidar_viejos()
+        self._pool.submit(self._ejecutar, trabajo, generar, con_avance)
+        return trabajo.id
+
+    def _ejecutar(self, trabajo, generar, con_avance=False):
+        trabajo.estado = GENERANDO
+        temporal = f"{trabajo.ruta}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(os.path.dirname(trabajo.ruta) or ".", exist_ok=True)
+            if con_avance:
+                trabajo.avance = 0.0
+                generar(temporal, lambda fraccion: setattr(trabajo, "avance", fraccion))
+            else:
+                generar(temporal)
+            os.replace(temporal, trabajo.ruta)  # nunca queda un informe a medio escribir
+            trabajo.estado = LISTO
+        except Exception as e:
+            trabajo.error = str(e)
+            trabajo.estado = ERROR
+            if os.path.exists(temporal):
+                os.remove(temporal)
+        trabajo.terminado = time.time()
+
+    def _olvidar_viejos(self):
+        if len(self._trabajos) <= MAX_TRABAJOS:
+            return
+        for id_ in [t.id for t in self._trabajos.values() if not t.pendiente][:len(self._trabajos) - MAX_TRABAJOS]:
+            del self._trabajos[id_]
+
+    def trabajo(self, id_):
+        return self._trabajos.get(id_)
+
+    def trabajos(self, ids):
+        return [t for t in map(self._trabajos.get, ids) if t is not None]
+
+    def pendientes(self):
+        with self._lock:
+            return sum(t.pendiente for t in self._trabajos.values())
+
+
+def nombre_archivo(prefijo, fecha=None, extension="pdf"):
+    # <prefijo>_<AAAAMMDD_HHMMSS>_<8 hex>.<extension>: único aunque dos sesiones pidan
+    # el mismo informe en el mismo segundo. Del prefijo (que puede traer el nombre del
+    # operador) quedan solo letras, dígitos, "_" y "-": no puede salir de la carpeta.
+    prefijo = nombre_seguro(prefijo)
+    return f"{prefijo}_{fecha or datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}.{extension}"
+
+
+def enviar_informe(cola, modulo, prefijo, datos, raiz=CARPETA_INFORMES):
+    # Informe de un análisis (mismo contenido que cache_informes.informe_pdf) en
+    # informes/<modulo>/<prefijo>_<fecha>_<id>.pdf, con la fecha del pedido en el encabezado
+    from . import cache_informes  # FPDF se carga recién cuando se pide el primer informe
+    fecha = datetime.now()
+    nombre = nombre_archivo(prefijo, fecha)
+    return cola.enviar(
+        f"{modulo} - {nombre}", os.path.join(carpeta_modulo(modulo, raiz), nombre),
+        lambda temporal: Path(temporal).write_bytes(cache_informes.informe_pdf(modulo, fecha=fecha, **datos)),
+    )
+
+
+_cola = None
+_lock_cola = threading.Lock()
+
+
+def obtener_cola():
+    # Cola compartida por todas las sesiones del proceso
+    global _cola
+    with _lock_cola:
+        if _cola is None:
+            _cola = ColaInformes()
+        return _cola
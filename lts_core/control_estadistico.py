@@ -0,0 +1,215 @@
+# CONTROL ESTADÍSTICO - CARTAS SHEWHART/EWMA INCREMENTALES Y SUBMUESTREO LTTB
+#
+# Las estadísticas de cada parámetro (media y varianza por Welford, EWMA) se
+# actualizan en O(1) con cada resultado nuevo: al volver a abrir la pestaña
+# de tendencias solo se leen del almacén los resultados posteriores al último
+# procesado. Los límites de control salen de una línea base fija (los
+# primeros MUESTRAS_BASE resultados por fecha), no de toda la historia: los
+# puntos que se juzgan no corren sus propios límites. La serie se mantiene en
+# orden de fecha: un resultado cargado tarde con una fecha anterior a la
+# última la reordena una vez y recalcula la línea base y la EWMA. Se guarda
+# en arreglos compactos (8 bytes por dato) y, para graficar, se reduce con
+# LTTB una sola vez por cada estado de la serie.
+
+import math
+import threading
+from array import array
+from datetime import datetime
+
+LAMBDA_EWMA = 0.2
+L_EWMA = 3.0  # ancho de los límites EWMA, en desvíos
+PUNTOS_GRAFICO = 1500
+MUESTRAS_BASE = 100  # resultados que fijan la línea central y el desvío de los límites
+_EPOCA = datetime(1970, 1, 1)
+
+
+class EstadisticaIncremental:
+    # Media y varianza acumuladas (algoritmo de Welford)
+    __slots__ = ("n", "media", "_m2")
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self._m2 = 0.0
+
+    def agregar(self, x):
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self._m2 += delta * (x - self.media)
+
+    def fusionar(self, n, media, m2):
+        # Incorpora de una vez otro grupo de datos ya resumido (Chan et al.)
+        if n:
+            total = self.n + n
+            delta = media - self.media
+            self.media += delta * n / total
+            self._m2 += m2 + delta * delta * self.n * n / total
+            self.n = total
+
+    def estado(self):
+        # (n, media, m2): alcanza para guardarla y retomarla después
+        return self.n, self.media, self._m2
+
+    @classmethod
+    def desde_estado(cls, n, media, m2):
+        estadistica = cls()
+        estadistica.n, estadistica.media, estadistica._m2 = n, media, m2
+        return estadistica
+
+    @property
+    def varianza(self):
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desvio(self):
+        return math.sqrt(self.varianza)
+
+
+class SerieControl:
+    def __init__(self, lambda_ewma=LAMBDA_EWMA, l_ewma=L_EWMA):
+        self.lambda_ewma = lambda_ewma
+        self.l_ewma = l_ewma
+        self.estadistica = EstadisticaIncremental()  # de toda la serie (resumen)
+        self.base = EstadisticaIncremental()  # de la línea base (límites)
+        self.ewma = None
+        self.fechas = array("q")  # segundos desde 1970
+        self.valores = array("d")
+        self.ewmas = array("d")
+        self.ultimo_id = 0
+        self.lock = threading.Lock()
+        self._tabla = None  # (ultimo_id, max_puntos, DataFrame) de la última tabla armada
+
+    def agregar(self, fecha, valor):
+        # fecha: datetime o texto ISO, como la guarda el almacén
+        if isinstance(fecha, str):
+            fecha = datetime.fromisoformat(fecha)
+        self.estadistica.agregar(valor)
+        if self.base.n < MUESTRAS_BASE:
+            self.base.agregar(valor)
+        self.ewma = valor if self.ewma is None else self.lambda_ewma * valor + (1 - self.lambda_ewma) * self.ewma
+        segundos = int((fecha - _EPOCA).total_seconds())
+        atrasado = bool(self.fechas) and segundos < self.fechas[-1]
+        self.fechas.append(segundos)
+        self.valores.append(valor)
+        self.ewmas.append(self.ewma)
+        if atrasado:
+            self._reordenar()
+
+    def agregar_lote(self, fechas, valores):
+        # Igual que agregar, para una página del almacén: las fechas se
+        # convierten todas juntas y el bucle solo actualiza las estadísticas
+        import numpy as np
+        segundos = np.array(fechas, dtype="datetime64[us]").astype(np.int64) // 1_000_000
+        datos = np.asarray(valores, dtype=float)
+        media = datos.mean()
+        self.estadistica.fusionar(len(datos), media, float(((datos - media) ** 2).sum()))
+        for valor in valores[:max(MUESTRAS_BASE - self.base.n, 0)]:
+            self.base.agregar(valor)
+        self._extender_ewma(valores)
+        atrasado = (bool(self.fechas) and segundos[0] < self.fechas[-1]) or bool((np.diff(segundos) < 0).any())
+        self.fechas.extend(segundos.tolist())
+        self.valores.extend(valores)
+        if atrasado:
+            self._reordenar()
+
+    def _extender_ewma(self, valores):
+        ewma, lam, ewmas = self.ewma, self.lambda_ewma, self.ewmas
+        for valor in valores:
+            ewma = valor if ewma is None else lam * valor + (1 - lam) * ewma
+            ewmas.append(ewma)
+        self.ewma = ewma
+
+    def _reordenar(self):
+        # Llegaron fechas anteriores a la última: orden de fecha (los empates,
+        # en orden de carga), línea base con los primeros por fecha y EWMA de nuevo
+        import numpy as np
+        fechas = np.array(self.fechas, dtype=np.int64)
+        orden = np.argsort(fechas, kind="stable")
+        valores = np.array(self.valores, dtype=float)[orden].tolist()
+        self.fechas = array("q", fechas[orden].tolist())
+        self.valores = array("d", valores)
+        self.base = EstadisticaIncremental()
+        for valor in valores[:MUESTRAS_BASE]:
+            self.base.agregar(valor)
+        self.ewma, self.ewmas = None, array("d")
+        self._extender_ewma(valores)
+
+    @property
+    def base_completa(self):
+        # Mientras no haya MUESTRAS_BASE resultados, los límites son provisorios
+        return self.base.n >= MUESTRAS_BASE
+
+    def limites_shewhart(self):
+        media, desvio = self.base.media, self.base.desvio
+        return media - 3 * desvio, media, media + 3 * desvio
+
+    def limites_ewma(self):
+        media, desvio = self.base.media, self.base.desvio
+        ancho = self.l_ewma * desvio * math.sqrt(self.lambda_ewma / (2 - self.lambda_ewma))
+        return media - ancho, media, media + ancho
+
+    def tabla(self, max_puntos=PUNTOS_GRAFICO):
+        # Serie lista para graficar, reducida a max_puntos con LTTB; se arma de
+        # nuevo solo si llegaron resultados desde la última vez
+        with self.lock:
+            if self._tabla is None or self._tabla[:2] != (self.ultimo_id, max_puntos):
+                self._tabla = (self.ultimo_id, max_puntos, self._armar_tabla(max_puntos))
+            return self._tabla[2]
+
+    def _armar_tabla(self, max_puntos):
+        import numpy as np
+        import pandas as pd
+        # Copias (np.array), no vistas: un arreglo con vistas vivas no admite append
+        valores = np.array(self.valores, dtype=float)
+        indices = lttb(valores, max_puntos)
+        lci, lc, lcs = self.limites_shewhart()
+        lci_ewma, _, lcs_ewma = self.limites_ewma()
+        return pd.DataFrame({
+            "Valor": valores[indices],
+            "EWMA": np.array(self.ewmas, dtype=float)[indices],
+            "LC": lc, "LCS": lcs, "LCI": lci,
+            "LCS EWMA": lcs_ewma, "LCI EWMA": lci_ewma,
+        }, index=pd.DatetimeIndex(np.array(self.fechas, dtype=np.int64)[indices].astype("datetime64[s]"), name="Fecha"))
+
+
+def lttb(valores, umbral):
+    # Largest-Triangle-Three-Buckets: índices de los puntos a conservar para que
+    # la serie reducida mantenga la forma (picos incluidos) de la original.
+    import numpy as np
+    n = len(valores)
+    if umbral >= n or umbral < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float)
+    bordes = np.linspace(1, n - 1, umbral - 1).astype(int)
+    elegidos = np.empty(umbral, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(umbral - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        siguiente = slice(fin, bordes[i + 2] if i + 2 < len(bordes) else n)
+        x_medio, y_medio = x[siguiente].mean(), valores[siguiente].mean()
+        xs, ys = x[inicio:fin], valores[inicio:fin]
+        areas = np.abs((x[anterior] - x_medio) * (ys - valores[anterior]) - (x[anterior] - xs) * (y_medio - valores[anterior]))
+        anterior = inicio + int(np.argmax(areas))
+        elegidos[i + 1] = anterior
+    return elegidos
+
+
+_series = {}
+_lock_series = threading.Lock()
+
+
+def serie_parametro(almacen, modulo, parametro):
+    # Serie de control compartida por todas las sesiones; solo incorpora lo nuevo
+    clave = (almacen.ruta, modulo, parametro)
+    with _lock_series:
+        serie = _series.setdefault(clave, SerieControl())
+    with serie.lock:
+        while filas := almacen.nuevos_desde(modulo, parametro, serie.ultimo_id):
+            validas = [(fecha, valor) for _, fecha, valor in filas if valor is not None]
+            if validas:
+                fechas, valores = zip(*validas)
+                serie.agregar_lote(fechas, valores)
+            serie.ultimo_id = filas[-1][0]
+    return serie
@@ -0,0 +1,217 @@
+# CROMATOGRAFÍA - MOTOR VECTORIZADO DE PROPIEDADES DEL GAS NATURAL
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import perfilado
+
+# --------------------------- PROPIEDADES POR COMPONENTE --------------------------- #
+# Poder calorífico superior (MJ/m³) y densidad relativa al aire (GPA 2145)
+PROPIEDADES = {
+    "Methane": (39.8, 0.55),
+    "Ethane": (70.6, 1.04),
+    "Propane": (101.0, 1.52),
+    "i-Butane": (131.6, 2.00),
+    "n-Butane": (131.6, 2.01),
+    "i-Pentane": (161.9, 2.49),
+    "n-Pentane": (161.9, 2.51),
+    "Hexane": (192.2, 3.00),
+    "Nitrogen": (0.0, 0.97),
+    "CO2": (0.0, 1.52),
+}
+
+# Nombres alternativos que aparecen en los exportes del cromatógrafo
+ALIAS = {
+    "Methane": ["C1", "CH4", "Metano"],
+    "Ethane": ["C2", "C2H6", "Etano"],
+    "Propane": ["C3", "C3H8", "Propano"],
+    "i-Butane": ["iC4", "i-C4", "Isobutane", "Isobutano", "i-Butano"],
+    "n-Butane": ["nC4", "n-C4", "Butane", "Butano", "n-Butano"],
+    "i-Pentane": ["iC5", "i-C5", "Isopentane", "Isopentano", "i-Pentano"],
+    "n-Pentane": ["nC5", "n-C5", "Pentane", "Pentano", "n-Pentano"],
+    "Hexane": ["C6", "C6+", "n-Hexane", "Hexano", "n-Hexano"],
+    "Nitrogen": ["N2", "Nitrógeno", "Nitrogeno"],
+    "CO2": ["Carbon Dioxide", "Dióxido de carbono", "Dioxido de carbono", "CO₂"],
+}
+
+CORRECCION_LHV = 2.5  # MJ/m³, aproximación para gas seco
+
+COLUMNAS_RESULTADO = [
+    "HHV (MJ/m³)",
+    "LHV (MJ/m³)",
+    "Densidad relativa",
+    "Índice de Wobbe (MJ/m³)",
+]
+
+# Encabezados que identifican la columna de muestra en la tabla larga
+COLUMNAS_MUESTRA = {"muestra", "sample", "id", "id_muestra", "analisis", "análisis"}
+
+# Índice precalculado: nombre normalizado -> columna de la matriz de propiedades
+COMPONENTES = list(PROPIEDADES)
+MATRIZ_PROPIEDADES = np.array([PROPIEDADES[c] for c in COMPONENTES], dtype=float)
+_INDICE = {}
+for _i, _c in enumerate(COMPONENTES):
+    for _nombre in [_c] + ALIAS.get(_c, []):
+        _INDICE[_nombre.strip().lower()] = _i
+
+
+def _factorizar_componentes(nombres):
+    # (código por fila, nombres distintos, posición en MATRIZ_PROPIEDADES de cada nombre distinto).
+    # Cada nombre se resuelve una vez, no una vez por fila.
+    nombres = pd.Series(nombres)
+    if isinstance(nombres.dtype, pd.CategoricalDtype):
+        # Columna categórica: las categorías ya son los nombres distintos (código -1 = vacío)
+        codigos = nombres.cat.codes.to_numpy()
+        unicos = list(nombres.cat.categories.astype(str).str.strip()) + [""]
+    else:
+        codigos, unicos = pd.factorize(nombres.astype("object").astype(str).str.strip())
+        unicos = list(unicos)
+    posiciones = np.array([_INDICE.get(n.lower(), -1) for n in unicos], dtype=np.int64)
+    return codigos, unicos, posiciones
+
+
+def indice_componentes(nombres):
+    # Devuelve la posición de cada componente en MATRIZ_PROPIEDADES (-1 si es desconocido)
+    codigos, _, posiciones = _factorizar_componentes(nombres)
+    return posiciones[codigos] if len(codigos) else np.empty(0, dtype=np.int64)
+
+
+def matriz_composicion(muestras, componentes, fracciones):
+    # Arma la matriz muestras x componentes a partir de una tabla larga.
+    # Devuelve (índice de muestras, matriz de fracciones, componentes desconocidos por muestra).
+    fracciones = pd.to_numeric(pd.Series(fracciones), errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    codigos_muestra, muestras_unicas = pd.factorize(pd.Series(muestras), sort=False)
+    codigos_componente, nombres, posiciones_unicas = _factorizar_componentes(componentes)
+    posiciones = posiciones_unicas[codigos_componente]
+
+    matriz = np.zeros((len(muestras_unicas), len(COMPONENTES)))
+    conocidos = posiciones >= 0
+    np.add.at(matriz, (codigos_muestra[conocidos], posiciones[conocidos]), fracciones[conocidos])
+
+    desconocidos = {}
+    if not conocidos.all():
+        etiquetas = list(muestras_unicas)
+        pares = zip(codigos_muestra[~conocidos].tolist(), codigos_componente[~conocidos].tolist())
+        for muestra, componente in dict.fromkeys(pares):
+            desconocidos.setdefault(etiquetas[muestra], []).append(nombres[componente])
+    return pd.Index(muestras_unicas, name="muestra"), matriz, desconocidos
+
+
+def propiedades_desde_matriz(matriz):
+    # HHV y densidad relativa en un único producto matricial; LHV y Wobbe derivados
+    hhv, dens_rel = (np.atleast_2d(matriz) @ MATRIZ_PROPIEDADES).T
+    lhv = hhv - CORRECCION_LHV
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wobbe = np.where(dens_rel > 0, hhv / np.sqrt(dens_rel), np.nan)
+    return np.column_stack([hhv, lhv, dens_rel, wobbe])
+
+
+def calcular_lote(df, col_muestra="muestra", col_componente="componente", col_fraccion="fraccion", composicion=False):
+    # Calcula HHV, LHV, densidad relativa y Wobbe para todas las muestras de una tabla larga.
+    # Con composicion=True agrega también la fracción molar de cada componente conocido.
+    with perfilado.etapa("cromatografia.composicion"):
+        indice, matriz, desconocidos = matriz_composicion(df[col_muestra], df[col_componente], df[col_fraccion])
+    with perfilado.etapa("cromatografia.propiedades"):
+        return _tabla_resultados(indice, matriz, desconocidos, composicion)
+
+
+def _tabla_resultados(indice, matriz, desconocidos, composicion=False):
+    resultados = pd.DataFrame(propiedades_desde_matriz(matriz), index=indice, columns=COLUMNAS_RESULTADO)
+    resultados["Componentes no reconocidos"] = [", ".join(desconocidos.get(m, [])) for m in indice]
+    if composicion:
+        resultados[COMPONENTES] = matriz
+    return resultados
+
+
+def _columna_muestra(columnas):
+    return next((c for c in columnas if c.strip().lower() in COLUMNAS_MUESTRA), None)
+
+
+def leer_cromatograma(archivo):
+    # Acepta el formato de una sola muestra (componente, fracción) o la tabla larga
+    # del cromatógrafo en línea con una columna de muestra (muestra, componente, fracción).
+    with perfilado.etapa("pd.read_csv"):
+        df = pd.read_csv(archivo)
+    df.columns = [c.strip() for c in df.columns]
+    col_muestra = _columna_muestra(df.columns)
+    if col_muestra is None:
+        df = df.iloc[:, :2].set_axis(["componente", "fraccion"], axis=1)
+        df.insert(0, "muestra", "Muestra 1")
+        return df
+    otras = [c for c in df.columns if c != col_muestra][:2]
+    return df[[col_muestra] + otras].set_axis(["muestra", "componente", "fraccion"], axis=1)
+
+
+# --------------------------- LECTURA POR BLOQUES --------------------------- #
+# Para exportes continuos del cromatógrafo (semanas de datos): el archivo se
+# lee de a bloques con tipos fijos y nombres categóricos, y por muestra solo
+# se guarda la composición acumulada. La memoria depende de la cantidad de
+# muestras, no del tamaño del archivo.
+TAMANO_BLOQUE = 200_000  # filas por bloque
+
+
+class AcumuladorComposicion:
+    def __init__(self):
+        self.indice = {}
+        self.matriz = np.zeros((1024, len(COMPONENTES)))
+        self.desconocidos = {}
+
+    def sumar(self, muestras, matriz, desconocidos):
+        filas = np.array([self.indice.setdefault(m, len(self.indice)) for m in muestras], dtype=np.int64)
+        if len(self.indice) > len(self.matriz):
+            nueva = np.zeros((max(2 * len(self.matriz), len(self.indice)), len(COMPONENTES)))
+            nueva[:len(self.matriz)] = self.matriz
+            self.matriz = nueva
+        self.matriz[filas] += matriz  # las muestras de un bloque son únicas
+        for muestra, nombres in desconocidos.items():
+            previos = self.desconocidos.setdefault(muestra, [])
+            previos.extend(n for n in nombres if n not in previos)
+
+    def resultados(self, composicion=False):
+        indice = pd.Index(list(self.indice), name="muestra")
+        return _tabla_resultados(indice, self.matriz[:len(indice)], self.desconocidos, composicion)
+
+
+def _tamano(archivo):
+    if hasattr(archivo, "size"):
+        return archivo.size
+    if isinstance(archivo, (str, os.PathLike)):
+        return os.path.getsize(archivo)
+    return None
+
+
+def calcular_por_bloques(archivo, tamano_bloque=TAMANO_BLOQUE, progreso=None, composicion=False):
+    # Igual que calcular_lote(leer_cromatograma(archivo)) sin cargar el archivo entero.
+    # progreso(filas_leidas, fracción del archivo o None) se llama después de cada bloque.
+    columnas = list(pd.read_csv(archivo, nrows=0).columns)
+    if hasattr(archivo, "seek"):
+        archivo.seek(0)
+    col_muestra = _columna_muestra(columnas)
+    if col_muestra is None:
+        usecols = [0, 1]
+        nombres = ["componente", "fraccion"]
+    else:
+        posicion = columnas.index(col_muestra)
+        usecols = [posicion] + [i for i in range(len(columnas)) if i != posicion][:2]
+        nombres = ["muestra", "componente", "fraccion"]
+    tipos = {"muestra": "category", "componente": "category", "fraccion": "float64"}
+
+    tamano = _tamano(archivo)
+    acumulador = AcumuladorComposicion()
+    filas = 0
+    lector = pd.read_csv(
+        archivo, header=0, usecols=usecols, names=[n for _, n in sorted(zip(usecols, nombres))],
+        dtype=tipos, chunksize=tamano_bloque,
+    )
+    for bloque in perfilado.iterar("pd.read_csv", lector):
+        muestras = bloque["muestra"] if "muestra" in bloque else pd.Series("Muestra 1", index=bloque.index)
+        with perfilado.etapa("cromatografia.composicion"):
+            acumulador.sumar(*matriz_composicion(muestras, bloque["componente"], bloque["fraccion"]))
+        filas += len(bloque)
+        if progreso:
+            leido = archivo.tell() if hasattr(archivo, "tell") else None
+            progreso(filas, min(leido / tamano, 1.0) if leido is not None and tamano else None)
+    with perfilado.etapa("cromatografia.propiedades"):
+        return acumulador.resultados(composicion)
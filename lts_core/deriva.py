@@ -0,0 +1,374 @@
+# DERIVA - ALARMAS CUSUM/EWMA SOBRE LOS RESULTADOS QUE VAN LLEGANDO
+#
+# Uso:
+#   python -m lts_core.deriva [--base informes/resultados.db]   (pone al día el motor y lista las últimas alarmas)
+#
+# El control por rango solo avisa cuando un valor ya está fuera de
+# especificación. Este detector mantiene, por módulo y parámetro, un estado
+# de tamaño fijo (línea base, CUSUM alto/bajo y EWMA) que se actualiza con
+# cada resultado nuevo y dispara una alarma cuando el proceso se corre de su
+# línea base, normalmente mucho antes de cruzar el límite.
+#
+# Estado, último id procesado y alarmas viven en la misma base que los
+# resultados (tablas deriva_estado, deriva_avance y alarmas): cada proceso
+# que escribe resultados (las apps, la API de ingesta, la carpeta vigilada)
+# sincroniza el motor después de escribir (la API, en un hilo de fondo que
+# agrupa los pedidos: SincronizadorDeriva), y cualquier sesión lee las
+# alarmas de la tabla. Lo nuevo se procesa de a páginas, cada una en su
+# propia transacción de escritura, así dos procesos nunca cuentan dos veces
+# el mismo resultado. La primera pasada sobre una base con historial arma las
+# líneas base sin registrar alarmas viejas. La alarma EWMA se registra una
+# vez al salir de la banda y queda enganchada hasta que la EWMA vuelve a
+# entrar; los valores no finitos (NaN, inf) se ignoran.
+
+import argparse
+import math
+import sys
+import threading
+from collections import namedtuple
+
+from . import especificaciones
+from .almacen import RUTA_BASE, TAMANO_PAGINA, obtener_almacen
+from .control_estadistico import EstadisticaIncremental
+
+MUESTRAS_BASE = 20  # resultados usados para fijar media y desvío de referencia
+K_CUSUM = 0.5  # holgura, en desvíos
+H_CUSUM = 5.0  # umbral de decisión, en desvíos
+LAMBDA_EWMA = 0.2
+L_EWMA = 2.7
+ULTIMAS = 20  # alarmas que se listan por defecto
+
+# fecha y resultado_id: del resultado que la disparó; id: el de la tabla alarmas
+Alarma = namedtuple("Alarma", "modulo parametro metodo direccion valor referencia limite fecha resultado_id id",
+                    defaults=(None, None, None))
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS deriva_estado (
+    modulo TEXT NOT NULL,
+    parametro TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    media_base REAL NOT NULL,
+    m2_base REAL NOT NULL,
+    media REAL,
+    desvio REAL,
+    cusum_alto REAL NOT NULL,
+    cusum_bajo REAL NOT NULL,
+    ewma REAL,
+    ewma_alarma INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (modulo, parametro)
+);
+CREATE TABLE IF NOT EXISTS deriva_avance (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    ultimo_id INTEGER NOT NULL,
+    silencio_hasta INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alarmas (
+    id INTEGER PRIMARY KEY,
+    resultado_id INTEGER NOT NULL,
+    fecha TEXT NOT NULL,
+    modulo TEXT NOT NULL,
+    parametro TEXT NOT NULL,
+    metodo TEXT NOT NULL,
+    direccion TEXT NOT NULL,
+    valor REAL,
+    referencia REAL,
+    limite REAL
+);
+CREATE INDEX IF NOT EXISTS ix_alarmas_modulo_id ON alarmas (modulo, id);
+"""
+
+COLUMNAS_ESTADO = ["modulo", "parametro", "n", "media_base", "m2_base", "media", "desvio",
+                   "cusum_alto", "cusum_bajo", "ewma", "ewma_alarma"]
+_GUARDAR_ESTADO = (f"INSERT OR REPLACE INTO deriva_estado ({', '.join(COLUMNAS_ESTADO)}) "
+                   f"VALUES ({', '.join('?' for _ in COLUMNAS_ESTADO)})")
+_GUARDAR_ALARMA = (
+    "INSERT INTO alarmas (resultado_id, fecha, modulo, parametro, metodo, direccion, valor, referencia, limite) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class EstadoDeriva:
+    __slots__ = ("base", "media", "desvio", "cusum_alto", "cusum_bajo", "ewma", "ewma_alarma")
+
+    def __init__(self):
+        self.base = EstadisticaIncremental()
+        self.media = None
+        self.desvio = None
+        self.cusum_alto = 0.0
+        self.cusum_bajo = 0.0
+        self.ewma = None
+        self.ewma_alarma = 0  # 1 / -1: la EWMA ya avisó que está arriba / abajo de la banda
+
+    def fila(self):
+        # Columnas de deriva_estado después de modulo y parametro
+        return (*self.base.estado(), self.media, self.desvio, self.cusum_alto, self.cusum_bajo, self.ewma,
+                self.ewma_alarma)
+
+
+def _desvio_minimo(modulo, parametro):
+    # Si la línea base no varía (p. ej. siempre 0), se usa 1/6 del rango especificado
+    if modulo in especificaciones.ESPECIFICACIONES:
+        compilada = especificaciones.compilar(modulo)
+        if parametro in compilada.nombres:
+            i = compilada.nombres.index(parametro)
+            return (compilada.maximos[i] - compilada.minimos[i]) / 6 or 1e-9
+    return 1e-9
+
+
+def _limite(modulo, parametro, direccion):
+    if modulo in especificaciones.ESPECIFICACIONES:
+        compilada = especificaciones.compilar(modulo)
+        if parametro in compilada.nombres:
+            i = compilada.nombres.index(parametro)
+            return compilada.maximos[i] if direccion == "sube" else compilada.minimos[i]
+    return None
+
+
+class MotorDeriva:
+    def __init__(self, muestras_base=MUESTRAS_BASE, k=K_CUSUM, h=H_CUSUM, lambda_ewma=LAMBDA_EWMA, l_ewma=L_EWMA):
+        self.muestras_base = muestras_base
+        self.k = k
+        self.h = h
+        self.lambda_ewma = lambda_ewma
+        # Ancho asintótico de los límites EWMA, en desvíos
+        self.ancho_ewma = l_ewma * (lambda_ewma / (2 - lambda_ewma)) ** 0.5
+        self.ultimo_id = None  # None: el estado en memoria no está al día con la base
+        self._estados = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._estados)
+
+    def actualizar(self, modulo, parametro, valor):
+        # Incorpora un resultado; devuelve las alarmas que dispara (lista vacía si ninguna)
+        if not math.isfinite(valor):
+            return []  # un NaN dejaría media, desvío y EWMA en NaN para siempre
+        estado = self._estados.get((modulo, parametro))
+        if estado is None:
+            estado = self._estados[(modulo, parametro)] = EstadoDeriva()
+
+        if estado.media is None:
+            estado.base.agregar(valor)
+            if estado.base.n >= self.muestras_base:
+                estado.media = estado.base.media
+                estado.desvio = max(estado.base.desvio, _desvio_minimo(modulo, parametro))
+                estado.ewma = estado.media
+            return []
+
+        z = (valor - estado.media) / estado.desvio
+        estado.cusum_alto = max(0.0, estado.cusum_alto + z - self.k)
+        estado.cusum_bajo = max(0.0, estado.cusum_bajo - z - self.k)
+        estado.ewma = self.lambda_ewma * valor + (1 - self.lambda_ewma) * estado.ewma
+
+        alarmas = []
+        for direccion, cusum in (("sube", estado.cusum_alto), ("baja", estado.cusum_bajo)):
+            if cusum > self.h:
+                alarmas.append(Alarma(modulo, parametro, "CUSUM", direccion, valor, estado.media,
+                                      _limite(modulo, parametro, direccion)))
+        if alarmas:
+            estado.cusum_alto = estado.cusum_bajo = 0.0  # se rearma después de avisar
+        desvio_ewma = (estado.ewma - estado.media) / estado.desvio
+        fuera = 0 if abs(desvio_ewma) <= self.ancho_ewma else 1 if desvio_ewma > 0 else -1
+        if fuera and fuera != estado.ewma_alarma:
+            direccion = "sube" if fuera > 0 else "baja"
+            alarmas.append(Alarma(modulo, parametro, "EWMA", direccion, estado.ewma, estado.media,
+                                  _limite(modulo, parametro, direccion)))
+        estado.ewma_alarma = fuera  # avisa al salir de la banda, no con cada resultado afuera
+        return alarmas
+
+    def actualizar_lote(self, filas):
+        # filas: (modulo, parametro, valor) en orden de llegada; solo en memoria
+        alarmas = []
+        with self._lock:
+            for modulo, parametro, valor in filas:
+                if valor is not None:
+                    alarmas.extend(self.actualizar(modulo, parametro, valor))
+        return alarmas
+
+    # ---- persistencia ----
+    def _cargar(self, con):
+        self._estados = {}
+        for modulo, parametro, n, media_base, m2_base, media, desvio, alto, bajo, ewma, ewma_alarma in con.execute(
+                f"SELECT {', '.join(COLUMNAS_ESTADO)} FROM deriva_estado"):
+            estado = self._estados[(modulo, parametro)] = EstadoDeriva()
+            estado.base = EstadisticaIncremental.desde_estado(n, media_base, m2_base)
+            estado.media, estado.desvio, estado.cusum_alto, estado.cusum_bajo, estado.ewma, estado.ewma_alarma = (
+                media, desvio, alto, bajo, ewma, ewma_alarma)
+
+    def _pagina(self, almacen, tamano):
+        # Una página en una transacción de escritura: (filas leídas, alarmas nuevas)
+        con = almacen.conexion()
+        avance = con.execute("SELECT ultimo_id, silencio_hasta FROM deriva_avance WHERE id = 1").fetchone()
+        if avance is None:
+            # Primera pasada sobre esta base: el historial previo arma las líneas base sin avisar
+            avance = (0, con.execute("SELECT COALESCE(MAX(id), 0) FROM resultados").fetchone()[0])
+            con.execute("INSERT INTO deriva_avance VALUES (1, ?, ?)", avance)
+        ultimo_id, silencio_hasta = avance
+        if ultimo_id != self.ultimo_id:
+            self._cargar(con)  # otro proceso avanzó (o es la primera vez): se retoma el estado guardado
+
+        filas = almacen.filas_desde(ultimo_id, tamano)
+        if not filas:
+            self.ultimo_id = ultimo_id
+            return 0, []
+        alarmas, cambiados = [], set()
+        for id_, fecha, modulo, parametro, valor in filas:
+            if valor is None or not math.isfinite(valor):
+                continue
+            disparadas = self.actualizar(modulo, parametro, valor)
+            cambiados.add((modulo, parametro))
+            if id_ > silencio_hasta:
+                alarmas.extend(a._replace(fecha=fecha, resultado_id=id_) for a in disparadas)
+
+        con.executemany(_GUARDAR_ESTADO, [(m, p, *self._estados[(m, p)].fila()) for m, p in cambiados])
+        guardadas = []
+        for alarma in alarmas:
+            cursor = con.execute(_GUARDAR_ALARMA, (alarma.resultado_id, alarma.fecha, *alarma[:7]))
+            guardadas.append(alarma._replace(id=cursor.lastrowid))
+        con.execute("UPDATE deriva_avance SET ultimo_id = ? WHERE id = 1", (filas[-1][0],))
+        self.ultimo_id = filas[-1][0]
+        return len(filas), guardadas
+
+    def sincronizar(self, almacen, tamano=TAMANO_PAGINA):
+        # Procesa lo que se registró en el almacén desde la última pasada, venga de
+        # esta sesión, de otra, de la API o de la carpeta vigilada, y guarda estado y
+        # alarmas. Devuelve las alarmas que registró esta llamada.
+        preparar(almacen)
+        nuevas = []
+        with self._lock:
+            con = almacen.conexion()
+            while True:
+                con.execute("BEGIN IMMEDIATE")  # un solo proceso por vez avanza el motor
+                try:
+                    leidas, alarmas = self._pagina(almacen, tamano)
+                    con.commit()
+                except BaseException:
+                    con.rollback()
+                    self.ultimo_id = None  # la memoria quedó adelantada: se recarga de la base
+                    raise
+                nuevas.extend(alarmas)
+                if leidas < tamano:
+                    return nuevas
+
+
+_preparadas = set()
+_lock_preparadas = threading.Lock()
+
+
+def preparar(almacen):
+    # Crea las tablas del motor en la base (una vez por base y proceso)
+    with _lock_preparadas:
+        if almacen.ruta not in _preparadas:
+            con = almacen.conexion()
+            con.executescript(ESQUEMA)
+            # Bases creadas antes de que la alarma EWMA quedara enganchada
+            if "ewma_alarma" not in {c[1] for c in con.execute("PRAGMA table_info(deriva_estado)")}:
+                con.execute("ALTER TABLE deriva_estado ADD COLUMN ewma_alarma INTEGER NOT NULL DEFAULT 0")
+                con.commit()
+            _preparadas.add(almacen.ruta)
+
+
+def alarmas(almacen, desde_id=0, modulo=None, limite=ULTIMAS):
+    # Alarmas registradas con id > desde_id, las más nuevas primero
+    preparar(almacen)
+    sql = "SELECT modulo, parametro, metodo, direccion, valor, referencia, limite, fecha, resultado_id, id FROM alarmas"
+    condiciones, argumentos = ["id > ?"], [desde_id]
+    if modulo is not None:
+        condiciones.append("modulo = ?")
+        argumentos.append(modulo)
+    sql += f" WHERE {' AND '.join(condiciones)} ORDER BY id DESC"
+    if limite:
+        sql += f" LIMIT {int(limite)}"
+    return [Alarma(*fila) for fila in almacen.conexion().execute(sql, argumentos)]
+
+
+def ultima_alarma(almacen):
+    # Id de la última alarma registrada (0 si no hay)
+    preparar(almacen)
+    return almacen.conexion().execute("SELECT COALESCE(MAX(id), 0) FROM alarmas").fetchone()[0]
+
+
+_motores = {}
+_lock_motores = threading.Lock()
+
+
+def obtener_motor(almacen):
+    # Motor compartido por el proceso. No recorre nada al crearse: el estado
+    # está en la base y sincronizar() sigue desde el último id procesado.
+    with _lock_motores:
+        motor = _motores.get(almacen.ruta)
+        if motor is None:
+            preparar(almacen)
+            motor = _motores[almacen.ruta] = MotorDeriva()
+        return motor
+
+
+class SincronizadorDeriva:
+    # Sincroniza un motor en un hilo propio, fuera del camino de quien escribe.
+    # Los pedidos que llegan mientras corre una pasada se juntan en una sola
+    # pasada siguiente, que procesa todo lo que se escribió hasta ese momento.
+    def __init__(self, almacen, motor=None):
+        self.almacen = almacen
+        self.motor = motor if motor is not None else obtener_motor(almacen)
+        self._condicion = threading.Condition()
+        self._pedidos = self._atendidos = 0
+        self._activo = True
+        self._hilo = threading.Thread(target=self._trabajar, name="deriva", daemon=True)
+        self._hilo.start()
+
+    def pedir(self):
+        with self._condicion:
+            self._pedidos += 1
+            self._condicion.notify_all()
+
+    def esperar(self, timeout=None):
+        # Espera a que se atiendan los pedidos hechos hasta ahora; False si venció el plazo
+        with self._condicion:
+            objetivo = self._pedidos
+            return self._condicion.wait_for(lambda: self._atendidos >= objetivo or not self._activo, timeout)
+
+    def detener(self):
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify_all()
+        self._hilo.join()
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                self._condicion.wait_for(lambda: self._pedidos > self._atendidos or not self._activo)
+                if not self._activo:
+                    return
+                objetivo = self._pedidos
+            try:
+                self.motor.sincronizar(self.almacen)
+            except Exception as e:
+                # Lo no procesado queda para la próxima pasada (el avance está en la base)
+                print(f"deriva: no se pudo sincronizar: {e}", file=sys.stderr)
+            with self._condicion:
+                self._atendidos = objetivo
+                self._condicion.notify_all()
+
+
+def describir(alarma):
+    limite = f" (límite {alarma.limite:g})" if alarma.limite is not None else ""
+    return (f"Deriva {alarma.metodo} en {alarma.modulo} / {alarma.parametro}: el proceso {alarma.direccion} "
+            f"respecto de su línea base {alarma.referencia:.4g}{limite}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pone al día el motor de deriva y lista las últimas alarmas.")
+    parser.add_argument("--base", default=RUTA_BASE, help="base de resultados (default: informes/resultados.db)")
+    parser.add_argument("--ultimas", type=int, default=ULTIMAS, help="alarmas a listar")
+    args = parser.parse_args(argv)
+
+    almacen = obtener_almacen(args.base)
+    nuevas = obtener_motor(almacen).sincronizar(almacen)
+    print(f"{len(nuevas)} alarmas nuevas", file=sys.stderr)
+    for alarma in alarmas(almacen, limite=args.ultimas):
+        print(f"{alarma.fecha}  {describir(alarma)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
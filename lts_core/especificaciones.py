@@ -0,0 +1,251 @@
+# ESPECIFICACIONES - TABLA ÚNICA DE LÍMITES POR MÓDULO Y PARÁMETRO
+#
+# Es la única fuente de límites de la planta: las tres aplicaciones y los
+# procesos en lote validan contra esta tabla. Cada módulo se compila una vez
+# a arreglos NumPy de mínimos y máximos para validar DataFrames completos.
+#
+# ESPECIFICACIONES tiene los límites vigentes. Cuando un límite cambia, la
+# versión anterior pasa a HISTORIAL y el parámetro nuevo lleva "desde" con la
+# fecha de entrada en vigencia; así los resultados históricos se revalidan
+# contra el límite que correspondía en su momento.
+#
+# NumPy y pandas se importan dentro de las funciones que los usan: las
+# aplicaciones que solo leen la tabla arrancan sin cargarlos.
+
+from collections import namedtuple
+
+ESPECIFICACIONES = {
+    "Gas Natural": [
+        {"nombre": "H₂S", "unidad": "ppm", "min": 0, "max": 2.1, "exp": "Sulfuro de hidrógeno en gas de venta"},
+        {"nombre": "CO₂", "unidad": "%", "min": 0, "max": 2.0, "exp": "Dióxido de carbono en gas de venta"}
+    ],
+    "Gasolina Estabilizada": [
+        {"nombre": "TVR", "unidad": "psia", "min": 0, "max": 12, "exp": "Presión de vapor Reid a 38.7 °C"},
+        {"nombre": "Sales", "unidad": "mg/m³", "min": 0, "max": 100, "exp": "Contenido de sales totales"},
+        {"nombre": "Agua y sedimentos", "unidad": "%", "min": 0, "max": 1, "exp": "Agua y sedimentos por centrifugado"},
+        {"nombre": "Densidad", "unidad": "kg/m³", "min": 600, "max": 800, "exp": "Densidad a 15 °C"}
+    ],
+    "MEG": [
+        {"nombre": "pH", "unidad": "", "min": 6.5, "max": 8, "exp": "Medida de acidez o alcalinidad"},
+        {"nombre": "Concentración", "unidad": "%wt", "min": 60, "max": 84, "exp": "Porcentaje en peso de MEG"},
+        {"nombre": "Cloruros", "unidad": "ppm", "min": 0, "max": 50, "exp": "Contaminación por sales"},
+        {"nombre": "Densidad", "unidad": "kg/m³", "min": 1050, "max": 1120, "exp": "Densidad a temperatura ambiente"},
+        {"nombre": "MDEA", "unidad": "ppm", "min": 0, "max": 1000, "exp": "Presencia de aminas"}
+    ],
+    "TEG": [
+        {"nombre": "pH", "unidad": "", "min": 6.5, "max": 8.5, "exp": "Medida de acidez o alcalinidad"},
+        {"nombre": "Concentración", "unidad": "%wt", "min": 99, "max": 100, "exp": "Pureza del TEG"},
+        {"nombre": "Cloruros", "unidad": "ppm", "min": 0, "max": 50, "exp": "Contaminación por sales"},
+        {"nombre": "Hierro", "unidad": "ppm", "min": 0, "max": 10, "exp": "Corrosión interna del sistema"}
+    ],
+    "Agua Desmineralizada": [
+        {"nombre": "pH", "unidad": "", "min": 6, "max": 8, "exp": "Medida de acidez o alcalinidad"},
+        {"nombre": "Cloruros", "unidad": "ppm", "min": 0, "max": 10, "exp": "Contaminación por sales"},
+        {"nombre": "Densidad", "unidad": "kg/m³", "min": 950, "max": 1050, "exp": "Densidad esperada del agua tratada"}
+    ],
+    "Aminas": [
+        {"nombre": "Concentración", "unidad": "%wt", "min": 48, "max": 52, "exp": "Concentración del solvente amínico"},
+        {"nombre": "Cloruros en amina", "unidad": "ppm", "min": 0, "max": 1000, "exp": "Contaminación del solvente por sales"},
+        {"nombre": "Cloruros en caldera", "unidad": "ppm", "min": 0, "max": 10, "exp": "Cloruros en el agua de caldera del regenerador"},
+        {"nombre": "Carga ácida pobre", "unidad": "mol/mol", "min": 0, "max": 0.025, "exp": "Gas ácido remanente en amina regenerada"},
+        {"nombre": "Carga ácida rica", "unidad": "mol/mol", "min": 0, "max": 0.45, "exp": "Gas ácido absorbido en amina rica"}
+    ]
+}
+
+VIGENCIA_INICIAL = "2000-01-01"
+
+# Versiones anteriores: (módulo, parámetro, vigente desde, mínimo, máximo)
+HISTORIAL = [
+]
+
+Compilada = namedtuple("Compilada", "modulo nombres etiquetas minimos maximos")
+_compiladas = {}
+_versiones = {}
+
+
+def etiqueta(param):
+    return f"{param['nombre']} ({param['unidad']})" if param["unidad"] else param["nombre"]
+
+
+def parametros(*modulos):
+    # Subconjunto de la tabla con el formato de PARAMETROS de las aplicaciones
+    return {m: ESPECIFICACIONES[m] for m in modulos}
+
+
+def compilar(modulo):
+    if modulo not in _compiladas:
+        import numpy as np
+        params = ESPECIFICACIONES[modulo]
+        _compiladas[modulo] = Compilada(
+            modulo,
+            [p["nombre"] for p in params],
+            [etiqueta(p) for p in params],
+            np.array([p["min"] for p in params], dtype=float),
+            np.array([p["max"] for p in params], dtype=float),
+        )
+    return _compiladas[modulo]
+
+
+def _columnas(compilada, columnas):
+    # Posición en la especificación de cada columna reconocida (por nombre o etiqueta)
+    posiciones = {n: i for i, n in enumerate(compilada.nombres)}
+    posiciones.update({e: i for i, e in enumerate(compilada.etiquetas)})
+    return [(c, posiciones[c]) for c in columnas if c in posiciones]
+
+
+def validar_lote(df, modulo):
+    # Valida todas las filas de un DataFrame (una muestra por fila, un parámetro
+    # por columna) en una sola pasada. Devuelve la matriz booleana de
+    # cumplimiento y un resumen por parámetro. Un valor faltante no cumple.
+    import numpy as np
+    import pandas as pd
+    compilada = compilar(modulo)
+    columnas = _columnas(compilada, df.columns)
+    indices = [i for _, i in columnas]
+    valores = df[[c for c, _ in columnas]].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    cumple = (valores >= compilada.minimos[indices]) & (valores <= compilada.maximos[indices])
+    etiquetas = [compilada.etiquetas[i] for i in indices]
+
+    cumplimiento = pd.DataFrame(cumple, index=df.index, columns=etiquetas)
+    evaluadas = (~np.isnan(valores)).sum(axis=0)
+    cumplen = cumple.sum(axis=0)
+    resumen = pd.DataFrame({
+        "Mínimo": compilada.minimos[indices],
+        "Máximo": compilada.maximos[indices],
+        "Evaluadas": evaluadas,
+        "Cumplen": cumplen,
+        "No cumplen": evaluadas - cumplen,
+        "% cumplimiento": np.round(100 * cumplen / np.maximum(evaluadas, 1), 1),
+    }, index=pd.Index(etiquetas, name="Parámetro"))
+    return cumplimiento, resumen
+
+
+def evaluar(modulo, valores):
+    # valores: {nombre o etiqueta: valor} -> [(nombre, etiqueta, valor, cumple)]
+    import numpy as np
+    compilada = compilar(modulo)
+    columnas = _columnas(compilada, valores)
+    indices = [i for _, i in columnas]
+    x = np.array([valores[c] for c, _ in columnas], dtype=float)
+    cumple = (x >= compilada.minimos[indices]) & (x <= compilada.maximos[indices])
+    return [
+        (compilada.nombres[i], compilada.etiquetas[i], valores[c], bool(ok))
+        for (c, i), ok in zip(columnas, cumple)
+    ]
+
+
+def resultados_modulo(modulo, valores):
+    # {etiqueta: "valor - ✅/❌"} como en las pestañas
+    return {e: f"{v} - {'✅' if ok else '❌'}" for _, e, v, ok in evaluar(modulo, valores)}
+
+
+# --------------------------- VERSIONES --------------------------- #
+def tabla_versiones():
+    # Todas las versiones de todos los límites, ordenadas por fecha de vigencia
+    import pandas as pd
+    filas = [
+        (modulo, p["nombre"], p.get("desde", VIGENCIA_INICIAL), p["min"], p["max"])
+        for modulo, params in ESPECIFICACIONES.items() for p in params
+    ] + list(HISTORIAL)
+    tabla = pd.DataFrame(filas, columns=["modulo", "parametro", "desde", "min", "max"])
+    tabla["desde"] = pd.to_datetime(tabla["desde"])
+    return tabla.sort_values("desde", kind="stable").reset_index(drop=True)
+
+
+def _indice_versiones():
+    # (módulo, parámetro) -> (fechas de vigencia ordenadas, mínimos, máximos)
+    # Se arma aparte y se publica de una vez: otro hilo (la API de ingesta) no ve un índice a medias
+    if not _versiones:
+        indice = {
+            (modulo, parametro): (
+                grupo["desde"].to_numpy(dtype="datetime64[ns]"),
+                grupo["min"].to_numpy(dtype=float),
+                grupo["max"].to_numpy(dtype=float),
+            )
+            for (modulo, parametro), grupo in tabla_versiones().groupby(["modulo", "parametro"], sort=False)
+        }
+        _versiones.update(indice)
+    return _versiones
+
+
+def precargar():
+    # Arma de antemano lo que se arma a demanda (y carga NumPy y pandas): en un
+    # servidor, la primera petición no paga la espera.
+    for modulo in ESPECIFICACIONES:
+        compilar(modulo)
+    _indice_versiones()
+
+
+def limites_vigentes(modulo, parametro, fecha):
+    # Límites (mínimo, máximo) que aplicaban en la fecha dada, por búsqueda binaria.
+    # None si el parámetro no tenía especificación en esa fecha.
+    import numpy as np
+    import pandas as pd
+    parametro = nombre_canonico(modulo, parametro)
+    version = _indice_versiones().get((modulo, parametro))
+    if version is None:
+        return None
+    desde, minimos, maximos = version
+    i = np.searchsorted(desde, np.datetime64(pd.Timestamp(fecha), "ns"), side="right") - 1
+    if i < 0:
+        return None
+    return minimos[i], maximos[i]
+
+
+def nombre_canonico(modulo, parametro):
+    compilada = compilar(modulo) if modulo in ESPECIFICACIONES else None
+    if compilada is not None and parametro in compilada.etiquetas:
+        return compilada.nombres[compilada.etiquetas.index(parametro)]
+    return parametro
+
+
+def nombres_canonicos(parametros):
+    # Versión vectorizada de nombre_canonico: la etiqueta "Cloruros (ppm)" es "Cloruros"
+    # en cualquier módulo, así que alcanza con resolver cada valor distinto una vez.
+    import numpy as np
+    import pandas as pd
+    etiquetas = {etiqueta(p): p["nombre"] for params in ESPECIFICACIONES.values() for p in params}
+    codigos, unicos = pd.factorize(parametros)
+    return np.array([etiquetas.get(u, u) for u in unicos], dtype=object)[codigos]
+
+
+def validar_historico(df, col_fecha="fecha"):
+    # df en formato largo: modulo, parametro, valor y fecha. Cada resultado se une
+    # con la versión de la especificación vigente en su fecha (merge_asof) y se
+    # valida en bloque. "cumple" queda vacío si no se pudo validar y "motivo"
+    # dice por qué, con los mismos textos que la API de ingesta: "módulo
+    # desconocido", "fecha ilegible" (fecha vacía o que no se entiende) o "sin
+    # especificación vigente en la fecha". Un valor no numérico no cumple
+    # (motivo "valor no numérico").
+    import numpy as np
+    import pandas as pd
+    muestras = df.copy()
+    muestras["_orden"] = np.arange(len(muestras))
+    # Claves de texto (como en la tabla de versiones) aunque df venga vacío
+    muestras["_modulo"] = muestras["modulo"].astype(str)
+    muestras["_parametro"] = pd.Series(nombres_canonicos(muestras["parametro"]), index=muestras.index).astype(str)
+    # misma resolución que las versiones
+    muestras[col_fecha] = pd.to_datetime(muestras[col_fecha], format="mixed", errors="coerce").astype("datetime64[ns]")
+    legibles = muestras[col_fecha].notna()
+
+    versiones = tabla_versiones().rename(columns={"modulo": "_modulo", "parametro": "_parametro", "desde": "vigente_desde"})
+    versiones["vigente_desde"] = versiones["vigente_desde"].astype("datetime64[ns]")
+    unido = pd.merge_asof(
+        muestras[legibles].sort_values(col_fecha, kind="stable"), versiones,
+        left_on=col_fecha, right_on="vigente_desde", by=["_modulo", "_parametro"],
+        direction="backward",
+    )
+    # merge_asof no admite fechas vacías: esas filas vuelven sin versión
+    unido = pd.concat([unido, muestras[~legibles]]).sort_values("_orden")
+
+    valor = pd.to_numeric(unido["valor"], errors="coerce")
+    cumple = ((valor >= unido["min"]) & (valor <= unido["max"])).astype("boolean")
+    cumple[unido["min"].isna()] = pd.NA
+    unido["cumple"] = cumple
+    unido["motivo"] = np.select(
+        [~unido["modulo"].isin(list(ESPECIFICACIONES)).to_numpy(), unido[col_fecha].isna().to_numpy(),
+         unido["min"].isna().to_numpy(), valor.isna().to_numpy()],
+        ["módulo desconocido", "fecha ilegible", "sin especificación vigente en la fecha", "valor no numérico"],
+        "",
+    )
+    return unido.drop(columns=["_orden", "_modulo", "_parametro"]).set_index(df.index)
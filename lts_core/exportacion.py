@@ -0,0 +1,222 @@
+# EXPORTACIÓN - RESULTADOS HISTÓRICOS A CSV O XLSX SIN CARGARLOS EN MEMORIA
+#
+# Uso:
+#   python -m lts_core.exportacion salida.xlsx [--modulo MEG] [--parametro pH] [--desde 2024-01-01] [--hasta 2024-06-30]
+#
+# Las filas salen del almacén de a páginas (almacen.paginas) y se escriben a
+# medida que llegan: la memoria no depende del tamaño del extracto. Formatos:
+#   csv      UTF-8 con BOM (Excel respeta los acentos)
+#   csv.gz   el mismo CSV comprimido (~10 veces más chico: conviene para descargar millones de filas)
+#   xlsx     openpyxl en modo write_only (opcional: sin openpyxl no se ofrece); una hoja
+#            nueva cada 1.048.575 filas, el máximo de Excel
+# En las apps, cada exportación es un trabajo de una cola propia (no demora
+# los informes PDF) que informa su avance; la API de ingesta la transmite
+# directamente en GET /exportacion.
+
+import argparse
+import csv
+import gzip
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, time
+
+from . import perfilado
+from .almacen import COLUMNAS, RUTA_BASE, AlmacenResultados
+from .cola_informes import ColaInformes
+from .recursos import CARPETA_INFORMES
+
+FORMATOS = {
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+ENCABEZADOS = ["id"] + COLUMNAS
+FILAS_HOJA = 1_048_575  # filas de datos por hoja de Excel (más el encabezado)
+CARPETA_EXPORTACIONES = os.path.join(CARPETA_INFORMES, "exportaciones")
+MAX_HILOS = 2
+BLOQUE = 64 * 1024  # bytes por envío al transmitir un archivo
+
+
+def formatos():
+    # Formatos disponibles en esta instalación
+    return [f for f in FORMATOS if f != "xlsx" or importlib.util.find_spec("openpyxl") is not None]
+
+
+def periodo(desde=None, hasta=None):
+    # Fechas (date, datetime o texto ISO) a datetime; una fecha sin hora en
+    # "hasta" incluye el día completo.
+    def convertir(valor, fin):
+        if valor is None or valor == "":
+            return None
+        if isinstance(valor, str):
+            solo_dia = len(valor.strip()) == 10
+            valor = datetime.fromisoformat(valor.strip())
+            return datetime.combine(valor.date(), time.max) if fin and solo_dia else valor
+        if not isinstance(valor, datetime):
+            return datetime.combine(valor, time.max if fin else time.min)
+        return valor
+    return convertir(desde, False), convertir(hasta, True)
+
+
+def _filtros(modulo=None, parametro=None, desde=None, hasta=None):
+    # Filtros para almacen.paginas/contar: listas vacías = sin filtro, listas de un elemento = ese valor
+    def valor(v):
+        if isinstance(v, (list, tuple, set)):
+            v = list(v)
+            return None if not v else v[0] if len(v) == 1 else v
+        return v or None
+    desde, hasta = periodo(desde, hasta)
+    return dict(modulo=valor(modulo), parametro=valor(parametro), desde=desde, hasta=hasta)
+
+
+def contar(almacen, modulo=None, parametro=None, desde=None, hasta=None):
+    # Filas que tendría el extracto (para mostrarlo antes de exportar)
+    return almacen.contar(**_filtros(modulo, parametro, desde, hasta))
+
+
+# --------------------------- ESCRITORES --------------------------- #
+def escribir_csv(paginas, archivo, progreso=None):
+    # archivo: abierto en modo binario. Devuelve las filas escritas.
+    texto = io.TextIOWrapper(archivo, encoding="utf-8-sig", newline="")
+    escritor = csv.writer(texto)
+    escritor.writerow(ENCABEZADOS)
+    filas = 0
+    for pagina in paginas:
+        escritor.writerows(pagina)
+        filas += len(pagina)
+        if progreso:
+            progreso(filas)
+    texto.flush()
+    texto.detach()  # el archivo lo cierra quien lo abrió
+    return filas
+
+
+def escribir_xlsx(paginas, ruta, progreso=None):
+    from openpyxl import Workbook
+    libro = Workbook(write_only=True)
+    hoja, en_hoja, filas = None, FILAS_HOJA, 0
+    for pagina in paginas:
+        for fila in pagina:
+            if en_hoja == FILAS_HOJA:
+                hoja = libro.create_sheet(f"Resultados {len(libro.worksheets) + 1}")
+                hoja.append(ENCABEZADOS)
+                en_hoja = 0
+            # la fecha como fecha de Excel, para poder filtrar y ordenar
+            hoja.append((fila[0], datetime.fromisoformat(fila[1]), *fila[2:]))
+            en_hoja += 1
+        filas += len(pagina)
+        if progreso:
+            progreso(filas)
+    if hoja is None:
+        libro.create_sheet("Resultados 1").append(ENCABEZADOS)
+    libro.save(ruta)
+    return filas
+
+
+def exportar(almacen, ruta, formato="csv", modulo=None, parametro=None, desde=None, hasta=None, progreso=None):
+    # Escribe el extracto en ruta. progreso(filas, total) después de cada página.
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato} (válidos: {', '.join(FORMATOS)})")
+    filtros = _filtros(modulo, parametro, desde, hasta)
+    total = almacen.contar(**filtros)
+    avance = (lambda filas: progreso(filas, total)) if progreso else None
+    paginas = almacen.paginas(**filtros)
+    with perfilado.etapa(f"exportacion.{formato}"):
+        if formato == "xlsx":
+            return escribir_xlsx(paginas, ruta, avance)
+        with (gzip.open(ruta, "wb", compresslevel=6) if formato == "csv.gz" else open(ruta, "wb")) as archivo:
+            return escribir_csv(paginas, archivo, avance)
+
+
+def iterar_csv(almacen, modulo=None, parametro=None, desde=None, hasta=None):
+    # El CSV del extracto en bloques de bytes (uno por página), para transmitirlo
+    filtros = _filtros(modulo, parametro, desde, hasta)
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(ENCABEZADOS)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+    for pagina in almacen.paginas(**filtros):
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(pagina)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iterar_archivo(almacen, formato, **filtros):
+    # csv.gz y xlsx no se pueden armar de a partes: se escriben en un temporal
+    # (memoria constante igual) y se transmite el archivo
+    descriptor, temporal = tempfile.mkstemp(suffix=f".{formato}")
+    os.close(descriptor)
+    try:
+        exportar(almacen, temporal, formato, **filtros)
+        with open(temporal, "rb") as archivo:
+            while bloque := archivo.read(BLOQUE):
+                yield bloque
+    finally:
+        os.remove(temporal)
+
+
+def nombre_exportacion(formato, modulo=None, desde=None, hasta=None):
+    desde, hasta = periodo(desde, hasta)
+    if isinstance(modulo, (list, tuple, set)):
+        modulo = "_".join(sorted(modulo)) if len(modulo) <= 3 else f"{len(modulo)}_modulos"
+    partes = ["resultados", (modulo or "todos").lower().replace(" ", "_"),
+              desde.strftime("%Y%m%d") if desde else "inicio", hasta.strftime("%Y%m%d") if hasta else "hoy"]
+    return f"{'_'.join(partes)}_{datetime.now():%H%M%S}.{formato}"
+
+
+# --------------------------- COLA --------------------------- #
+def enviar_exportacion(cola, almacen, formato="csv", raiz=CARPETA_EXPORTACIONES, **filtros):
+    nombre = nombre_exportacion(formato, filtros.get("modulo"), filtros.get("desde"), filtros.get("hasta"))
+    return cola.enviar(
+        f"Exportación - {nombre}", os.path.join(raiz, nombre),
+        lambda temporal, avance: exportar(
+            almacen, temporal, formato, progreso=lambda filas, total: avance(min(filas / total, 1.0) if total else 1.0),
+            **filtros,
+        ),
+        con_avance=True,
+    )
+
+
+_cola = None
+_lock_cola = threading.Lock()
+
+
+def obtener_cola_exportaciones():
+    # Cola propia, compartida por todas las sesiones: una exportación de millones
+    # de filas no ocupa los hilos que arman los informes PDF
+    global _cola
+    with _lock_cola:
+        if _cola is None:
+            _cola = ColaInformes(MAX_HILOS)
+        return _cola
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta resultados históricos a CSV o XLSX.")
+    parser.add_argument("salida", help="archivo a escribir; el formato sale de la extensión (.csv, .csv.gz, .xlsx)")
+    parser.add_argument("--modulo", action="append", help="se puede repetir")
+    parser.add_argument("--parametro", action="append", help="se puede repetir")
+    parser.add_argument("--desde", help="inicio del período (AAAA-MM-DD [HH:MM])")
+    parser.add_argument("--hasta", help="fin del período (AAAA-MM-DD [HH:MM]); un día solo se incluye completo")
+    parser.add_argument("--base", default=RUTA_BASE, help="base de resultados (default: informes/resultados.db)")
+    args = parser.parse_args(argv)
+
+    formato = next((f for f in sorted(FORMATOS, key=len, reverse=True) if args.salida.endswith(f".{f}")), None)
+    if formato is None:
+        parser.error(f"extensión no reconocida: {args.salida} (válidas: {', '.join(FORMATOS)})")
+
+    def avance(filas, total):
+        print(f"\r{filas:,}/{total:,} filas", end="", file=sys.stderr, flush=True)
+    filas = exportar(AlmacenResultados(args.base), args.salida, formato, args.modulo, args.parametro,
+                     args.desde, args.hasta, avance)
+    print(f"\n{args.salida}: {filas:,} filas", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
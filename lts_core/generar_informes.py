@@ -0,0 +1,94 @@
+# GENERACIÓN MASIVA DE INFORMES PDF (SIN INTERFAZ)
+#
+# Uso:
+#   python -m lts_core.generar_informes resultados.csv [--salida informes] [--procesos 4]
+#
+# Cada fila del CSV es un informe. Columnas reconocidas: id, modulo, operador,
+# muestreo_en, muestra_por, observaciones, explicacion, fecha. El resto de las
+# columnas con valor se informan como resultados ("Parámetro: valor").
+# Los informes ya generados se saltean, así que ante una falla basta con
+# volver a ejecutar el mismo comando para retomar donde quedó. Un id repetido
+# genera informe_<modulo>_<id>_2.pdf, _3, ... en el orden del CSV.
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from .informes_pdf import CARPETA_INFORMES, EXPLICACIONES, carpeta_modulo, construir_pdf
+from .recursos import nombre_seguro
+
+COLUMNAS_FIJAS = {"id", "modulo", "operador", "muestreo_en", "muestra_por", "observaciones", "explicacion", "fecha"}
+
+
+def leer_tareas(ruta_csv, salida):
+    # id y modulo vienen del CSV: se limpian antes de usarlos en la ruta
+    vistos = {}
+    with open(ruta_csv, newline="", encoding="utf-8-sig") as f:
+        for numero, fila in enumerate(csv.DictReader(f), start=1):
+            fila = {k.strip(): (v or "").strip() for k, v in fila.items() if k}
+            modulo = fila.get("modulo") or "General"
+            base = f"informe_{nombre_seguro(modulo.lower())}_{nombre_seguro(fila.get('id') or numero, str(numero))}"
+            vistos[base] = vistos.get(base, 0) + 1
+            nombre = f"{base}.pdf" if vistos[base] == 1 else f"{base}_{vistos[base]}.pdf"
+            yield os.path.join(carpeta_modulo(modulo, salida), nombre), fila
+
+
+def renderizar(tarea):
+    ruta, fila = tarea
+    if os.path.exists(ruta):
+        return "salteado", ruta, ""
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        modulo = fila.get("modulo") or "General"
+        fecha = datetime.fromisoformat(fila["fecha"]) if fila.get("fecha") else None
+        resultados = {k: v for k, v in fila.items() if k not in COLUMNAS_FIJAS and v != ""}
+        contenido = construir_pdf(
+            fila.get("operador", ""),
+            fila.get("explicacion") or EXPLICACIONES.get(modulo, f"Informe técnico de {modulo}."),
+            resultados,
+            fila.get("observaciones", ""),
+            fila.get("muestreo_en", ""),
+            fila.get("muestra_por", ""),
+            fecha=fecha,
+        )
+        # Escritura atómica: un informe interrumpido nunca queda como generado
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(temporal, "wb") as f:
+            f.write(contenido)
+        os.replace(temporal, ruta)
+        return "generado", ruta, ""
+    except Exception as e:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        return "fallido", ruta, str(e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera informes PDF de laboratorio a partir de un CSV de resultados.")
+    parser.add_argument("csv", help="CSV con una fila por informe")
+    parser.add_argument("--salida", default=CARPETA_INFORMES, help="carpeta raíz de informes (default: informes)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count(), help="procesos en paralelo")
+    parser.add_argument("--lote", type=int, default=32, help="informes por envío a cada proceso")
+    args = parser.parse_args(argv)
+
+    conteo = {"generado": 0, "salteado": 0, "fallido": 0}
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        for estado, ruta, error in pool.map(renderizar, leer_tareas(args.csv, args.salida), chunksize=args.lote):
+            conteo[estado] += 1
+            if error:
+                print(f"❌ {ruta}: {error}", file=sys.stderr)
+    duracion = time.perf_counter() - inicio
+
+    total = sum(conteo.values())
+    print(f"Informes: {total} | generados: {conteo['generado']} | salteados: {conteo['salteado']} | fallidos: {conteo['fallido']}")
+    print(f"Tiempo: {duracion:.1f} s | {conteo['generado'] / duracion if duracion else 0:.1f} informes/s")
+    return 1 if conteo["fallido"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
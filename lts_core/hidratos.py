@@ -0,0 +1,126 @@
+# HIDRATOS - INHIBICIÓN CON MEG Y DOSIFICACIÓN SOBRE GRILLAS PRESIÓN x TEMPERATURA
+#
+# Temperatura de formación de hidratos del gas por la correlación de
+# Towler-Mokhatab (función de la presión y de la densidad relativa, que sale
+# de la cromatografía del módulo Gas Natural) y depresión que aporta el MEG
+# en la fase acuosa, por Hammerschmidt o Nielsen-Bucklin (mejor por encima
+# de ~30 %wt). Para cada punto de operación se calcula la depresión
+# necesaria, la concentración de MEG que la da y el caudal de MEG pobre a
+# inyectar; toda la grilla se resuelve de una vez con NumPy (un millón de
+# puntos en unas decenas de milisegundos).
+#
+# Supuestos: el MEG no se pierde a la fase gas ni a los condensados, y la
+# correlación vale para gases dulces (0.555 < densidad relativa < 1) entre
+# ~4 y ~32 °C de temperatura de hidrato.
+
+import numpy as np
+
+K_MEG = 1297.0             # constante de Hammerschmidt del MEG (°C)
+M_MEG = 62.07              # g/mol
+M_AGUA = 18.015            # g/mol
+A_NIELSEN_BUCKLIN = 72.0   # ΔT = -72 ln(x agua), en °C
+PSIA_POR_BAR = 14.5038
+MARGEN = 3.0               # °C de margen de diseño sobre la temperatura de hidrato
+METODOS = ("Hammerschmidt", "Nielsen-Bucklin")
+
+
+def _verificar(metodo):
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo} (válidos: {', '.join(METODOS)})")
+
+
+# --------------------------- CORRELACIONES --------------------------- #
+def temperatura_hidrato(presion_bar, densidad_relativa):
+    # Towler-Mokhatab (2005), presión absoluta en bar -> temperatura en °C
+    ln_p = np.log(np.asarray(presion_bar, dtype=float) * PSIA_POR_BAR)
+    ln_d = np.log(np.asarray(densidad_relativa, dtype=float))
+    t_f = 13.47 * ln_p + 34.27 * ln_d - 1.675 * ln_p * ln_d - 20.35
+    return (t_f - 32) / 1.8
+
+
+def fraccion_molar_agua(w):
+    # w: %wt de MEG en la fase acuosa
+    agua = (100 - np.asarray(w, dtype=float)) / M_AGUA
+    return agua / (agua + np.asarray(w, dtype=float) / M_MEG)
+
+
+def depresion(w, metodo="Hammerschmidt"):
+    # Descenso de la temperatura de hidrato (°C) con w %wt de MEG en la fase acuosa
+    _verificar(metodo)
+    w = np.asarray(w, dtype=float)
+    with np.errstate(divide="ignore"):
+        if metodo == "Hammerschmidt":
+            return K_MEG * w / (M_MEG * (100 - w))
+        return -A_NIELSEN_BUCKLIN * np.log(fraccion_molar_agua(w))
+
+
+def concentracion_requerida(delta_t, metodo="Hammerschmidt"):
+    # Inversa de depresion(): %wt de MEG en la fase acuosa para bajar delta_t °C
+    _verificar(metodo)
+    delta_t = np.maximum(np.asarray(delta_t, dtype=float), 0.0)
+    if metodo == "Hammerschmidt":
+        return 100 * delta_t * M_MEG / (K_MEG + delta_t * M_MEG)
+    x_meg = -np.expm1(-delta_t / A_NIELSEN_BUCKLIN)
+    return 100 * x_meg * M_MEG / (x_meg * M_MEG + (1 - x_meg) * M_AGUA)
+
+
+def caudal_inyeccion(agua_kg_h, w_rica, c_pobre):
+    # kg/h de MEG pobre (c_pobre %wt) que, mezclado con agua_kg_h de agua libre,
+    # deja w_rica %wt en la fase acuosa: m = agua * w / (c - w). NaN si no alcanza (w >= c).
+    w_rica = np.asarray(w_rica, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(w_rica < c_pobre, agua_kg_h * w_rica / (c_pobre - w_rica), np.nan)
+
+
+def concentracion_rica(agua_kg_h, caudal_kg_h, c_pobre):
+    # %wt de MEG en la fase acuosa con un caudal de inyección dado
+    total = agua_kg_h + caudal_kg_h
+    return c_pobre * caudal_kg_h / total if total > 0 else 0.0
+
+
+# --------------------------- GRILLA --------------------------- #
+class GrillaHidratos:
+    # Filas: presiones; columnas: temperaturas de operación
+    __slots__ = ("presiones", "temperaturas", "t_hidrato", "depresion_requerida", "w_requerida", "caudal",
+                 "metodo", "w_actual", "protegido")
+
+    @property
+    def puntos(self):
+        return self.caudal.size
+
+    def tabla(self):
+        # Formato largo (una fila por punto), para exportar o graficar
+        import pandas as pd
+        p, t = np.meshgrid(self.presiones, self.temperaturas, indexing="ij")
+        columnas = {
+            "Presión (bar a)": p.ravel(),
+            "Temperatura (°C)": t.ravel(),
+            "T. hidrato (°C)": np.broadcast_to(self.t_hidrato[:, None], p.shape).ravel(),
+            "Depresión requerida (°C)": self.depresion_requerida.ravel(),
+            "MEG en fase acuosa (%wt)": self.w_requerida.ravel(),
+            "Caudal MEG (kg/h)": self.caudal.ravel(),
+        }
+        if self.protegido is not None:
+            columnas["Protegido"] = self.protegido.ravel()
+        return pd.DataFrame(columnas)
+
+
+def grilla(presiones, temperaturas, densidad_relativa, concentracion, agua_kg_h,
+           metodo="Hammerschmidt", margen=MARGEN, caudal_actual=None):
+    # concentracion: %wt de MEG pobre medida en el laboratorio. Con caudal_actual
+    # (kg/h) se marca además qué puntos quedan protegidos con la inyección actual.
+    _verificar(metodo)
+    resultado = GrillaHidratos()
+    resultado.metodo = metodo
+    resultado.presiones = np.asarray(presiones, dtype=float)
+    resultado.temperaturas = np.asarray(temperaturas, dtype=float)
+    resultado.t_hidrato = temperatura_hidrato(resultado.presiones, densidad_relativa)
+    resultado.depresion_requerida = np.maximum(
+        resultado.t_hidrato[:, None] + margen - resultado.temperaturas[None, :], 0.0)
+    resultado.w_requerida = concentracion_requerida(resultado.depresion_requerida, metodo)
+    resultado.caudal = caudal_inyeccion(agua_kg_h, resultado.w_requerida, concentracion)
+    resultado.w_actual = resultado.protegido = None
+    if caudal_actual is not None:
+        resultado.w_actual = concentracion_rica(agua_kg_h, caudal_actual, concentracion)
+        resultado.protegido = depresion(resultado.w_actual, metodo) >= resultado.depresion_requerida
+    return resultado
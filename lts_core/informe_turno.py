@@ -0,0 +1,207 @@
+# INFORME DE TURNO - TODOS LOS ANÁLISIS DE UN PERÍODO EN UN SOLO PDF
+#
+# Uso:
+#   python -m lts_core.informe_turno --desde "2024-05-01 06:00" --hasta "2024-05-01 18:00" [--salida informes]
+#
+# Arma un único documento con una tabla resumen de cumplimiento por módulo y
+# parámetro y una sección por módulo con cada resultado registrado en el
+# almacén. El logo y las fuentes se incrustan una sola vez. Cada página se
+# comprime y se escribe en disco apenas se completa, y las filas de cada
+# módulo se leen del almacén de a páginas (almacen.paginas): la memoria no
+# crece con el largo del período y no queda una lectura abierta que frene
+# los checkpoints de la base.
+
+import argparse
+import os
+import sys
+import zlib
+from datetime import datetime
+
+from . import perfilado
+from .almacen import RUTA_BASE, AlmacenResultados
+from .informes_pdf import CARPETA_INFORMES, PDF
+
+CARPETA_TURNO = os.path.join(CARPETA_INFORMES, "turno")
+
+COLUMNAS_RESUMEN = [
+    ("Módulo", 38), ("Parámetro", 40), ("Análisis", 18), ("Cumplen", 18),
+    ("% Cumple", 16), ("Mínimo", 20), ("Máximo", 20), ("Promedio", 20),
+]
+COLUMNAS_DETALLE = [
+    ("Fecha", 32), ("Parámetro", 45), ("Valor", 25), ("Estado", 22), ("Operador", 36), ("Muestreo en", 30),
+]
+
+
+# --------------------------- ESCRITURA INCREMENTAL --------------------------- #
+class _Salida:
+    # Reemplaza al buffer en memoria de FPDF (un str al que se le suma con +=
+    # y se le pide len() para los offsets): escribe directo al archivo.
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.largo = 0
+
+    def __iadd__(self, texto):
+        datos = texto.encode("latin-1")
+        self.archivo.write(datos)
+        self.largo += len(datos)
+        return self
+
+    def __len__(self):
+        return self.largo
+
+
+class PDFTurno(PDF):
+    titulo = "INFORME DE TURNO - LABORATORIO"
+
+    def __init__(self, archivo):
+        super().__init__()
+        self.buffer = _Salida(archivo)
+        self.encabezado_tabla = None  # columnas a repetir al principio de cada página
+        self._recortes = {}  # (texto, ancho, negrita) -> texto que entra en la celda
+
+    def header(self):
+        super().header()
+        if self.encabezado_tabla:
+            self.fila([titulo for titulo, _ in self.encabezado_tabla], negrita=True)
+
+    def fila(self, celdas, negrita=False):
+        self.set_font("Arial", "B" if negrita else "", 8)
+        for (titulo, ancho), valor in zip(self.encabezado_tabla, celdas):
+            clave = (valor, ancho, negrita)
+            texto = self._recortes.get(clave)
+            if texto is None:
+                texto = str(valor)
+                while len(texto) > 1 and self.get_string_width(texto) > ancho - 2:
+                    texto = texto[:-1]  # se recorta para no invadir la celda vecina
+                if len(self._recortes) < 10000:
+                    self._recortes[clave] = texto
+            self.cell(ancho, 6, texto, 1, 0, "C" if negrita else "L", negrita)
+        self.ln()
+
+    def tabla(self, columnas, filas):
+        self.set_fill_color(220, 220, 220)
+        self.encabezado_tabla = columnas
+        self.fila([titulo for titulo, _ in columnas], negrita=True)
+        for fila in filas:
+            if self.y + 6 > self.page_break_trigger:
+                self.add_page()  # el encabezado se repite desde header()
+            self.fila(fila)
+        self.encabezado_tabla = None
+
+    def _endpage(self):
+        # La página terminada se escribe (comprimida) y se libera: mismos números
+        # de objeto que les daría _putpages (3 + 2n la página, 4 + 2n su contenido).
+        super()._endpage()
+        if self.page == 1:
+            self._out(f"%PDF-{self.pdf_version}")  # la versión ya quedó fijada por el logo
+        contenido = zlib.compress(self.pages[self.page].encode("latin-1"))
+        self.pages[self.page] = ""
+        self._newobj()
+        self._out("<</Type /Page")
+        self._out("/Parent 1 0 R")
+        self._out("/Resources 2 0 R")
+        if self.pdf_version > "1.3":
+            self._out("/Group <</Type /Group /S /Transparency /CS /DeviceRGB>>")
+        self._out(f"/Contents {self.n + 1} 0 R>>")
+        self._out("endobj")
+        self._newobj()
+        self._out(f"<</Filter /FlateDecode /Length {len(contenido)}>>")
+        self._putstream(contenido)
+        self._out("endobj")
+
+    def _putheader(self):
+        pass  # ya escrito con la primera página
+
+    def _putpages(self):
+        # Solo falta el nodo raíz de páginas; las páginas ya están en el archivo
+        self.offsets[1] = len(self.buffer)
+        self._out("1 0 obj")
+        self._out("<</Type /Pages")
+        self._out("/Kids [" + " ".join(f"{3 + 2 * i} 0 R" for i in range(self.page)) + "]")
+        self._out(f"/Count {self.page}")
+        self._out(f"/MediaBox [0 0 {self.fw_pt:.2f} {self.fh_pt:.2f}]")
+        self._out(">>")
+        self._out("endobj")
+
+
+def _numero(valor):
+    return "" if valor is None else f"{valor:.4g}"
+
+
+# --------------------------- INFORME --------------------------- #
+@perfilado.cronometrado("pdf.informe_turno")
+def escribir_informe_turno(almacen, ruta, desde=None, hasta=None, generado_por=""):
+    # Escribe el informe en ruta (atómicamente); devuelve la cantidad de resultados incluidos
+    resumen = almacen.resumen(desde, hasta)
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "wb") as archivo:
+            pdf = PDFTurno(archivo)
+            pdf.fecha = datetime.now()
+            pdf.add_page()
+            pdf.add_section("Período", {
+                "Desde": desde or "inicio del registro",
+                "Hasta": hasta or "último resultado",
+                "Generado por": generado_por or "-",
+            })
+
+            pdf.set_font("Arial", "B", 11)
+            pdf.cell(0, 10, "Resumen de cumplimiento", 0, 1)
+            pdf.tabla(COLUMNAS_RESUMEN, (
+                [modulo, parametro, n, cumplen or 0, f"{100 * (cumplen or 0) / n:.1f}" if n else "-",
+                 _numero(minimo), _numero(maximo), _numero(promedio)]
+                for modulo, parametro, n, cumplen, minimo, maximo, promedio in resumen
+            ))
+
+            total = 0
+
+            def detalle(modulo):
+                nonlocal total
+                for pagina in almacen.paginas(modulo, desde=desde, hasta=hasta):
+                    total += len(pagina)
+                    for _, fecha, _, parametro, valor, cumple, operador, muestreo_en, _, _ in pagina:
+                        yield [fecha, parametro, _numero(valor), "Cumple" if cumple else "No cumple",
+                               operador or "", muestreo_en or ""]
+
+            for modulo in dict.fromkeys(fila[0] for fila in resumen):  # los módulos del período, en orden
+                pdf.add_page()
+                pdf.set_font("Arial", "B", 12)
+                pdf.cell(0, 10, modulo, 0, 1)
+                pdf.tabla(COLUMNAS_DETALLE, detalle(modulo))
+            if not total:
+                pdf.add_section("Resultados", "No hay análisis registrados en el período.")
+            pdf.close()
+        os.replace(temporal, ruta)
+    except BaseException:
+        # Un error a mitad de camino (base, disco, Ctrl+C) no deja el temporal a medias
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    return total
+
+
+def nombre_informe(desde=None, hasta=None):
+    def parte(fecha):
+        return "todo" if fecha is None else str(fecha).replace(":", "").replace(" ", "_").replace("-", "")[:13]
+    return f"informe_turno_{parte(desde)}_{parte(hasta)}.pdf"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el informe de turno con todos los análisis de un período.")
+    parser.add_argument("--desde", help="inicio del período (AAAA-MM-DD HH:MM)")
+    parser.add_argument("--hasta", help="fin del período (AAAA-MM-DD HH:MM)")
+    parser.add_argument("--base", default=RUTA_BASE, help="base de resultados (default: informes/resultados.db)")
+    parser.add_argument("--salida", default=CARPETA_INFORMES, help="carpeta raíz de informes (default: informes)")
+    args = parser.parse_args(argv)
+
+    desde = datetime.fromisoformat(args.desde) if args.desde else None
+    hasta = datetime.fromisoformat(args.hasta) if args.hasta else None
+    ruta = os.path.join(args.salida, "turno", nombre_informe(desde, hasta))
+    total = escribir_informe_turno(AlmacenResultados(args.base), ruta, desde, hasta)
+    print(f"{ruta}: {total} resultados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
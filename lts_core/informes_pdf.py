@@ -0,0 +1,63 @@
+# INFORMES PDF - DISEÑO COMÚN DE LOS INFORMES DE LABORATORIO
+
+from datetime import datetime
+
+from . import recursos
+from .recursos import CARPETA_INFORMES, LOGO_PATH, carpeta_modulo  # noqa: F401 (se importan desde acá)
+from .texto_pdf import PDFBase
+
+EXPLICACIONES = {
+    "Gas Natural": "Evaluación de H₂S y CO₂.",
+    "Gasolina Estabilizada": "Control de TVR, sales y sedimentos.",
+    "MEG": "Control del inhibidor de formación de hidratos.",
+    "TEG": "Análisis del glicol para deshidratación.",
+    "Agua Desmineralizada": "Control de cloruros en agua desmineralizada.",
+    "Aminas": "Evaluación de solvente amínico y cargas ácidas.",
+}
+
+# --------------------------- PDF --------------------------- #
+class PDF(PDFBase):
+    titulo = "INFORME DE ANÁLISIS DE LABORATORIO"
+    fecha = None  # fecha del informe; por defecto, la del momento de generarlo
+
+    def header(self):
+        recursos.insertar_logo_pdf(self, LOGO_PATH, 10, 8, 33)
+        self.set_font("Arial", "B", 12)
+        self.cell(0, 10, self.titulo, 0, 1, "C")
+        self.set_font("Arial", "", 10)
+        self.cell(0, 10, f"Fecha: {(self.fecha or datetime.now()).strftime('%Y-%m-%d %H:%M')}", 0, 1, "R")
+        self.ln(5)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font("Arial", "I", 8)
+        self.cell(0, 10, "Confidencial - Uso interno PETROGAS", 0, 0, "C")
+
+    def add_section(self, title, content):
+        self.set_font("Arial", "B", 11)
+        self.cell(0, 10, title, 0, 1)
+        self.set_font("Arial", "", 10)
+        if isinstance(content, dict):
+            for k, v in content.items():
+                self.cell(0, 8, f"{k}: {v}", 0, 1)
+        else:
+            self.multi_cell(0, 8, str(content))
+        self.ln(2)
+
+
+def construir_pdf(operador, explicacion, resultados, observaciones, muestreo_en=None, muestra_por=None, fecha=None):
+    # Devuelve el informe listo para descargar o escribir en disco (bytes).
+    # Sin datos de muestreo (None) esas secciones se omiten.
+    pdf = PDF()
+    pdf.fecha = fecha
+    pdf.add_page()
+    pdf.add_section("Operador", operador)
+    if muestreo_en is not None:
+        pdf.add_section("Muestreo en", muestreo_en)
+    if muestra_por is not None:
+        pdf.add_section("Muestra tomada por", muestra_por)
+    pdf.add_section("Explicación técnica", explicacion)
+    pdf.add_section("Resultados", resultados)
+    pdf.add_section("Observaciones", observaciones or "Sin observaciones.")
+    # PDFBase ya dejó todo el texto en latin-1 (o en la fuente Unicode): no se pierde nada al codificar
+    return pdf.output(dest='S').encode('latin-1')
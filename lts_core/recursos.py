@@ -0,0 +1,127 @@
+# RECURSOS - CACHÉ DE ARCHIVOS ESTÁTICOS COMPARTIDA POR LA INTERFAZ Y LOS PDF
+#
+# Streamlit vuelve a ejecutar el script en cada interacción, pero los módulos
+# importados quedan cargados en el proceso: lo que se guarda acá se lee y se
+# procesa una sola vez por servidor. Cada archivo se invalida cuando cambia
+# su fecha de modificación.
+
+import base64
+import os
+import re
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # carpeta de las aplicaciones
+LOGO_PATH = os.path.join(RAIZ, "logopetrogas.png")
+CARPETA_INFORMES = "informes"
+INTERVALO_VERIFICACION = 2.0  # segundos entre chequeos de mtime de un mismo archivo
+
+ESTILO_APP = """
+    <style>
+        .stApp { background-color: #1e1e1e; color: white; }
+        .stButton>button, .stDownloadButton>button {
+            background-color: #0d6efd; color: white; border-radius: 8px; border: none;
+        }
+        input, textarea, .stTextInput, .stTextArea, .stNumberInput input {
+            background-color: #2e2e2e !important; color: white !important; border: 1px solid #555 !important;
+        }
+        .stSelectbox div { background-color: #2e2e2e !important; color: white !important; }
+    </style>
+"""
+
+# Estilo de LTS_LAB_ANALYZER_APP y SIERRACHATALAB
+ESTILO_CLASICO = """
+    <style>
+        .stApp { background-color: #2d2d2d; color: #f0f0f0; }
+        .stButton>button { background-color: #0d6efd; color: white; }
+        input, textarea, .stTextInput, .stTextArea, .stNumberInput, .stSelectbox div {
+            background-color: #3a3a3a !important; color: white !important;
+        }
+    </style>
+"""
+
+
+def carpeta_modulo(modulo, raiz=CARPETA_INFORMES):
+    # informes/<modulo en minúsculas, con guiones bajos>; nada fuera de [\w-]
+    # (un módulo leído de un CSV no puede escribir fuera de la raíz)
+    return os.path.join(raiz, nombre_seguro(modulo.lower(), "general"))
+
+
+def nombre_seguro(texto, reemplazo="informe"):
+    # Texto apto para un nombre de archivo: solo letras, dígitos, "_" y "-"
+    return re.sub(r"[^\w-]+", "_", str(texto)).strip("_") or reemplazo
+
+
+_archivos = {}  # ruta -> {"mtime", "verificado", "datos", "derivados"}
+_lock = threading.Lock()
+
+
+def _entrada(ruta):
+    ahora = time.monotonic()
+    entrada = _archivos.get(ruta)
+    if entrada is not None and ahora - entrada["verificado"] < INTERVALO_VERIFICACION:
+        return entrada
+    try:
+        mtime = os.stat(ruta).st_mtime_ns
+    except OSError:
+        mtime = None
+    with _lock:
+        entrada = _archivos.get(ruta)
+        if entrada is None or entrada["mtime"] != mtime:
+            datos = None
+            if mtime is not None:
+                with open(ruta, "rb") as f:
+                    datos = f.read()
+            entrada = {"mtime": mtime, "datos": datos, "derivados": {}}
+            _archivos[ruta] = entrada
+        entrada["verificado"] = ahora
+    return entrada
+
+
+def leer_bytes(ruta):
+    # Contenido del archivo, o None si no existe
+    return _entrada(ruta)["datos"]
+
+
+def existe(ruta):
+    return leer_bytes(ruta) is not None
+
+
+def derivado(ruta, nombre, funcion):
+    # Memoriza funcion(ruta, datos) para la versión actual del archivo
+    entrada = _entrada(ruta)
+    if entrada["datos"] is None:
+        return None
+    derivados = entrada["derivados"]
+    if nombre not in derivados:
+        derivados[nombre] = funcion(ruta, entrada["datos"])
+    return derivados[nombre]
+
+
+def logo_html(ruta=LOGO_PATH, ancho=200):
+    def _html(_, datos):
+        codificado = base64.b64encode(datos).decode("utf-8")
+        return f"""
+        <div style='text-align:center;'>
+            <img src='data:image/png;base64,{codificado}' width='{ancho}'/>
+        </div>
+    """
+    return derivado(ruta, f"html_{ancho}", _html)
+
+
+def _info_imagen_pdf(ruta, _):
+    from fpdf import FPDF
+    return FPDF()._parsepng(ruta)
+
+
+def insertar_logo_pdf(pdf, ruta, x, y, w):
+    # Igual que pdf.image(), pero el PNG se decodifica una sola vez por proceso
+    # y no una vez por documento.
+    info = derivado(ruta, "pdf_png", _info_imagen_pdf)
+    if info is None:
+        return
+    if ruta not in pdf.images:
+        pdf.images[ruta] = dict(info, i=len(pdf.images) + 1)
+        if "smask" in info and pdf.pdf_version < "1.4":
+            pdf.pdf_version = "1.4"  # transparencia, como hace _parsepng
+    pdf.image(ruta, x, y, w)
@@ -0,0 +1,128 @@
+# TEXTO PDF - LIMPIEZA DE TEXTO PARA LAS FUENTES DEL PDF EN UNA SOLA PASADA
+#
+# Las fuentes estándar de FPDF solo cubren latin-1. Los caracteres de latin-1
+# ("°", "ñ", "³", "á", ...) se conservan; el resto se translitera al
+# codificar a latin-1 en C con un manejador de errores propio, que resuelve
+# cada tramo fuera de latin-1 con la tabla de reemplazos (o por
+# descomposición Unicode) y lo memoriza. En textos largos (observaciones)
+# con muchos símbolos, una llamada por tramo es cara: ahí los caracteres de
+# la tabla que aparecen se cambian antes con str.replace, una búsqueda en C
+# por carácter, y el texto latin-1 puro sale después de un solo chequeo.
+
+import codecs
+import os
+import re
+import unicodedata
+
+from fpdf import FPDF
+
+# Fuente TTF Unicode opcional (p. ej. DejaVuSans.ttf): con ella solo se
+# reemplazan los símbolos que la fuente no trae.
+FUENTE_TTF = os.environ.get("LTS_FUENTE_TTF") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fuentes", "DejaVuSans.ttf"
+)
+
+SIMBOLOS = {
+    "✓": "OK", "✔": "OK", "✅": "OK", "❌": "NO", "✗": "NO", "✘": "NO",
+    "⚠": "!", "️": "", "‍": "",
+}
+
+REEMPLAZOS = {
+    **SIMBOLOS,
+    "₀": "0", "₁": "1", "₂": "2", "₃": "3", "₄": "4",
+    "₅": "5", "₆": "6", "₇": "7", "₈": "8", "₉": "9",
+    "⁰": "0", "⁴": "4", "⁵": "5", "⁶": "6", "⁷": "7", "⁸": "8", "⁹": "9",
+    "“": '"', "”": '"', "„": '"', "‘": "'", "’": "'", "‚": "'",
+    "–": "-", "—": "-", "−": "-", "•": "-", "…": "...",
+    "→": "->", "←": "<-", "⇒": "=>", "≠": "!=", "≥": ">=", "≤": "<=", "≈": "~",
+    "√": "sqrt", "∑": "Suma", "Δ": "Delta", "ρ": "rho", "€": "EUR", "Œ": "OE", "œ": "oe",
+}
+
+
+class _Tabla(dict):
+    # Tabla para str.translate que completa sola los caracteres que no conoce
+    def __init__(self, reemplazos, limite):
+        super().__init__({ord(k): v for k, v in reemplazos.items()})
+        self.limite = limite
+
+    def __missing__(self, codigo):
+        if codigo <= self.limite:
+            valor = codigo
+        else:
+            base = unicodedata.normalize("NFKD", chr(codigo))
+            valor = "".join(c for c in base if ord(c) <= self.limite and not unicodedata.combining(c))
+        self[codigo] = valor
+        return valor
+
+
+TABLA_LATIN1 = _Tabla(REEMPLAZOS, 0xFF)
+TABLA_UNICODE = _Tabla(SIMBOLOS, 0xFFFF)  # las fuentes TTF de FPDF solo cubren el plano básico
+
+_FUERA_FUENTE = re.compile(r"[\u2600-\u27bf\ufe0f\u200d\U00010000-\U0010ffff]+")  # pictogramas y emojis
+
+
+_TRAMOS = {}  # tramo fuera de latin-1 -> reemplazo, memorizado
+
+
+def _transliterar(error):
+    tramo = error.object[error.start:error.end]
+    reemplazo = _TRAMOS.get(tramo)
+    if reemplazo is None:
+        reemplazo = tramo.translate(TABLA_LATIN1)
+        if len(_TRAMOS) < 4096:
+            _TRAMOS[tramo] = reemplazo
+    return reemplazo, error.end
+
+
+codecs.register_error("texto_pdf", _transliterar)
+
+
+def _unicode(tramo):
+    return tramo.group().translate(TABLA_UNICODE)
+
+
+_CORTOS = 512  # hasta este largo, codificar con el manejador de errores es lo más rápido
+
+
+def limpiar(texto, unicode=False):
+    texto = str(texto)
+    if texto.isascii():
+        return texto
+    if unicode:
+        return _FUERA_FUENTE.sub(_unicode, texto)
+    if len(texto) > _CORTOS:
+        try:
+            texto.encode("latin-1")
+            return texto
+        except UnicodeEncodeError:
+            for caracter, reemplazo in REEMPLAZOS.items():
+                if caracter in texto:
+                    texto = texto.replace(caracter, reemplazo)
+    return texto.encode("latin-1", "texto_pdf").decode("latin-1")
+
+
+def fuente_unicode():
+    # Ruta de la fuente TTF si está disponible, o None para usar las fuentes estándar
+    return FUENTE_TTF if FUENTE_TTF and os.path.exists(FUENTE_TTF) else None
+
+
+# --------------------------- PDF --------------------------- #
+class PDFBase(FPDF):
+    # Base de todas las clases PDF: todo texto que pasa por cell, multi_cell,
+    # write o text (y por get_string_width) se limpia acá, una sola vez.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fuente = None
+        ruta = fuente_unicode()
+        if ruta:
+            for estilo in ("", "B", "I", "BI"):
+                self.add_font("LTSUnicode", estilo, ruta, uni=True)
+            self.fuente = "ltsunicode"
+
+    def set_font(self, family, style="", size=0):
+        if self.fuente and family.lower() in ("arial", "helvetica", ""):
+            family = self.fuente
+        super().set_font(family, style, size)
+
+    def normalize_text(self, txt):
+        return limpiar(txt, unicode=bool(self.unifontsubset))
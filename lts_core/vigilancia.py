@@ -0,0 +1,411 @@
+# VIGILANCIA - INGESTA AUTOMÁTICA DE LA CARPETA DE ENTRADA DEL LABORATORIO
+#
+# Uso:
+#   python -m lts_core.vigilancia entrada [--una-vez] [--trabajadores 4] [--intervalo 2]
+#
+# Cada CSV que aparece (o crece) en la carpeta se procesa según su encabezado:
+#   - Cromatógrafo (muestra, componente, fracción): se calculan las
+#     propiedades del gas, la composición va al archivo histórico Parquet y
+#     el CO₂ se valida contra la especificación de Gas Natural. Mientras el
+#     archivo sigue creciendo, la última muestra puede estar incompleta: se
+#     procesa hasta la primera fila de esa muestra, y ella entra completa en
+#     la próxima lectura (o cuando el archivo lleva CIERRE segundos sin
+#     cambios). Un cromatograma de una sola muestra se procesa al cerrarse.
+#   - LIMS (modulo, parametro, valor[, fecha, operador, muestreo_en,
+#     muestra_por, muestra]): cada resultado se valida con los límites
+#     vigentes en su fecha; los de fecha ilegible se rechazan.
+# Los resultados validados se guardan en el almacén y, después de cada
+# tanda de archivos, se sincroniza el motor de deriva (lts_core.deriva), que
+# registra las alarmas en la base. Un checkpoint JSON guarda hasta qué byte
+# se procesó cada archivo: al reiniciar no se repite nada, y si un archivo
+# crece solo se leen las líneas nuevas. Con watchdog
+# instalado los cambios se detectan al instante (inotify); sin él, por
+# sondeo. Los atrasos se procesan en paralelo, un archivo por proceso.
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from . import archivo_gas, cromatografia, deriva, especificaciones
+from .almacen import RUTA_BASE, obtener_almacen
+from .archivo_gas import RAIZ_ARCHIVO, ArchivoGas
+
+CHECKPOINT = ".vigilancia.json"  # dentro de la carpeta vigilada
+INTERVALO = 2.0  # segundos entre sondeos
+ESTABLE = 1.0  # segundos sin modificaciones antes de leer un archivo (que el instrumento termine de escribir)
+CIERRE = 60.0  # segundos sin modificaciones para dar por terminada la última muestra de un cromatograma
+COLUMNAS_LIMS = {"modulo", "parametro", "valor"}
+OPCIONALES_LIMS = ["operador", "muestreo_en", "muestra_por", "muestra"]
+
+
+# --------------------------- LECTURA DESDE UN OFFSET --------------------------- #
+class _Tramo(io.RawIOBase):
+    # El encabezado del CSV seguido de los bytes [inicio, fin) del archivo,
+    # para que pandas lea solo lo nuevo como si fuera un CSV completo.
+    def __init__(self, ruta, encabezado, inicio, fin):
+        super().__init__()
+        self._archivo = open(ruta, "rb")
+        self._encabezado = encabezado
+        self._inicio = inicio
+        self._total = len(encabezado) + fin - inicio
+        self._posicion = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, posicion, desde=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._posicion, io.SEEK_END: self._total}[desde]
+        self._posicion = min(max(base + posicion, 0), self._total)
+        return self._posicion
+
+    def tell(self):
+        return self._posicion
+
+    def readinto(self, destino):
+        restante = self._total - self._posicion
+        if restante <= 0:
+            return 0
+        n = min(len(destino), restante)
+        if self._posicion < len(self._encabezado):
+            datos = self._encabezado[self._posicion:self._posicion + n]
+        else:
+            self._archivo.seek(self._inicio + self._posicion - len(self._encabezado))
+            datos = self._archivo.read(n)
+        destino[:len(datos)] = datos
+        self._posicion += len(datos)
+        return len(datos)
+
+    def close(self):
+        self._archivo.close()
+        super().close()
+
+
+def _encabezado(ruta):
+    with open(ruta, "rb") as f:
+        linea = f.readline()
+    return linea.removeprefix(b"\xef\xbb\xbf"), len(linea)
+
+
+def _columnas(encabezado):
+    return [c.strip().strip('"').lower() for c in encabezado.decode("utf-8", "replace").strip().split(",")]
+
+
+def _lineas_hacia_atras(ruta, inicio, fin):
+    # (posición, línea) de las líneas de [inicio, fin), de la última a la primera;
+    # inicio es principio de línea
+    with open(ruta, "rb") as f:
+        resto = b""  # principio (quizás incompleto) del bloque leído antes
+        while fin > inicio:
+            bloque = max(inicio, fin - 65536)
+            f.seek(bloque)
+            datos = f.read(fin - bloque) + resto
+            partes = datos.split(b"\n")
+            posicion = bloque + len(datos)
+            for parte in reversed(partes[1:]):
+                posicion -= len(parte)
+                if parte:
+                    yield posicion, parte
+                posicion -= 1  # el salto de línea
+            resto, fin = partes[0], bloque
+        if resto:
+            yield inicio, resto
+
+
+def _fin_muestras(ruta, inicio, fin):
+    # Para un cromatograma que todavía crece, posición de la primera fila de su
+    # última muestra (que puede seguir llegando); para un LIMS, fin
+    encabezado, largo_encabezado = _encabezado(ruta)
+    columnas = _columnas(encabezado)
+    if COLUMNAS_LIMS <= set(columnas):
+        return fin
+    posicion_muestra = next((i for i, c in enumerate(columnas) if c in cromatografia.COLUMNAS_MUESTRA), None)
+    if posicion_muestra is None:
+        return inicio  # una sola muestra: se espera a que el archivo se cierre
+    ultima, desde = None, None
+    for posicion, linea in _lineas_hacia_atras(ruta, max(inicio, largo_encabezado), fin):
+        campos = next(csv.reader([linea.decode("utf-8", "replace")]), [])
+        muestra = campos[posicion_muestra].strip() if len(campos) > posicion_muestra else ""
+        if ultima is None:
+            ultima = muestra
+        elif muestra != ultima:
+            return desde
+        desde = posicion
+    return inicio  # todo lo nuevo es de la misma muestra
+
+
+def _fin_completo(ruta, inicio, tamano):
+    # Posición siguiente al último salto de línea: una línea a medio escribir se deja para la próxima vez
+    with open(ruta, "rb") as f:
+        fin = tamano
+        while fin > inicio:
+            bloque = max(inicio, fin - 65536)
+            f.seek(bloque)
+            salto = f.read(fin - bloque).rfind(b"\n")
+            if salto >= 0:
+                return bloque + salto + 1
+            fin = bloque
+    return inicio
+
+
+# --------------------------- PROCESAMIENTO --------------------------- #
+def _procesar_cromatograma(lector, ruta_base, raiz_archivo, fecha_archivo):
+    resultados = cromatografia.calcular_por_bloques(lector, composicion=True)
+    # Cada muestra con su fecha (la del nombre de la muestra o, si no la trae,
+    # la de escritura del archivo), la misma en el archivo Parquet y en el almacén
+    resultados["fecha"] = archivo_gas.fechas_muestras(resultados, fecha_archivo)
+    ArchivoGas(raiz_archivo).agregar(resultados)
+    co2 = pd.DataFrame({"CO₂": resultados["CO2"].to_numpy() * 100}, index=resultados.index)  # fracción molar -> %
+    cumple, _ = especificaciones.validar_lote(co2, "Gas Natural")
+    obtener_almacen(ruta_base).escribir([
+        (fecha, "Gas Natural", "CO₂", float(valor), int(ok), "vigilancia", "", "", str(muestra))
+        for muestra, fecha, valor, ok in zip(resultados.index, resultados["fecha"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+                                             co2["CO₂"], cumple["CO₂ (%)"])
+    ])
+    return {
+        "tipo": "cromatografo", "registros": len(resultados),
+        "cumplen": int(cumple["CO₂ (%)"].sum()), "rechazados": 0,
+        "avisos": int((resultados["Componentes no reconocidos"] != "").sum()),
+    }
+
+
+def _procesar_lims(lector, ruta_base):
+    almacen = obtener_almacen(ruta_base)
+    resumen = {"tipo": "lims", "registros": 0, "cumplen": 0, "rechazados": 0, "avisos": 0, "motivos": {}}
+    motivos = resumen["motivos"]  # motivo de rechazo -> cantidad (los mismos que informa la API)
+    for bloque in pd.read_csv(lector, chunksize=cromatografia.TAMANO_BLOQUE, encoding="utf-8-sig"):
+        bloque.columns = [c.strip().lower() for c in bloque.columns]
+        # Fechas en cualquier formato; sin fecha cuenta como recibido ahora, pero
+        # una fecha ilegible se rechaza: validarla con los límites de hoy sería inventarla
+        texto = bloque["fecha"] if "fecha" in bloque else pd.Series(pd.NA, index=bloque.index, dtype=object)
+        fechas = pd.to_datetime(texto, format="mixed", errors="coerce")
+        fechas[texto.isna() | (texto.astype(str).str.strip() == "")] = pd.Timestamp.now().floor("s")
+        validado = especificaciones.validar_historico(bloque.assign(fecha=fechas))
+        for motivo, cantidad in validado["motivo"][validado["motivo"] != ""].value_counts().items():
+            motivos[motivo] = motivos.get(motivo, 0) + int(cantidad)
+        conocido = validado["motivo"] == ""
+        validado = validado[conocido]
+        valores = pd.to_numeric(validado["valor"])
+        extras = [validado[c].fillna("").astype(str) if c in validado else [""] * len(validado) for c in OPCIONALES_LIMS]
+        almacen.escribir(list(zip(
+            validado["fecha"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+            validado["modulo"],
+            especificaciones.nombres_canonicos(validado["parametro"]),
+            valores.astype(float),
+            validado["cumple"].astype(int),
+            *extras,
+        )))
+        resumen["registros"] += len(validado)
+        resumen["cumplen"] += int(validado["cumple"].sum())
+    resumen["rechazados"] = sum(motivos.values())
+    return resumen
+
+
+def procesar_archivo(ruta, inicio, fin, ruta_base=RUTA_BASE, raiz_archivo=RAIZ_ARCHIVO):
+    # Procesa los bytes [inicio, fin) de un CSV (inicio 0 = desde el principio).
+    # Corre en un proceso del grupo: solo recibe y devuelve datos simples.
+    encabezado, largo_encabezado = _encabezado(ruta)
+    inicio = max(inicio, largo_encabezado)
+    if fin <= inicio:
+        return {"tipo": "vacio", "registros": 0, "cumplen": 0, "rechazados": 0, "avisos": 0}
+    columnas = set(_columnas(encabezado))
+    lector = io.BufferedReader(_Tramo(ruta, encabezado, inicio, fin), buffer_size=1 << 20)
+    with lector:
+        if COLUMNAS_LIMS <= columnas:
+            return _procesar_lims(lector, ruta_base)
+        return _procesar_cromatograma(lector, ruta_base, raiz_archivo, datetime.fromtimestamp(os.path.getmtime(ruta)))
+
+
+# --------------------------- VIGILANTE --------------------------- #
+class Vigilante:
+    def __init__(self, carpeta, ruta_base=RUTA_BASE, raiz_archivo=RAIZ_ARCHIVO, trabajadores=None,
+                 intervalo=INTERVALO, estable=ESTABLE, checkpoint=None, cierre=CIERRE):
+        self.carpeta = carpeta
+        self.ruta_base = ruta_base
+        self.raiz_archivo = raiz_archivo
+        self.trabajadores = trabajadores or os.cpu_count()
+        self.intervalo = intervalo
+        self.estable = estable
+        self.cierre = cierre
+        self.ruta_checkpoint = checkpoint or os.path.join(carpeta, CHECKPOINT)
+        self.estado = self._leer_checkpoint()
+        self.alarmas = []  # las que registró el motor de deriva en la última tanda
+        self._aviso = threading.Event()  # lo activa watchdog cuando algo cambia en la carpeta
+
+    # ---- checkpoint ----
+    def _leer_checkpoint(self):
+        try:
+            with open(self.ruta_checkpoint, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _guardar_checkpoint(self):
+        temporal = f"{self.ruta_checkpoint}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, indent=1, ensure_ascii=False)
+        os.replace(temporal, self.ruta_checkpoint)
+
+    # ---- búsqueda de trabajo ----
+    def pendientes(self):
+        # [(nombre, inicio, fin)] de los CSV con líneas completas sin procesar
+        ahora = time.time()
+        tareas = []
+        with os.scandir(self.carpeta) as entradas:
+            for entrada in entradas:
+                if not entrada.is_file() or entrada.name.startswith(".") or not entrada.name.lower().endswith(".csv"):
+                    continue
+                info = entrada.stat()
+                if ahora - info.st_mtime < self.estable:
+                    continue  # todavía se está escribiendo
+                previo = self.estado.get(entrada.name, {})
+                inicio = previo.get("offset", 0)
+                if previo.get("inodo") != info.st_ino or info.st_size < inicio:
+                    inicio = 0  # archivo reemplazado o truncado: se procesa de nuevo
+                elif previo.get("error") and previo.get("mtime") == info.st_mtime_ns:
+                    continue  # falló y no cambió desde entonces
+                if info.st_size <= inicio:
+                    continue
+                fin = _fin_completo(entrada.path, inicio, info.st_size)
+                if fin > inicio and ahora - info.st_mtime < self.cierre:
+                    fin = _fin_muestras(entrada.path, inicio, fin)  # la última muestra puede estar incompleta
+                if fin > inicio:
+                    tareas.append((entrada.name, inicio, fin, info.st_ino, info.st_mtime_ns))
+        return sorted(tareas)
+
+    def procesar_pendientes(self):
+        # Procesa todo lo pendiente (en paralelo si hay varios archivos); devuelve un resumen por archivo
+        tareas = self.pendientes()
+        if not tareas:
+            return []
+        resumenes = []
+        if len(tareas) == 1 or self.trabajadores == 1:
+            futuros = [(t, None) for t in tareas]
+            pool = None
+        else:
+            # spawn: el proceso principal puede tener hilos vivos (watchdog) y fork no es seguro con hilos
+            pool = ProcessPoolExecutor(max_workers=min(self.trabajadores, len(tareas)),
+                                       mp_context=multiprocessing.get_context("spawn"))
+            futuros = [
+                (t, pool.submit(procesar_archivo, os.path.join(self.carpeta, t[0]), t[1], t[2],
+                                self.ruta_base, self.raiz_archivo))
+                for t in tareas
+            ]
+        try:
+            for (nombre, inicio, fin, inodo, mtime), futuro in futuros:
+                try:
+                    if futuro is None:
+                        resumen = procesar_archivo(os.path.join(self.carpeta, nombre), inicio, fin,
+                                                   self.ruta_base, self.raiz_archivo)
+                    else:
+                        resumen = futuro.result()
+                    self.estado[nombre] = {"offset": fin, "inodo": inodo, "mtime": mtime}
+                except Exception as e:
+                    resumen = {"tipo": "error", "error": str(e)}
+                    self.estado[nombre] = dict(self.estado.get(nombre, {}), inodo=inodo, mtime=mtime, error=str(e))
+                self._guardar_checkpoint()  # después de cada archivo: un corte no repite lo ya guardado
+                resumenes.append(dict(resumen, archivo=nombre, desde=inicio, hasta=fin))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        almacen = obtener_almacen(self.ruta_base)
+        self.alarmas = deriva.obtener_motor(almacen).sincronizar(almacen)
+        return resumenes
+
+    # ---- bucle ----
+    def _observar(self):
+        # inotify (u otro backend nativo) vía watchdog, si está instalado
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+        aviso = self._aviso
+
+        class _Manejador(FileSystemEventHandler):
+            def on_any_event(self, evento):
+                aviso.set()
+
+        observador = Observer()
+        observador.schedule(_Manejador(), self.carpeta, recursive=False)
+        observador.start()
+        return observador
+
+    def ejecutar(self, detener=None, al_procesar=None, al_alarmar=None):
+        # Vigila hasta que se active el evento detener; al_procesar(resumen) por cada
+        # archivo procesado y al_alarmar(alarma) por cada alarma de deriva nueva
+        detener = detener or threading.Event()
+        observador = self._observar()
+        try:
+            while not detener.is_set():
+                for resumen in self.procesar_pendientes():
+                    if al_procesar:
+                        al_procesar(resumen)
+                for alarma in self.alarmas if al_alarmar else ():
+                    al_alarmar(alarma)
+                # Con watchdog se despierta apenas hay un cambio (y espera a que el archivo quede estable)
+                if self._aviso.wait(self.intervalo):
+                    self._aviso.clear()
+                    detener.wait(self.estable)
+        finally:
+            if observador is not None:
+                observador.stop()
+                observador.join()
+
+
+def _mostrar(resumen):
+    if resumen["tipo"] == "error":
+        print(f"❌ {resumen['archivo']}: {resumen['error']}", file=sys.stderr)
+        return
+    print(f"{resumen['archivo']} [{resumen['tipo']}] bytes {resumen['desde']}-{resumen['hasta']}: "
+          f"{resumen['registros']} registros | cumplen: {resumen['cumplen']} | "
+          f"rechazados: {resumen['rechazados']} | avisos: {resumen['avisos']}")
+    for motivo, cantidad in resumen.get("motivos", {}).items():
+        print(f"⚠️ {resumen['archivo']}: {cantidad} rechazados por {motivo}", file=sys.stderr)
+
+
+def _mostrar_alarma(alarma):
+    print(f"📉 {alarma.fecha} {deriva.describir(alarma)}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingesta automática de CSV del cromatógrafo y del LIMS.")
+    parser.add_argument("carpeta", help="carpeta de entrada a vigilar")
+    parser.add_argument("--base", default=RUTA_BASE, help="base de resultados (default: informes/resultados.db)")
+    parser.add_argument("--archivo", default=RAIZ_ARCHIVO, help="raíz del archivo Parquet de gas")
+    parser.add_argument("--trabajadores", type=int, default=os.cpu_count(), help="procesos para archivos atrasados")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO, help="segundos entre sondeos")
+    parser.add_argument("--una-vez", action="store_true", help="procesar lo pendiente y salir")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.carpeta, exist_ok=True)
+    vigilante = Vigilante(args.carpeta, args.base, args.archivo, args.trabajadores, args.intervalo,
+                          estable=0 if args.una_vez else ESTABLE, cierre=0 if args.una_vez else CIERRE)
+    if args.una_vez:
+        resumenes = vigilante.procesar_pendientes()
+        for resumen in resumenes:
+            _mostrar(resumen)
+        for alarma in vigilante.alarmas:
+            _mostrar_alarma(alarma)
+        return 1 if any(r["tipo"] == "error" for r in resumenes) else 0
+    try:
+        vigilante.ejecutar(al_procesar=_mostrar, al_alarmar=_mostrar_alarma)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
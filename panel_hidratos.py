@@ -0,0 +1,100 @@
+# PANEL DE HIDRATOS - CALCULADORA DE INHIBICIÓN CON MEG (STREAMLIT)
+#
+# Se muestra en el módulo MEG de las apps con la concentración medida. La
+# densidad relativa del gas sale de la última muestra archivada del módulo
+# Gas Natural, de un cromatograma o se carga a mano. Es un fragmento: mover
+# los controles recalcula solo la calculadora, no toda la página.
+
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from lts_core.perfilado import etapa
+
+ORIGENES = ("Última muestra archivada", "Cromatograma (CSV)", "Manual")
+DENSIDAD_TIPICA = 0.65
+CELDAS_TABLA = 12  # presiones y temperaturas que se muestran en la tabla de caudales
+
+
+def _densidad_gas(clave):
+    # (densidad relativa, descripción del origen)
+    origen = st.radio("Composición del gas", ORIGENES, horizontal=True, key=f"origen_gas_{clave}")
+    if origen == ORIGENES[0]:
+        from lts_core.archivo_gas import ArchivoGas
+        historico = ArchivoGas().leer(desde=datetime.now() - timedelta(days=90), columnas=["densidad_relativa"])
+        historico = historico.dropna(subset=["densidad_relativa"])
+        if not historico.empty:
+            fila = historico.iloc[-1]
+            return float(fila["densidad_relativa"]), f"muestra archivada del {fila['fecha']:%Y-%m-%d %H:%M}"
+        st.info("No hay muestras archivadas en los últimos 90 días; se usa la densidad típica.")
+    elif origen == ORIGENES[1]:
+        archivo = st.file_uploader("📎 Cromatograma", type="csv", key=f"cromatograma_{clave}")
+        if archivo:
+            from lts_core import cromatografia
+            lote = cromatografia.calcular_por_bloques(archivo)
+            return float(lote["Densidad relativa"].iloc[-1]), f"cromatograma, muestra {lote.index[-1]}"
+    else:
+        densidad = st.number_input("Densidad relativa del gas", 0.55, 1.0, DENSIDAD_TIPICA, 0.01, key=f"densidad_{clave}")
+        return densidad, "cargada a mano"
+    return DENSIDAD_TIPICA, "densidad típica"
+
+
+@st.fragment
+def calculadora_hidratos(concentracion, clave):
+    import numpy as np
+    import pandas as pd
+    from lts_core import hidratos
+
+    st.markdown("### 🧊 Inhibición de hidratos y dosificación de MEG")
+    st.caption("Temperatura de hidrato por Towler-Mokhatab; depresión por Hammerschmidt o Nielsen-Bucklin. "
+               f"Concentración de MEG pobre: {concentracion:g} %wt.")
+    densidad, origen = _densidad_gas(clave)
+
+    c1, c2, c3 = st.columns(3)
+    p_min, p_max = c1.slider("Presión (bar a)", 1.0, 250.0, (20.0, 120.0), key=f"presion_{clave}")
+    t_min, t_max = c2.slider("Temperatura de operación (°C)", -40.0, 40.0, (-20.0, 25.0), key=f"temperatura_{clave}")
+    puntos = c3.select_slider("Puntos por eje", [20, 50, 100, 200, 500, 1000], 200, key=f"puntos_{clave}")
+    c1, c2, c3, c4 = st.columns(4)
+    agua = c1.number_input("Agua libre (kg/h)", 0.0, value=500.0, step=10.0, key=f"agua_{clave}")
+    metodo = c2.selectbox("Correlación", hidratos.METODOS, key=f"metodo_{clave}")
+    margen = c3.number_input("Margen (°C)", 0.0, 10.0, hidratos.MARGEN, 0.5, key=f"margen_{clave}")
+    actual = c4.number_input("Caudal actual de MEG (kg/h)", 0.0, value=0.0, step=10.0, key=f"actual_{clave}",
+                             help="0 = sin dato")
+
+    if concentracion <= 0:
+        st.info("Cargá la concentración de MEG medida para calcular la dosificación.")
+        return
+    with etapa("calculo.hidratos"):
+        grilla = hidratos.grilla(
+            np.linspace(p_min, p_max, puntos), np.linspace(t_min, t_max, puntos),
+            densidad, concentracion, agua, metodo, margen, actual or None,
+        )
+
+    alcanzables = ~np.isnan(grilla.caudal)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Densidad relativa", f"{densidad:.3f}", help=origen)
+    m2.metric("Puntos calculados", f"{grilla.puntos:,}")
+    m3.metric("Caudal máximo requerido", f"{np.nanmax(grilla.caudal):,.0f} kg/h" if alcanzables.any() else "-")
+    if grilla.protegido is not None:
+        m4.metric("Protegidos con el caudal actual", f"{100 * grilla.protegido.mean():.0f} %",
+                  help=f"{grilla.w_actual:.1f} %wt de MEG en la fase acuosa")
+    if not alcanzables.all():
+        st.warning(f"⚠️ En {100 * (~alcanzables).mean():.0f} % de los puntos el MEG a {concentracion:g} %wt "
+                   "no alcanza para la depresión requerida, con cualquier caudal.")
+
+    curvas = pd.DataFrame({"T. hidrato sin inhibir (°C)": grilla.t_hidrato}, index=pd.Index(grilla.presiones, name="bar a"))
+    if grilla.w_actual is not None:
+        curvas["T. hidrato con el caudal actual (°C)"] = grilla.t_hidrato - hidratos.depresion(grilla.w_actual, metodo)
+    st.line_chart(curvas)
+
+    filas = np.linspace(0, len(grilla.presiones) - 1, min(CELDAS_TABLA, len(grilla.presiones))).round().astype(int)
+    columnas = np.linspace(0, len(grilla.temperaturas) - 1, min(CELDAS_TABLA, len(grilla.temperaturas))).round().astype(int)
+    st.markdown("**Caudal de MEG requerido (kg/h)** - filas: presión, columnas: temperatura de operación")
+    st.dataframe(pd.DataFrame(
+        grilla.caudal[np.ix_(filas, columnas)].round(0),
+        index=[f"{p:.0f} bar" for p in grilla.presiones[filas]],
+        columns=[f"{t:.0f} °C" for t in grilla.temperaturas[columnas]],
+    ))
+    st.download_button("⬇️ Grilla completa (CSV)", key=f"descargar_hidratos_{clave}",
+                       data=lambda: grilla.tabla().to_csv(index=False).encode("utf-8"),
+                       file_name=f"hidratos_{datetime.now():%Y%m%d_%H%M}.csv", mime="text/csv")
@@ -0,0 +1,83 @@
+# PANEL DE INFORMES - ESTADO Y DESCARGA DE LOS INFORMES EN COLA (STREAMLIT)
+#
+# Lo comparten las apps: cada sesión guarda en st.session_state los ids de
+# sus trabajos; el estado real vive en la cola del proceso (la de informes o
+# la de exportaciones).
+
+import mimetypes
+from pathlib import Path
+
+import streamlit as st
+
+from lts_core.cola_informes import EN_COLA, ERROR, GENERANDO, LISTO, obtener_cola
+from lts_core.exportacion import FORMATOS, obtener_cola_exportaciones
+
+ICONOS = {EN_COLA: "🕒", GENERANDO: "⏳", LISTO: "✅", ERROR: "❌"}
+# st.download_button lee el archivo entero en memoria del servidor: por encima
+# de esto se indica dónde quedó en lugar de ofrecer la descarga
+MAX_DESCARGA = 200 * 1024 * 1024
+
+
+def _colas():
+    return obtener_cola(), obtener_cola_exportaciones()
+
+
+def _buscar(id_trabajo):
+    for cola in _colas():
+        trabajo = cola.trabajo(id_trabajo)
+        if trabajo is not None:
+            return trabajo
+    return None
+
+
+def _mime(nombre):
+    formato = next((f for f in FORMATOS if nombre.endswith(f".{f}")), None)
+    return FORMATOS[formato] if formato else mimetypes.guess_type(nombre)[0] or "application/octet-stream"
+
+
+def seguir_trabajo(clave, id_trabajo):
+    st.session_state[clave] = id_trabajo
+    st.session_state.setdefault("trabajos", []).append(id_trabajo)
+
+
+@st.fragment(run_every=1)
+def _esperar(id_trabajo):
+    # Se vuelve a ejecutar sola cada segundo, sin tocar el resto de la página,
+    # y al terminar el informe recarga la app para mostrar la descarga.
+    trabajo = _buscar(id_trabajo)
+    if trabajo is not None and trabajo.pendiente:
+        st.info(f"⏳ Generando {trabajo.nombre} ({trabajo.estado})...")
+        if trabajo.avance is not None:
+            st.progress(trabajo.avance, text=f"{100 * trabajo.avance:.0f} %")
+    else:
+        st.rerun()
+
+
+def mostrar_trabajo(clave):
+    trabajo = _buscar(st.session_state.get(clave))
+    if trabajo is None:
+        return
+    if trabajo.pendiente:
+        _esperar(trabajo.id)
+    elif trabajo.estado == LISTO and Path(trabajo.ruta).exists():
+        tamano = Path(trabajo.ruta).stat().st_size
+        if tamano > MAX_DESCARGA:
+            st.success(f"✅ {trabajo.nombre} ({tamano / 2**20:,.0f} MB) quedó en el servidor: {Path(trabajo.ruta).resolve()}")
+            st.caption("Es demasiado grande para descargarlo desde la app: exportalo como csv.gz "
+                       "o descargalo con GET /exportacion de la API de ingesta.")
+        else:
+            st.download_button(f"⬇️ Descargar {trabajo.nombre}", key=f"descargar_{clave}",
+                               data=Path(trabajo.ruta).read_bytes, file_name=trabajo.nombre, mime=_mime(trabajo.nombre))
+    elif trabajo.estado == ERROR:
+        st.error(f"❌ No se pudo generar {trabajo.nombre}: {trabajo.error}")
+
+
+def panel_sesion():
+    with st.sidebar:
+        st.markdown("### 📁 Informes de esta sesión")
+        ids = st.session_state.get("trabajos", [])
+        trabajos = sorted((t for cola in _colas() for t in cola.trabajos(ids)), key=lambda t: ids.index(t.id))
+        if not trabajos:
+            st.caption("Todavía no se generó ningún informe.")
+        for trabajo in reversed(trabajos):
+            st.markdown(f"{ICONOS[trabajo.estado]} {trabajo.descripcion}")
@@ -0,0 +1,61 @@
+# PANEL DE PERFILADO - TIEMPOS POR ETAPA DE CADA RERUN (STREAMLIT)
+#
+# Panel de administración oculto: aparece en la barra lateral solo si el
+# servidor se arrancó con LTS_PERFILADO_ADMIN=1 y la app se abre con ?admin=1
+# en la URL. El interruptor enciende o apaga el perfilado para todo el
+# proceso (todas las sesiones): por eso no alcanza con conocer la URL. Muestra
+# los tiempos de la sesión y del armado de PDF en segundo plano. Cada app
+# llama a iniciar_corrida() al comienzo del script y a cerrar_corrida() al final.
+# Uso: LTS_PERFILADO_ADMIN=1 streamlit run LTS_LAB_ANALYZER_FINAL.py  ->  http://localhost:8501/?admin=1
+
+import os
+import uuid
+
+import streamlit as st
+
+from lts_core import perfilado
+
+ULTIMAS = 50  # corridas de la sesión que entran en el resumen
+ADMIN = os.environ.get("LTS_PERFILADO_ADMIN", "").lower() in ("1", "true", "si", "sí")
+
+
+def iniciar_corrida(app):
+    sesion = st.session_state.setdefault("sesion_perfilado", uuid.uuid4().hex[:8])
+    perfilado.iniciar_corrida(app, sesion)
+
+
+def _tabla(resumen):
+    return [
+        {"Etapa": nombre, "Veces": veces, "Mediana (ms)": round(mediana * 1e3, 2),
+         "p95 (ms)": round(p95 * 1e3, 2), "Máximo (ms)": round(maximo * 1e3, 2)}
+        for nombre, (veces, mediana, p95, maximo) in sorted(resumen.items(), key=lambda e: -e[1][1])
+    ]
+
+
+def cerrar_corrida(app):
+    # Cierra la corrida antes de dibujar el panel: el panel no se mide a sí mismo
+    registro = perfilado.terminar_corrida()
+    if not ADMIN or st.query_params.get("admin") != "1":
+        return
+    with st.sidebar.expander("⏱️ Perfilado (administración)", expanded=True):
+        encendido = st.toggle("Perfilado activo", value=perfilado.activo())
+        if encendido != perfilado.activo():
+            perfilado.activar(encendido)
+            st.rerun()
+        if not encendido:
+            st.caption("Apagado: las etapas no se miden (costo casi nulo).")
+            return
+        st.caption(f"Métricas en {perfilado.ARCHIVO} ({perfilado.FORMATO}).")
+        if registro is None:
+            st.caption("La próxima interacción queda registrada.")
+            return
+        st.markdown(f"**Esta corrida: {registro['total'] * 1e3:.1f} ms**")
+        st.dataframe([{"Etapa": n, "ms": round(s * 1e3, 2)}
+                      for n, s in sorted(registro["etapas"].items(), key=lambda e: -e[1])], hide_index=True)
+        sesion = perfilado.historial(app, st.session_state.get("sesion_perfilado"))[-ULTIMAS:]
+        st.markdown(f"**Últimas {len(sesion)} corridas de la sesión**")
+        st.dataframe(_tabla(perfilado.resumen(sesion)), hide_index=True)
+        fondo = perfilado.historial("fondo")[-ULTIMAS:]
+        if fondo:
+            st.markdown("**En segundo plano (informes PDF, todas las sesiones)**")
+            st.dataframe(_tabla(perfilado.resumen(fondo)), hide_index=True)
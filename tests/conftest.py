@@ -0,0 +1,18 @@
+# PRUEBAS - CONFIGURACIÓN COMÚN
+#
+# Uso (desde la raíz del repositorio): python -m pytest -q tests
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lts_core.almacen import AlmacenResultados  # noqa: E402
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    # Base de resultados vacía, propia de cada prueba
+    return AlmacenResultados(str(tmp_path / "resultados.db"))
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from lts_core.almacen import COLUMNAS
+
+
+def _resultados(n, semilla=0):
+    azar = random.Random(semilla)
+    return [
+        (f"2024-01-{1 + azar.randrange(5):02d} {azar.randrange(24):02d}:00:00", azar.choice(["MEG", "Agua"]),
+         azar.choice(["pH", "Cloruros"]), float(i), 1, "", "", "", None)
+        for i in range(n)
+    ]
+
+
+def _todas(almacen, **filtros):
+    sql = f"SELECT id, {', '.join(COLUMNAS)} FROM resultados"
+    return sorted((f for f in almacen.conexion().execute(sql).fetchall() if all(
+        f[1 + COLUMNAS.index(c)] in (v if isinstance(v, list) else [v]) for c, v in filtros.items()
+    )), key=lambda f: (f[1], f[0]))
+
+
+@pytest.mark.parametrize("tamano", [1, 7, 100, 10_000])
+def test_las_paginas_recorren_todo_en_orden_de_fecha(almacen, tamano):
+    almacen.escribir(_resultados(300))  # muchas fechas repetidas: el desempate es por id
+    paginas = list(almacen.paginas(tamano=tamano))
+    assert all(0 < len(p) <= tamano for p in paginas)
+    assert [f for p in paginas for f in p] == _todas(almacen)
+
+
+@pytest.mark.parametrize("filtros", [
+    {"modulo": "MEG"},
+    {"modulo": "MEG", "parametro": "pH"},
+    {"modulo": ["MEG", "Agua"], "parametro": "Cloruros"},
+])
+def test_las_paginas_respetan_los_filtros(almacen, filtros):
+    almacen.escribir(_resultados(300, semilla=1))
+    filas = [f for p in almacen.paginas(tamano=13, **filtros) for f in p]
+    assert filas and filas == _todas(almacen, **filtros)
+
+
+def test_filtro_de_fechas_inclusivo(almacen):
+    almacen.escribir(_resultados(300, semilla=2))
+    filas = [f for p in almacen.paginas(desde="2024-01-02 00:00:00", hasta="2024-01-03 23:00:00", tamano=9) for f in p]
+    assert filas == [f for f in _todas(almacen) if "2024-01-02" <= f[1] <= "2024-01-03 23:00:00"]
+
+
+def test_lo_cargado_durante_el_recorrido_no_corre_las_paginas(almacen):
+    almacen.escribir(_resultados(100, semilla=3))
+    previas = _todas(almacen)
+    leidas = []
+    for i, pagina in enumerate(almacen.paginas(tamano=10)):
+        leidas.extend(pagina)
+        if i == 3:  # llegan resultados antes y después de la posición actual
+            almacen.escribir([("2023-12-31 00:00:00", "MEG", "pH", -1.0, 1, "", "", "", None),
+                              ("2024-02-01 00:00:00", "MEG", "pH", -2.0, 1, "", "", "", None)])
+    ids = [f[0] for f in leidas]
+    assert len(ids) == len(set(ids))  # nada se lee dos veces
+    assert [f for f in leidas if f[4] >= 0] == previas  # ni se saltea
+    assert [f[4] for f in leidas if f[4] < 0] == [-2.0]  # lo posterior a la posición sí aparece
@@ -0,0 +1,106 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from lts_core import api_ingesta
+from lts_core.api_ingesta import crear_servidor, validar
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    servidor = crear_servidor(puerto=0, ruta_base=str(tmp_path / "resultados.db"))
+    hilo = threading.Thread(target=servidor.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def _pedir(servidor, metodo, ruta, cuerpo=None, tipo="application/json", encabezados=None):
+    conexion = http.client.HTTPConnection(*servidor.server_address, timeout=10)
+    conexion.request(metodo, ruta, cuerpo, {"Content-Type": tipo, **(encabezados or {})})
+    respuesta = conexion.getresponse()
+    datos = respuesta.read()
+    conexion.close()
+    return respuesta.status, json.loads(datos) if respuesta.getheader("Content-Type", "").startswith("application/json") else datos
+
+
+def test_motivos_de_rechazo_fila_por_fila():
+    filas = validar([
+        {"modulo": "MEG", "parametro": "pH", "valor": "7.1", "fecha": "2024-01-01 10:00"},
+        {"modulo": "XYZ", "parametro": "pH", "valor": 7},
+        {"modulo": "MEG", "parametro": "pH", "valor": 7, "fecha": "ayer"},
+        {"modulo": "MEG", "parametro": "pH", "valor": "siete"},
+        {"modulo": "MEG", "parametro": "pH", "valor": float("nan")},
+        {"modulo": "MEG", "parametro": "pH", "valor": True},
+        {"modulo": "MEG", "parametro": "Color", "valor": 1},
+    ])
+    assert [f["motivo"] for f in filas] == [
+        "", "módulo desconocido", "fecha ilegible", "valor no numérico", "valor no numérico", "valor no numérico",
+        "sin especificación vigente en la fecha",
+    ]
+    assert filas[0]["fecha"] == "2024-01-01 10:00:00" and filas[0]["cumple"] is not None
+    assert all(f["cumple"] is None for f in filas[1:])
+
+
+def test_lote_csv_guarda_solo_lo_valido(servidor):
+    estado, respuesta = _pedir(servidor, "POST", "/resultados/MEG", b"parametro,valor,fecha\npH,7.1,2024-01-01\npH,x,\n",
+                               "text/csv")
+    assert estado == 200
+    assert (respuesta["recibidos"], respuesta["guardados"], respuesta["rechazados"]) == (2, 1, 1)
+    assert len(servidor.almacen.filas_desde(0, 100)) == 1
+
+
+def test_las_alarmas_se_consultan_aparte(servidor):
+    lote = [{"modulo": "MEG", "parametro": "pH", "valor": 7 + 0.05 * (i % 5 - 2), "fecha": "2024-01-01T10:00:00"}
+            for i in range(30)] + [{"modulo": "MEG", "parametro": "pH", "valor": 8.5, "fecha": "2024-01-01T11:00:00"}] * 5
+    estado, respuesta = _pedir(servidor, "POST", "/resultados", json.dumps(lote).encode())
+    assert estado == 200 and respuesta["guardados"] == 35 and "alarmas" not in respuesta
+    assert servidor.sincronizador.esperar(timeout=10)
+
+    estado, alarmas = _pedir(servidor, "GET", f"/alarmas?desde_id={respuesta['ultima_alarma']}&modulo=MEG")
+    assert estado == 200 and alarmas["alarmas"]
+    assert alarmas["ultima_alarma"] == alarmas["alarmas"][0]["id"]
+    assert {a["fecha"] for a in alarmas["alarmas"]} == {"2024-01-01 11:00:00"}
+    assert _pedir(servidor, "GET", f"/alarmas?desde_id={alarmas['ultima_alarma']}")[1]["alarmas"] == []
+    assert _pedir(servidor, "GET", "/alarmas?desde_id=-1")[0] == 400
+    assert _pedir(servidor, "GET", "/alarmas?modulo=XYZ")[0] == 404
+
+
+@pytest.mark.parametrize("metodo, ruta, cuerpo, estado, error", [
+    ("POST", "/resultados", b"{no es json", 400, "JSON inválido"),
+    ("POST", "/resultados", b'{"otra": 1}', 400, "se esperaba una lista"),
+    ("POST", "/resultados", b"[1, 2]", 400, "se esperaba una lista"),
+    ("POST", "/resultados/XYZ", b"[]", 404, "módulo desconocido"),
+    ("POST", "/otra", b"[]", 404, "ruta desconocida"),
+    ("POST", "/resultados/MEG/pH", b"[]", 404, "ruta desconocida"),
+    ("GET", "/nada", None, 404, "ruta desconocida"),
+    ("GET", "/exportacion?formato=pdf", None, 400, "formato no disponible"),
+    ("GET", "/exportacion?modulo=XYZ", None, 404, "módulo desconocido"),
+    ("GET", "/exportacion?desde=ayer", None, 400, "fecha ilegible"),
+])
+def test_errores_de_la_peticion(servidor, metodo, ruta, cuerpo, estado, error):
+    obtenido, respuesta = _pedir(servidor, metodo, ruta, cuerpo)
+    assert obtenido == estado and respuesta["error"].startswith(error)
+
+
+def test_csv_no_utf8_es_400(servidor):
+    estado, respuesta = _pedir(servidor, "POST", "/resultados/MEG", "parametro,valor\npH,7\xf1\n".encode("latin-1"), "text/csv")
+    assert estado == 400 and respuesta["error"].startswith("CSV inválido")
+
+
+def test_sin_content_length_es_411(servidor):
+    conexion = http.client.HTTPConnection(*servidor.server_address, timeout=10)
+    conexion.putrequest("POST", "/resultados")
+    conexion.endheaders()
+    respuesta = conexion.getresponse()
+    assert respuesta.status == 411 and json.loads(respuesta.read())["error"] == "falta Content-Length"
+    conexion.close()
+
+
+def test_lote_demasiado_grande_es_413(servidor, monkeypatch):
+    monkeypatch.setattr(api_ingesta, "MAX_CUERPO", 16)
+    estado, respuesta = _pedir(servidor, "POST", "/resultados", b"[" + b"{}, " * 10 + b"{}]")
+    assert estado == 413 and respuesta["error"].startswith("el lote supera")
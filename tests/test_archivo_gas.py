@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from lts_core.archivo_gas import ArchivoGas
+from lts_core.cromatografia import calcular_lote
+
+
+def _lote(fechas):
+    muestras = [f"2024-03-05 {h}" for h in fechas]
+    tabla = pd.DataFrame({
+        "muestra": [m for m in muestras for _ in range(2)],
+        "componente": ["CH4", "CO2"] * len(muestras),
+        "fraccion": [0.98, 0.02] * len(muestras),
+    })
+    return calcular_lote(tabla, composicion=True)
+
+
+def _archivos(carpeta):
+    return sorted(n for n in os.listdir(carpeta) if not n.startswith("."))
+
+
+def test_al_llegar_al_umbral_se_fusiona_el_dia(tmp_path):
+    archivo = ArchivoGas(str(tmp_path), umbral_compactar=4)
+    carpeta = tmp_path / "dia=2024-03-05"
+    for hora in ["10:00", "08:00", "09:00"]:
+        archivo.agregar(_lote([hora]))
+    assert len(_archivos(carpeta)) == 3
+
+    archivo.agregar(_lote(["07:00", "11:00"]))
+    [compacto] = _archivos(carpeta)
+    assert compacto.startswith("compacto-") and os.listdir(carpeta) == [compacto]
+    leido = archivo.leer()
+    assert list(leido["fecha"].dt.strftime("%H:%M")) == ["07:00", "08:00", "09:00", "10:00", "11:00"]
+    assert list(pq.read_table(carpeta / compacto)["fecha"].to_pandas().dt.strftime("%H:%M")) == list(leido["fecha"].dt.strftime("%H:%M"))
+
+    archivo.agregar(_lote(["12:00"]))
+    assert len(_archivos(carpeta)) == 2 and archivo.compactar() == ["2024-03-05"]
+    assert len(_archivos(carpeta)) == 1 and len(archivo.leer()) == 6
+
+
+def test_un_corte_despues_de_publicar_no_duplica(tmp_path):
+    archivo = ArchivoGas(str(tmp_path), umbral_compactar=100)
+    carpeta = tmp_path / "dia=2024-03-05"
+    archivo.agregar(_lote(["08:00"]))
+    archivo.agregar(_lote(["09:00"]))
+    viejos = {n: (carpeta / n).read_bytes() for n in _archivos(carpeta)}
+    archivo.compactar()
+    for nombre, contenido in viejos.items():  # como si el proceso se hubiera cortado antes de borrarlos
+        (carpeta / nombre).write_bytes(contenido)
+    assert len(archivo.leer()) == 2  # los reemplazados no se leen aunque sigan en disco
+
+    archivo.agregar(_lote(["10:00"]))  # la próxima compactación termina la anterior
+    archivo.compactar()
+    assert len(_archivos(carpeta)) == 1 and len(archivo.leer()) == 3
+
+
+def test_un_bloqueo_vigente_posterga_la_compactacion(tmp_path):
+    archivo = ArchivoGas(str(tmp_path), umbral_compactar=2)
+    carpeta = tmp_path / "dia=2024-03-05"
+    archivo.agregar(_lote(["08:00"]))
+    (carpeta / ".compactando").touch()
+    archivo.agregar(_lote(["09:00"]))
+    assert len(_archivos(carpeta)) == 2
+    os.utime(carpeta / ".compactando", (0, 0))  # bloqueo viejo: quedó de un corte
+    assert archivo.compactar() == []
+    assert archivo.compactar() == ["2024-03-05"] and len(archivo.leer()) == 2
+
+
+def test_la_lectura_ignora_lo_reemplazado_antes_de_que_se_borre(tmp_path, monkeypatch):
+    archivo = ArchivoGas(str(tmp_path), umbral_compactar=100)
+    archivo.agregar(_lote(["08:00"]))
+    archivo.agregar(_lote(["09:00"]))
+    leidos = []
+    reemplazar = os.replace
+
+    def publicar_y_leer(origen, destino):
+        reemplazar(origen, destino)
+        if os.path.basename(destino).startswith("compacto-"):
+            leidos.append(archivo.leer(desde="2024-03-05", hasta="2024-03-05 23:59"))
+
+    monkeypatch.setattr(os, "replace", publicar_y_leer)
+    assert archivo.compactar() == ["2024-03-05"]
+    assert len(leidos) == 1 and list(leidos[0]["fecha"].dt.strftime("%H:%M")) == ["08:00", "09:00"]
+    assert archivo.leer(desde="2024-03-06").empty
@@ -0,0 +1,41 @@
+import re
+import zlib
+from datetime import datetime
+
+from lts_core import cache_informes
+from lts_core.cache_informes import clave_informe, informe_pdf
+
+DATOS = dict(operador="Operador", explicacion="Control del inhibidor.", resultados={"pH": 7.1},
+             observaciones="", muestreo_en="Separador", muestra_por="Técnico")
+
+
+def _texto(pdf):
+    # Contenido de las páginas (fpdf las comprime con zlib)
+    return b"".join(zlib.decompress(s) for s in re.findall(rb"stream\r?\n(.*?)\r?\nendstream", pdf, re.S))
+
+
+def test_clave_cambia_con_cada_dato():
+    base = clave_informe("MEG", **DATOS)
+    assert base == clave_informe("MEG", **dict(DATOS))
+    assert base != clave_informe("TEG", **DATOS)
+    assert base != clave_informe("MEG", **{**DATOS, "resultados": {"pH": 7.2}})
+    assert base != clave_informe("MEG", **{**DATOS, "fecha": datetime(2024, 1, 1)})
+
+
+def test_misma_entrada_en_otro_momento_no_reusa_el_encabezado(monkeypatch):
+    monkeypatch.setattr(cache_informes, "informes", cache_informes.CacheLRU())
+    primero = informe_pdf("MEG", fecha=datetime(2024, 1, 1, 10, 0, 5), **DATOS)
+    mismo_minuto = informe_pdf("MEG", fecha=datetime(2024, 1, 1, 10, 0, 50), **DATOS)
+    despues = informe_pdf("MEG", fecha=datetime(2024, 1, 1, 10, 1), **DATOS)
+
+    assert mismo_minuto is primero  # acierto de caché
+    assert b"Fecha: 2024-01-01 10:00" in _texto(primero)
+    assert b"Fecha: 2024-01-01 10:01" in _texto(despues)
+    assert cache_informes.informes.aciertos == 1 and len(cache_informes.informes) == 2
+
+
+def test_sin_fecha_usa_el_momento_actual(monkeypatch):
+    monkeypatch.setattr(cache_informes, "informes", cache_informes.CacheLRU())
+    antes = datetime.now().strftime("%Y-%m-%d %H:%M").encode()
+    texto = _texto(informe_pdf("MEG", **DATOS))
+    assert antes in texto or datetime.now().strftime("%Y-%m-%d %H:%M").encode() in texto
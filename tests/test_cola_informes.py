@@ -0,0 +1,46 @@
+import os
+import time
+from datetime import datetime
+
+from lts_core.cola_informes import ERROR, LISTO, ColaInformes, enviar_informe, nombre_archivo
+
+
+def _esperar(cola, id_trabajo, tope=30):
+    limite = time.time() + tope
+    while cola.trabajo(id_trabajo).pendiente and time.time() < limite:
+        time.sleep(0.01)
+    return cola.trabajo(id_trabajo)
+
+
+def test_nombres_unicos_en_el_mismo_segundo():
+    fecha = datetime(2024, 1, 1, 10, 0, 0)
+    nombres = {nombre_archivo("MEG_Operador", fecha) for _ in range(100)}
+    assert len(nombres) == 100
+    assert all(n.startswith("MEG_Operador_20240101_100000_") and n.endswith(".pdf") for n in nombres)
+
+
+def test_el_prefijo_no_sale_de_la_carpeta():
+    for prefijo in ("Gas_../../etc/passwd", "Gas_/tmp/x", "Gas_a\\b", "../"):
+        nombre = nombre_archivo(prefijo)
+        assert os.path.basename(nombre) == nombre and ".." not in nombre
+
+
+def test_dos_pedidos_iguales_quedan_en_archivos_distintos(tmp_path):
+    cola = ColaInformes(2)
+    datos = dict(operador="../../op", explicacion="x", resultados={"pH": 7.1}, observaciones="")
+    trabajos = [_esperar(cola, enviar_informe(cola, "MEG", "MEG_../../op", datos, raiz=str(tmp_path)))
+                for _ in range(2)]
+    assert [t.estado for t in trabajos] == [LISTO, LISTO]
+    assert trabajos[0].ruta != trabajos[1].ruta
+    assert sorted(os.listdir(tmp_path / "meg")) == sorted(os.path.basename(t.ruta) for t in trabajos)
+
+
+def test_un_error_no_deja_temporales(tmp_path):
+    cola = ColaInformes(1)
+
+    def falla(temporal):
+        open(temporal, "wb").write(b"a medias")
+        raise RuntimeError("sin papel")
+    trabajo = _esperar(cola, cola.enviar("x", str(tmp_path / "x.pdf"), falla))
+    assert trabajo.estado == ERROR and "sin papel" in trabajo.error
+    assert os.listdir(tmp_path) == []
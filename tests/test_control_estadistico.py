@@ -0,0 +1,80 @@
+import math
+import random
+
+import numpy as np
+
+from lts_core.control_estadistico import MUESTRAS_BASE, EstadisticaIncremental, SerieControl, lttb, serie_parametro
+
+
+def test_welford_igual_a_numpy():
+    valores = [random.Random(1).gauss(5, 2) for _ in range(1000)]
+    estadistica = EstadisticaIncremental()
+    for v in valores:
+        estadistica.agregar(v)
+    assert math.isclose(estadistica.media, np.mean(valores))
+    assert math.isclose(estadistica.desvio, np.std(valores, ddof=1))
+    retomada = EstadisticaIncremental.desde_estado(*estadistica.estado())
+    assert retomada.estado() == estadistica.estado()
+
+
+def test_los_limites_salen_de_la_linea_base():
+    serie = SerieControl()
+    for i in range(MUESTRAS_BASE):
+        serie.agregar(f"2024-01-01 00:{i // 60:02d}:{i % 60:02d}", 7.0 + (0.1 if i % 2 else -0.1))
+    limites = serie.limites_shewhart()
+    for i in range(500):  # el proceso se corre: los puntos nuevos no mueven sus propios límites
+        serie.agregar("2024-01-02 00:00:00", 9.0)
+    assert serie.base_completa and serie.limites_shewhart() == limites
+    assert serie.valores[-1] > limites[2]
+
+
+def test_la_tabla_se_arma_una_vez_por_estado(almacen):
+    almacen.escribir([(f"2024-01-01 10:00:{i % 60:02d}", "MEG", "pH", 7 + i % 3, 1, "", "", "", None) for i in range(5000)])
+    serie = serie_parametro(almacen, "MEG", "pH")
+    tabla = serie.tabla()
+    assert len(tabla) == 1500 and str(tabla.index[0]) == "2024-01-01 10:00:00"
+    assert serie_parametro(almacen, "MEG", "pH").tabla() is tabla
+    almacen.escribir([("2024-01-02 10:00:00", "MEG", "pH", 8.0, 1, "", "", "", None)])
+    assert serie_parametro(almacen, "MEG", "pH").tabla() is not tabla
+
+
+def test_lttb_conserva_extremos_y_picos():
+    valores = np.zeros(10_000)
+    valores[1234] = 50
+    indices = lttb(valores, 100)
+    assert len(indices) == 100 and indices[0] == 0 and indices[-1] == 9_999 and 1234 in indices
+
+
+def test_agregar_lote_equivale_a_agregar_de_a_uno():
+    valores = list(np.random.default_rng(3).normal(5, 1, 250))
+    fechas = [f"2024-01-{1 + i // 24:02d} {i % 24:02d}:00:00" for i in range(250)]
+    uno, lote = SerieControl(), SerieControl()
+    for fecha, valor in zip(fechas, valores):
+        uno.agregar(fecha, valor)
+    lote.agregar_lote(fechas[:70], valores[:70])
+    lote.agregar_lote(fechas[70:], valores[70:])
+
+    assert list(lote.fechas) == list(uno.fechas)
+    assert list(lote.ewmas) == list(uno.ewmas)
+    assert lote.base.estado() == uno.base.estado()
+    assert lote.estadistica.n == uno.estadistica.n
+    assert math.isclose(lote.estadistica.media, uno.estadistica.media)
+    assert math.isclose(lote.estadistica.varianza, uno.estadistica.varianza)
+
+
+def test_una_carga_retroactiva_se_grafica_y_se_toma_por_fecha():
+    valores = list(np.random.default_rng(4).normal(5, 1, 300))
+    fechas = [f"2024-01-{1 + i // 24:02d} {i % 24:02d}:00:00" for i in range(300)]
+    en_orden, tarde = SerieControl(), SerieControl()
+    en_orden.agregar_lote(fechas, valores)
+    tarde.agregar_lote(fechas[150:], valores[150:])  # lo viejo se carga después
+    tarde.agregar_lote(fechas[:150][::-1], valores[:150][::-1])
+
+    assert list(tarde.fechas) == list(en_orden.fechas) and list(tarde.valores) == list(en_orden.valores)
+    assert tarde.base.estado() == en_orden.base.estado()
+    assert np.allclose(tarde.ewmas, en_orden.ewmas) and math.isclose(tarde.ewma, en_orden.ewma)
+    assert tarde.tabla().index.is_monotonic_increasing
+
+    tarde.agregar("2023-12-31 00:00:00", 50.0)  # de a uno también
+    assert tarde.fechas[0] < tarde.fechas[1] and tarde.valores[0] == 50.0 and tarde.base.n == MUESTRAS_BASE
+    assert tarde.limites_shewhart() != en_orden.limites_shewhart()
@@ -0,0 +1,41 @@
+import random
+
+import pandas as pd
+import pytest
+
+from lts_core.cromatografia import ALIAS, calcular_lote, calcular_por_bloques, leer_cromatograma
+
+
+def _cromatograma(ruta, muestras=300, semilla=0):
+    # Tabla larga con alias, componentes desconocidos, filas repetidas y las
+    # filas de cada muestra desordenadas (quedan repartidas entre bloques)
+    azar = random.Random(semilla)
+    nombres = [n for componente, alias in ALIAS.items() for n in [componente, *alias]] + ["Helio", "H2S", " metano "]
+    filas = [(f"M{m:04d}", azar.choice(nombres), round(azar.random() / 5, 6))
+             for m in range(muestras) for _ in range(azar.randrange(1, 14))]
+    azar.shuffle(filas)
+    pd.DataFrame(filas, columns=["Muestra", "Componente", "Fraccion"]).to_csv(ruta, index=False)
+    return ruta
+
+
+@pytest.mark.parametrize("tamano_bloque", [5, 97, 1_000_000])
+def test_por_bloques_igual_que_el_lote(tmp_path, tamano_bloque):
+    ruta = _cromatograma(tmp_path / "cromatograma.csv")
+    esperado = calcular_lote(leer_cromatograma(ruta), composicion=True)
+    obtenido = calcular_por_bloques(ruta, tamano_bloque=tamano_bloque, composicion=True)
+    pd.testing.assert_frame_equal(obtenido, esperado, check_index_type=False, check_exact=False, rtol=1e-12)
+
+
+def test_una_sola_muestra_sin_columna_de_muestra(tmp_path):
+    ruta = tmp_path / "muestra.csv"
+    ruta.write_text("Componente,Fraccion\nC1,0.9\nC2,0.05\nCO2,0.03\nN2,0.02\nArgon,0.001\n", encoding="utf-8")
+    esperado = calcular_lote(leer_cromatograma(ruta))
+    pd.testing.assert_frame_equal(calcular_por_bloques(ruta, tamano_bloque=2), esperado, check_index_type=False)
+    assert esperado["Componentes no reconocidos"].tolist() == ["Argon"]
+
+
+def test_progreso_por_bloque(tmp_path):
+    ruta = _cromatograma(tmp_path / "cromatograma.csv", muestras=50)
+    avances = []
+    calcular_por_bloques(str(ruta), tamano_bloque=40, progreso=lambda filas, fraccion: avances.append((filas, fraccion)))
+    assert [f for f, _ in avances] == sorted(f for f, _ in avances) and avances[-1][0] == len(pd.read_csv(ruta))
@@ -0,0 +1,130 @@
+import math
+import random
+
+from lts_core import deriva
+from lts_core.almacen import AlmacenResultados
+from lts_core.deriva import MotorDeriva
+
+
+def _cargar(almacen, valores, modulo="MEG", parametro="pH"):
+    almacen.escribir([
+        (f"2024-01-01 {i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}", modulo, parametro, v, 1, "", "", "", None)
+        for i, v in enumerate(valores)
+    ])
+
+
+def _estable(n, semilla=0):
+    azar = random.Random(semilla)
+    return [7.0 + azar.gauss(0, 0.1) for _ in range(n)]
+
+
+def test_el_historial_previo_arma_la_base_sin_alarmas(almacen):
+    _cargar(almacen, _estable(50) + [9.0] * 10)  # deriva ya ocurrida antes de existir el motor
+    assert MotorDeriva().sincronizar(almacen) == []
+    assert deriva.alarmas(almacen) == []
+
+    _cargar(almacen, [9.5] * 5)
+    nuevas = MotorDeriva().sincronizar(almacen)
+    assert nuevas and all(a.modulo == "MEG" and a.direccion == "sube" and a.id for a in nuevas)
+    assert [a.id for a in deriva.alarmas(almacen, limite=None)] == sorted((a.id for a in nuevas), reverse=True)
+
+
+def test_el_estado_se_retoma_sin_recorrer_el_historial(almacen, monkeypatch):
+    _cargar(almacen, _estable(40))
+    MotorDeriva().sincronizar(almacen)
+    _cargar(almacen, [7.05] * 3)
+
+    leidos = []
+    original = AlmacenResultados.filas_desde
+    monkeypatch.setattr(AlmacenResultados, "filas_desde",
+                        lambda self, ultimo_id=0, limite=20_000: leidos.append(ultimo_id) or original(self, ultimo_id, limite))
+    otro_proceso = MotorDeriva()
+    otro_proceso.sincronizar(almacen)
+    assert leidos[0] == 40  # sigue desde el último id guardado
+    assert otro_proceso._estados[("MEG", "pH")].base.n == deriva.MUESTRAS_BASE
+
+
+def test_paginas_y_procesos_alternados_equivalen_a_una_pasada(tmp_path):
+    valores = _estable(30) + [7.0 + 0.05 * i for i in range(60)] + _estable(30, 1)
+
+    unica = AlmacenResultados(str(tmp_path / "unica.db"))
+    _cargar(unica, [7.0])  # el historial previo al motor es de un solo valor
+    MotorDeriva().sincronizar(unica)
+    _cargar(unica, valores)
+    esperado = MotorDeriva().sincronizar(unica)
+
+    alternada = AlmacenResultados(str(tmp_path / "alternada.db"))
+    _cargar(alternada, [7.0])
+    motores = [MotorDeriva(), MotorDeriva()]  # como dos procesos sobre la misma base
+    motores[0].sincronizar(alternada)
+    obtenidas = []
+    for i in range(0, len(valores), 7):
+        _cargar(alternada, valores[i:i + 7])
+        obtenidas += motores[(i // 7) % 2].sincronizar(alternada, tamano=3)
+
+    campos = lambda a: (a.parametro, a.metodo, a.direccion, a.resultado_id, round(a.valor, 9))  # noqa: E731
+    assert esperado and list(map(campos, obtenidas)) == list(map(campos, esperado))
+    assert len(deriva.alarmas(alternada, limite=None)) == len(esperado)
+
+
+def test_la_api_guarda_sin_sincronizar_y_el_fondo_registra_las_alarmas(almacen):
+    from lts_core.api_ingesta import ingerir
+    motor = MotorDeriva()
+    sincronizador = deriva.SincronizadorDeriva(almacen, motor)
+    try:
+        lote = [{"modulo": "MEG", "parametro": "pH", "valor": v, "fecha": "2024-01-01T10:00:00"} for v in _estable(30)]
+        assert "alarmas" not in ingerir(almacen, lote)
+        assert motor.ultimo_id is None  # guardar no sincroniza
+        sincronizador.pedir()
+        assert sincronizador.esperar(timeout=10) and motor.ultimo_id == 30
+
+        lote = [{"modulo": "MEG", "parametro": "pH", "valor": 8.5, "fecha": "2024-01-01T11:00:00"}] * 5
+        ingerir(almacen, lote)
+        assert deriva.ultima_alarma(almacen) == 0
+        for _ in range(5):  # pedidos seguidos se juntan
+            sincronizador.pedir()
+        assert sincronizador.esperar(timeout=10) and motor.ultimo_id == 35
+    finally:
+        sincronizador.detener()
+    alarmas = deriva.alarmas(almacen, limite=None)
+    assert alarmas and all(a.modulo == "MEG" and a.fecha == "2024-01-01 11:00:00" for a in alarmas)
+
+
+def test_la_ewma_avisa_una_vez_por_salida_de_la_banda():
+    motor = MotorDeriva()
+    motor.actualizar_lote(("MEG", "pH", v) for v in _estable(deriva.MUESTRAS_BASE))
+    corrida = motor.actualizar_lote([("MEG", "pH", 7.6)] * 30)
+    assert [a.direccion for a in corrida if a.metodo == "EWMA"] == ["sube"]
+    assert motor._estados[("MEG", "pH")].ewma_alarma == 1
+
+    motor.actualizar_lote([("MEG", "pH", 7.0)] * 30)  # vuelve a la banda: se desengancha
+    assert motor._estados[("MEG", "pH")].ewma_alarma == 0
+    otra = motor.actualizar_lote([("MEG", "pH", 6.4)] * 30)
+    assert [a.direccion for a in otra if a.metodo == "EWMA"] == ["baja"]
+
+
+def test_los_valores_no_finitos_se_ignoran(almacen):
+    motor = MotorDeriva()
+    motor.actualizar_lote(("MEG", "pH", v) for v in _estable(deriva.MUESTRAS_BASE))
+    antes = motor._estados[("MEG", "pH")].fila()
+    assert motor.actualizar_lote([("MEG", "pH", float("nan")), ("MEG", "pH", float("inf"))]) == []
+    assert motor._estados[("MEG", "pH")].fila() == antes
+
+    _cargar(almacen, _estable(30) + [float("inf"), float("-inf")] + _estable(5, 1))
+    MotorDeriva().sincronizar(almacen)
+    [(n, media)] = almacen.conexion().execute("SELECT n, media FROM deriva_estado").fetchall()
+    assert n == deriva.MUESTRAS_BASE and math.isfinite(media)
+
+
+def test_una_base_vieja_recibe_la_columna_nueva(tmp_path):
+    import sqlite3
+    ruta = str(tmp_path / "vieja.db")
+    con = sqlite3.connect(ruta)
+    con.executescript(deriva.ESQUEMA.replace("    ewma_alarma INTEGER NOT NULL DEFAULT 0,\n", ""))
+    con.execute("INSERT INTO deriva_estado VALUES ('MEG', 'pH', 20, 7.0, 0.2, 7.0, 0.1, 0, 0, 7.0)")
+    con.commit()
+    con.close()
+    almacen = AlmacenResultados(ruta)
+    _cargar(almacen, [7.0] * 3)
+    MotorDeriva().sincronizar(almacen)
+    assert almacen.conexion().execute("SELECT ewma_alarma FROM deriva_estado").fetchall() == [(0,)]
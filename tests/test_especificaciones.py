@@ -0,0 +1,94 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lts_core import especificaciones
+from lts_core.especificaciones import evaluar, limites_vigentes, validar_historico, validar_lote
+
+
+@pytest.fixture
+def historial(monkeypatch):
+    # Cloruros de MEG: 0-80 desde 2000, 0-65 desde 2020-01-01 y el vigente (0-50) desde 2024-06-01
+    monkeypatch.setattr(especificaciones, "HISTORIAL", [
+        ("MEG", "Cloruros", "2020-01-01", 0, 65),
+        ("MEG", "Cloruros", "2000-01-01", 0, 80),  # desordenado a propósito
+    ])
+    cloruros = next(p for p in especificaciones.ESPECIFICACIONES["MEG"] if p["nombre"] == "Cloruros")
+    monkeypatch.setitem(cloruros, "desde", "2024-06-01")
+    monkeypatch.setattr(especificaciones, "_versiones", {})
+
+
+def test_limites_vigentes_por_fecha(historial):
+    assert limites_vigentes("MEG", "Cloruros", "1999-12-31 23:59") is None  # antes de la primera versión
+    assert limites_vigentes("MEG", "Cloruros", "2010-05-05") == (0, 80)
+    assert limites_vigentes("MEG", "Cloruros", "2019-12-31 23:59:59") == (0, 80)
+    assert limites_vigentes("MEG", "Cloruros", "2020-01-01") == (0, 65)  # el día del cambio ya rige la nueva
+    assert limites_vigentes("MEG", "Cloruros (ppm)", "2024-06-01 00:00") == (0, 50)
+    assert limites_vigentes("MEG", "pH", "2024-06-01") == (6.5, 8)
+    assert limites_vigentes("MEG", "Color", "2024-06-01") is None
+
+
+def test_validar_historico_con_fechas_desordenadas(historial):
+    df = pd.DataFrame({
+        "modulo": ["MEG"] * 6 + ["XYZ"],
+        "parametro": ["Cloruros", "Cloruros (ppm)", "Cloruros", "Cloruros", "Cloruros", "pH", "pH"],
+        "valor": [70, 70, 60, 60, 70, 7, 7],
+        "fecha": ["2024-06-01", "2019-12-31", "2020-01-01", "2024-07-01", "1999-01-01", "2010-01-01", "2024-01-01"],
+    }, index=list("abcdefg"))
+    validado = validar_historico(df)
+    assert list(validado.index) == list("abcdefg")
+    assert validado["max"].tolist()[:4] == [50, 80, 65, 50]
+    assert validado["cumple"].tolist() == [False, True, True, False, pd.NA, True, pd.NA]
+    assert validado["motivo"].tolist() == ["", "", "", "", "sin especificación vigente en la fecha", "",
+                                           "módulo desconocido"]
+
+
+def test_validar_historico_marca_las_fechas_ilegibles():
+    df = pd.DataFrame({
+        "modulo": ["MEG"] * 4,
+        "parametro": ["pH"] * 4,
+        "valor": [7, 7, "siete", 7],
+        "fecha": [pd.NaT, "ayer", "2024-01-01", "2024-01-01"],
+    })
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        validado = validar_historico(df)
+    assert validado["motivo"].tolist() == ["fecha ilegible", "fecha ilegible", "valor no numérico", ""]
+    assert validado["cumple"].tolist() == [pd.NA, pd.NA, False, True]
+    assert np.isnan(validado["min"].iloc[0])
+
+
+def test_validar_historico_vacio():
+    vacio = validar_historico(pd.DataFrame({"modulo": [], "parametro": [], "valor": [], "fecha": []}))
+    assert vacio.empty and {"cumple", "motivo", "min", "max"} <= set(vacio.columns)
+
+
+def test_evaluar_por_nombre_o_etiqueta_con_los_bordes_incluidos():
+    evaluados = evaluar("MEG", {"pH": 6.5, "Concentración (%wt)": 84, "Cloruros": 50.01, "Densidad (kg/m³)": 1049.9,
+                                "Color": 3})
+    assert evaluados == [
+        ("pH", "pH", 6.5, True),
+        ("Concentración", "Concentración (%wt)", 84, True),
+        ("Cloruros", "Cloruros (ppm)", 50.01, False),
+        ("Densidad", "Densidad (kg/m³)", 1049.9, False),
+    ]  # lo que no está en la especificación se ignora
+    assert evaluar("MEG", {"MDEA (ppm)": float("nan")}) == [("MDEA", "MDEA (ppm)", pytest.approx(np.nan, nan_ok=True), False)]
+
+
+def test_validar_lote_cuenta_faltantes_como_no_cumple():
+    lote = pd.DataFrame({
+        "pH": [6.5, 8.0, 8.01, None],
+        "Cloruros (ppm)": [0, 50, "x", 12],
+        "Operador": ["Ana", "Luis", "Ana", "Luis"],
+    }, index=["M1", "M2", "M3", "M4"])
+    cumplimiento, resumen = validar_lote(lote, "MEG")
+
+    assert list(cumplimiento.columns) == ["pH", "Cloruros (ppm)"] and list(cumplimiento.index) == list(lote.index)
+    assert cumplimiento["pH"].tolist() == [True, True, False, False]
+    assert cumplimiento["Cloruros (ppm)"].tolist() == [True, True, False, True]
+    assert resumen.loc["pH", ["Mínimo", "Máximo"]].tolist() == [6.5, 8.0]
+    assert resumen.loc["pH", ["Evaluadas", "Cumplen", "No cumplen"]].tolist() == [3, 2, 1]
+    assert resumen.loc["Cloruros (ppm)", ["Evaluadas", "Cumplen", "No cumplen"]].tolist() == [3, 3, 0]
+    assert resumen["% cumplimiento"].tolist() == [66.7, 100.0]
@@ -0,0 +1,58 @@
+import os
+
+from lts_core.generar_informes import leer_tareas, main, renderizar
+
+
+def _csv(ruta, filas):
+    ruta.write_text("id,modulo,operador,fecha,pH\n" + "".join(f"{f}\n" for f in filas), encoding="utf-8")
+    return str(ruta)
+
+
+def _pdfs(raiz):
+    return sorted(os.path.relpath(os.path.join(d, n), raiz) for d, _, ns in os.walk(raiz) for n in ns)
+
+
+def test_id_y_modulo_no_salen_de_la_carpeta(tmp_path):
+    salida = tmp_path / "informes"
+    csv = _csv(tmp_path / "lotes.csv", ["../../x,MEG,Ana,,7", "a/b,../../Agua Producida,Ana,,7", ",,Ana,,7"])
+    rutas = [ruta for ruta, _ in leer_tareas(csv, str(salida))]
+    assert [os.path.relpath(r, salida) for r in rutas] == [
+        os.path.join("meg", "informe_meg_x.pdf"),
+        os.path.join("agua_producida", "informe_agua_producida_a_b.pdf"),
+        os.path.join("general", "informe_general_3.pdf"),
+    ]
+
+
+def test_ids_repetidos_no_se_pisan(tmp_path):
+    csv = _csv(tmp_path / "lotes.csv", ["7,MEG,Ana,,7", "7,MEG,Luis,,7.1", "7,MEG,Eva,,7.2"])
+    nombres = [os.path.basename(r) for r, _ in leer_tareas(csv, str(tmp_path))]
+    assert nombres == ["informe_meg_7.pdf", "informe_meg_7_2.pdf", "informe_meg_7_3.pdf"]
+
+
+def test_retoma_salteando_lo_generado(tmp_path, capsys):
+    salida = tmp_path / "informes"
+    csv = _csv(tmp_path / "lotes.csv", ["1,MEG,Ana,2024-01-01 10:00,7", "2,MEG,Ana,2024-01-01 11:00,7.1"])
+    assert main([csv, "--salida", str(salida), "--procesos", "1"]) == 0
+    generados = {r: os.path.getmtime(salida / r) for r in _pdfs(salida)}
+    assert len(generados) == 2
+
+    _csv(tmp_path / "lotes.csv", ["1,MEG,Ana,2024-01-01 10:00,7", "2,MEG,Ana,2024-01-01 11:00,7.1", "3,MEG,Ana,,7.2"])
+    assert main([csv, "--salida", str(salida), "--procesos", "1"]) == 0
+    assert "generados: 1 | salteados: 2 | fallidos: 0" in capsys.readouterr().out
+    assert all(os.path.getmtime(salida / r) == t for r, t in generados.items())
+
+
+def test_una_tarea_fallida_no_deja_temporales(tmp_path, monkeypatch):
+    csv = _csv(tmp_path / "lotes.csv", ["1,MEG,Ana,no es fecha,7", "2,MEG,Ana,,7"])
+    tareas = list(leer_tareas(csv, str(tmp_path / "informes")))
+    estado, ruta, error = renderizar(tareas[0])
+    assert estado == "fallido" and "no es fecha" in error and not os.path.exists(ruta)
+
+    def reemplazar(*args):  # el disco falla después de escribir el temporal
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(os, "replace", reemplazar)
+    estado, ruta, error = renderizar(tareas[1])
+    monkeypatch.undo()
+    assert estado == "fallido" and error == "disco lleno"
+    assert _pdfs(tmp_path / "informes") == []
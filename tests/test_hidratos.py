@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from lts_core.hidratos import METODOS, caudal_inyeccion, concentracion_requerida, depresion, grilla
+
+
+@pytest.mark.parametrize("metodo, w, esperado", [
+    # Hammerschmidt: 1297 w / (62.07 (100 - w))
+    ("Hammerschmidt", 30, 8.955),
+    ("Hammerschmidt", 50, 20.896),
+    # Nielsen-Bucklin: -72 ln(x agua)
+    ("Nielsen-Bucklin", 30, 8.441),
+    ("Nielsen-Bucklin", 50, 18.347),
+])
+def test_depresion_de_referencia(metodo, w, esperado):
+    assert depresion(w, metodo) == pytest.approx(esperado, abs=1e-3)
+
+
+@pytest.mark.parametrize("metodo", METODOS)
+def test_concentracion_requerida_es_la_inversa(metodo):
+    w = np.linspace(0, 80, 81)
+    assert concentracion_requerida(depresion(w, metodo), metodo) == pytest.approx(w, abs=1e-9)
+    assert concentracion_requerida(-5.0, metodo) == 0.0  # sin depresión necesaria no hace falta MEG
+
+
+def test_sin_concentracion_suficiente_el_caudal_es_nan():
+    caudal = caudal_inyeccion(1000.0, np.array([40.0, 80.0, 90.0]), 80.0)
+    assert caudal[0] == pytest.approx(1000 * 40 / 40) and np.isnan(caudal[1:]).all()
+
+    resultado = grilla([40, 200], [-30, 40], 0.65, concentracion=60.0, agua_kg_h=100.0)  # pide ~72 %wt a -30 °C
+    assert np.isnan(resultado.caudal[1, 0]) and resultado.caudal[0, 1] == 0.0
+
+
+def test_metodo_desconocido():
+    with pytest.raises(ValueError, match="Método desconocido"):
+        depresion(30, "Baker")
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from lts_core.informe_turno import escribir_informe_turno
+
+
+def test_escribe_el_informe(almacen, tmp_path):
+    almacen.escribir([("2024-01-01 10:00:00", "MEG", "pH", 7.1, 1, "Ana", "", "", None)])
+    ruta = tmp_path / "turno" / "informe.pdf"
+    assert escribir_informe_turno(almacen, str(ruta)) == 1
+    assert ruta.read_bytes().startswith(b"%PDF") and os.listdir(ruta.parent) == ["informe.pdf"]
+
+
+def test_cuenta_todas_las_paginas_de_cada_modulo(almacen, tmp_path, monkeypatch):
+    almacen.escribir(
+        [(f"2024-01-01 10:{i:02d}:00", "MEG", "pH", 7.0, 1, "", "", "", None) for i in range(5)]
+        + [("2024-01-01 09:00:00", "TEG", "pH", 7.5, 1, "", "", "", None),
+           ("2024-01-02 09:00:00", "TEG", "pH", 7.5, 1, "", "", "", None)]
+    )
+    pedidas = []
+    paginas = almacen.paginas
+
+    def de_a_dos(modulo, **kwargs):
+        pedidas.append(modulo)
+        return paginas(modulo, tamano=2, **kwargs)
+
+    monkeypatch.setattr(almacen, "paginas", de_a_dos)
+    assert escribir_informe_turno(almacen, str(tmp_path / "informe.pdf"), hasta="2024-01-01 23:59") == 6
+    assert pedidas == ["MEG", "TEG"]
+
+
+def test_un_error_a_mitad_no_deja_el_temporal(almacen, tmp_path, monkeypatch):
+    almacen.escribir([("2024-01-01 10:00:00", "MEG", "pH", 7.1, 1, "Ana", "", "", None)])
+
+    def paginas(*args, **kwargs):
+        yield from ()
+        raise OSError("base no disponible")
+
+    monkeypatch.setattr(almacen, "paginas", paginas)
+    ruta = tmp_path / "turno" / "informe.pdf"
+    with pytest.raises(OSError, match="base no disponible"):
+        escribir_informe_turno(almacen, str(ruta))
+    assert os.listdir(ruta.parent) == []
@@ -0,0 +1,67 @@
+import json
+import time
+from collections import deque
+
+import pytest
+
+from lts_core import perfilado
+from lts_core.perfilado import RESTO, escribir, etapa, iniciar_corrida, terminar_corrida
+
+
+@pytest.fixture
+def encendido(monkeypatch, tmp_path):
+    monkeypatch.setattr(perfilado, "_activo", True)
+    monkeypatch.setattr(perfilado, "_historial", deque(maxlen=perfilado.MAX_HISTORIAL))
+    monkeypatch.setattr(perfilado, "ARCHIVO", str(tmp_path / "perfilado.jsonl"))
+    terminar_corrida()  # ninguna corrida de otra prueba queda abierta en este hilo
+    return tmp_path / "perfilado.jsonl"
+
+
+def test_las_etapas_anidadas_suman_a_su_padre(encendido):
+    iniciar_corrida("app", "s1")
+    with etapa("tab:MEG"):
+        with etapa("exportar_pdf"):
+            time.sleep(0.02)
+        with etapa("exportar_pdf"):  # repetida: se suma
+            time.sleep(0.01)
+    registro = terminar_corrida()
+
+    etapas = registro["etapas"]
+    assert set(etapas) == {"tab:MEG", "tab:MEG/exportar_pdf", RESTO}
+    assert etapas["tab:MEG/exportar_pdf"] >= 0.03 and etapas["tab:MEG"] >= etapas["tab:MEG/exportar_pdf"]
+    assert registro["total"] == pytest.approx(etapas["tab:MEG"] + etapas[RESTO])  # las anidadas no se cuentan dos veces
+    assert perfilado.historial("app", "s1") == [registro]
+    assert json.loads(encendido.read_text(encoding="utf-8")) == registro
+
+
+def test_fuera_de_una_corrida_queda_como_fondo(encendido):
+    with etapa("cola"):
+        with etapa("render"):
+            pass
+        assert perfilado.historial("fondo") == []  # se guarda al cerrar la etapa de afuera
+    [registro] = perfilado.historial("fondo")
+    assert set(registro["etapas"]) == {"cola", "cola/render"}  # sin "(resto)"
+    assert terminar_corrida() is None
+
+
+def test_apagado_no_mide_nada(monkeypatch):
+    monkeypatch.setattr(perfilado, "_activo", False)
+    iniciar_corrida("app")
+    assert etapa("x") is etapa("y") and terminar_corrida() is None
+
+
+def test_el_archivo_rota_por_tamano(tmp_path):
+    ruta = tmp_path / "metricas" / "perfilado.jsonl"
+    registros = [{"fecha": i, "app": "app", "sesion": None, "total": 0.1, "etapas": {}} for i in range(6)]
+    largo = len(perfilado.formatear(registros[0], "jsonl"))
+    for registro in registros:
+        escribir(registro, str(ruta), "jsonl", max_bytes=2 * largo, copias=2)  # dos registros por archivo
+
+    assert sorted(p.name for p in ruta.parent.iterdir()) == ["perfilado.jsonl", "perfilado.jsonl.1", "perfilado.jsonl.2"]
+    fechas = [[json.loads(linea)["fecha"] for linea in p.read_text().splitlines()]
+              for p in (ruta.parent / "perfilado.jsonl.2", ruta.parent / "perfilado.jsonl.1", ruta)]
+    assert fechas == [[0, 1], [2, 3], [4, 5]]
+
+    escribir(registros[0], str(ruta), "prometheus", max_bytes=2 * largo, copias=2)  # la más vieja se descarta
+    assert len(list(ruta.parent.iterdir())) == 3
+    assert ruta.read_text().startswith('lts_corrida_segundos{app="app"} 0.100000 0')
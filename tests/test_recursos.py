@@ -0,0 +1,44 @@
+import re
+import zlib
+
+from fpdf import FPDF
+
+from lts_core import recursos
+from lts_core.informes_pdf import PDF, construir_pdf
+from lts_core.recursos import LOGO_PATH
+
+
+def _paginas(pdf):
+    # Contenido de las páginas (fpdf las comprime con zlib); la imagen es su propio stream
+    streams = re.findall(rb"stream\r?\n(.*?)\r?\nendstream", pdf, re.S)
+    return b"".join(zlib.decompress(s) for s in streams if b"/I1 Do" in zlib.decompress(s))
+
+
+def test_el_logo_va_en_cada_pdf_y_se_decodifica_una_vez(monkeypatch):
+    monkeypatch.setattr(recursos, "_archivos", {})
+    leidas = []
+    original = FPDF._parsepng
+
+    def contar(self, ruta):
+        leidas.append(ruta)
+        return original(self, ruta)
+
+    monkeypatch.setattr(FPDF, "_parsepng", contar)
+    informes = [construir_pdf("Ana", "Control", {"pH": 7.1}, "") for _ in range(2)]
+    info = original(FPDF(), LOGO_PATH)
+
+    assert leidas == [LOGO_PATH]  # la segunda usa lo ya decodificado
+    for informe in informes:
+        # El mismo objeto de imagen que arma pdf.image(): dimensiones, color y datos del PNG
+        assert b"/Subtype /Image" in informe and f"/Width {info['w']}".encode() in informe
+        assert f"/Height {info['h']}".encode() in informe and info["data"] in informe
+        assert b"/I1 Do" in _paginas(informe)
+
+
+def test_en_un_documento_de_varias_paginas_se_incrusta_una_vez():
+    pdf = PDF()
+    for _ in range(3):
+        pdf.add_page()  # el encabezado pone el logo en cada página
+    salida = pdf.output(dest="S").encode("latin-1")
+    imagenes = 2 if "smask" in FPDF()._parsepng(LOGO_PATH) else 1  # con transparencia, la máscara es otra imagen
+    assert salida.count(b"/Subtype /Image") == imagenes and _paginas(salida).count(b"/I1 Do") == 3
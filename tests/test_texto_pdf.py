@@ -0,0 +1,24 @@
+import pytest
+
+from lts_core.texto_pdf import limpiar
+
+RELLENO = "Observación del turno. " * 40  # más largo que _CORTOS: pasa por los reemplazos previos
+
+
+@pytest.mark.parametrize("relleno", ["", RELLENO], ids=["corto", "largo"])
+@pytest.mark.parametrize("texto, esperado", [
+    ("25 °C, señal ñ, 2 mg/m³, ½ y ü", "25 °C, señal ñ, 2 mg/m³, ½ y ü"),  # latin-1 se conserva
+    ("pH ✅ / Cloruros ❌ ✔️", "pH OK / Cloruros NO OK"),
+    ("H₂S ≤ 2,1 y CO₂ ≥ 0 ≠ 1", "H2S <= 2,1 y CO2 >= 0 != 1"),
+    ("₀₁₂₃₄₅₆₇₈₉ ⁰⁴⁵", "0123456789 045"),
+    ("“espuma” — leve → revisar…", '"espuma" - leve -> revisar...'),
+    ("Őrs ŝ", "Ors s"),  # fuera de la tabla: descomposición Unicode
+    ("⚠️ 🔥 alarma", "!  alarma"),  # sin equivalente: se quita
+])
+def test_limpiar_latin1(relleno, texto, esperado):
+    assert limpiar(relleno + texto) == relleno + esperado
+
+
+def test_limpiar_unicode_solo_quita_lo_que_la_fuente_no_trae():
+    assert limpiar("H₂S ≤ 2 °C ✅ 🔥", unicode=True) == "H₂S ≤ 2 °C OK "
+    assert limpiar(12.5) == "12.5"
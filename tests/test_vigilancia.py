@@ -0,0 +1,114 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from lts_core.vigilancia import CHECKPOINT, Vigilante, procesar_archivo
+
+
+def _vigilante(tmp_path):
+    entrada = tmp_path / "entrada"
+    entrada.mkdir(exist_ok=True)
+    return Vigilante(str(entrada), str(tmp_path / "resultados.db"), str(tmp_path / "archivo_gas"),
+                     trabajadores=1, estable=0)
+
+
+def _filas(tmp_path):
+    from lts_core.almacen import obtener_almacen
+    return obtener_almacen(str(tmp_path / "resultados.db")).filas_desde(0, 10_000)
+
+
+def test_retoma_desde_el_checkpoint_y_lee_solo_lo_nuevo(tmp_path):
+    vigilante = _vigilante(tmp_path)
+    archivo = tmp_path / "entrada" / "lims.csv"
+    archivo.write_text("modulo,parametro,valor,fecha\nMEG,pH,7.0,2024-01-01 10:00\nMEG,pH,7.1,2024-01-01 11:00\n",
+                       encoding="utf-8")
+    [resumen] = vigilante.procesar_pendientes()
+    assert resumen["registros"] == 2 and resumen["desde"] == 0
+    assert json.loads((tmp_path / "entrada" / CHECKPOINT).read_text())["lims.csv"]["offset"] == archivo.stat().st_size
+
+    with open(archivo, "a", encoding="utf-8") as f:
+        f.write("MEG,pH,7.2,2024-01-01 12:00\nMEG,pH,7.3,2024-01-01 1")  # la última línea está a medio escribir
+    reiniciado = _vigilante(tmp_path)  # un reinicio no repite lo ya guardado
+    [resumen] = reiniciado.procesar_pendientes()
+    assert resumen["registros"] == 1
+    assert [fila[4] for fila in _filas(tmp_path)] == [7.0, 7.1, 7.2]
+
+    with open(archivo, "a", encoding="utf-8") as f:
+        f.write("3:00\n")
+    [resumen] = _vigilante(tmp_path).procesar_pendientes()
+    assert resumen["registros"] == 1 and _filas(tmp_path)[-1][1:] == ("2024-01-01 13:00:00", "MEG", "pH", 7.3)
+    assert _vigilante(tmp_path).procesar_pendientes() == []
+
+
+def test_una_fecha_ilegible_se_rechaza(tmp_path):
+    archivo = tmp_path / "lims.csv"
+    archivo.write_text("modulo,parametro,valor,fecha\nMEG,pH,7.0,2024-01-01 10:00\nMEG,pH,7.0,ayer a la tarde\n"
+                       "MEG,pH,7.0,\nMEG,pH,abc,2024-01-01 10:00\n", encoding="utf-8")
+    resumen = procesar_archivo(str(archivo), 0, archivo.stat().st_size, str(tmp_path / "resultados.db"))
+    assert resumen["registros"] == 2 and resumen["rechazados"] == 2
+    assert resumen["motivos"] == {"fecha ilegible": 1, "valor no numérico": 1}
+    assert _filas(tmp_path)[0][1] == "2024-01-01 10:00:00"  # la fila sin fecha cuenta como recibida ahora
+
+
+def test_el_co2_lleva_la_fecha_de_la_muestra(tmp_path):
+    archivo = tmp_path / "cromatografo.csv"
+    archivo.write_text("muestra,componente,fraccion\n2024-03-05 08:30:00,CH4,0.98\n2024-03-05 08:30:00,CO2,0.02\n"
+                       "2024-03-06 09:00:00,CH4,0.99\n2024-03-06 09:00:00,CO2,0.01\n", encoding="utf-8")
+    procesar_archivo(str(archivo), 0, archivo.stat().st_size, str(tmp_path / "resultados.db"), str(tmp_path / "archivo_gas"))
+    assert [(fila[1], fila[3]) for fila in _filas(tmp_path)] == [("2024-03-05 08:30:00", "CO₂"), ("2024-03-06 09:00:00", "CO₂")]
+    assert sorted(os.listdir(tmp_path / "archivo_gas")) == ["dia=2024-03-05", "dia=2024-03-06"]
+
+
+def test_sin_fecha_en_la_muestra_usa_la_del_archivo(tmp_path):
+    archivo = tmp_path / "cromatografo.csv"
+    archivo.write_text("muestra,componente,fraccion\nM1,CH4,0.98\nM1,CO2,0.02\n", encoding="utf-8")
+    os.utime(archivo, (pd.Timestamp("2024-02-01 07:00").timestamp(),) * 2)
+    procesar_archivo(str(archivo), 0, archivo.stat().st_size, str(tmp_path / "resultados.db"), str(tmp_path / "archivo_gas"))
+    assert _filas(tmp_path)[0][1] == "2024-02-01 07:00:00"
+
+
+def _archivadas(tmp_path):
+    from lts_core.archivo_gas import ArchivoGas
+    return ArchivoGas(str(tmp_path / "archivo_gas")).leer(columnas=["muestra", "Methane", "CO2", "hhv"])
+
+
+def test_una_muestra_cortada_entre_lecturas_se_archiva_entera(tmp_path):
+    from lts_core.cromatografia import calcular_lote
+    vigilante = _vigilante(tmp_path)
+    archivo = tmp_path / "entrada" / "cromatografo.csv"
+    archivo.write_text("muestra,componente,fraccion\n"
+                       "2024-03-05 08:00:00,CH4,0.97\n2024-03-05 08:00:00,CO2,0.03\n"
+                       "2024-03-05 09:00:00,CH4,0.90\n", encoding="utf-8")  # la segunda muestra recién empieza
+    [resumen] = vigilante.procesar_pendientes()
+    assert resumen["registros"] == 1 and list(_archivadas(tmp_path)["muestra"]) == ["2024-03-05 08:00:00"]
+
+    with open(archivo, "a", encoding="utf-8") as f:
+        f.write("2024-03-05 09:00:00,C2,0.06\n2024-03-05 09:00:00,CO2,0.04\n2024-03-05 10:00:00,CH4,0.99\n")
+    [resumen] = _vigilante(tmp_path).procesar_pendientes()
+    archivadas = _archivadas(tmp_path)
+    assert resumen["registros"] == 1 and list(archivadas["muestra"]) == ["2024-03-05 08:00:00", "2024-03-05 09:00:00"]
+    completa = calcular_lote(pd.DataFrame({"muestra": ["M"] * 3, "componente": ["CH4", "C2", "CO2"],
+                                           "fraccion": [0.90, 0.06, 0.04]}))
+    assert archivadas["hhv"].iloc[1] == pytest.approx(completa["HHV (MJ/m³)"].iloc[0])
+    assert [fila[4] for fila in _filas(tmp_path)] == pytest.approx([3.0, 4.0])  # CO₂ en %
+
+    cerrado = _vigilante(tmp_path)
+    cerrado.cierre = 0  # el archivo dejó de crecer: la última muestra está completa
+    [resumen] = cerrado.procesar_pendientes()
+    assert resumen["registros"] == 1 and len(_archivadas(tmp_path)) == 3
+
+
+def test_un_cromatograma_de_una_muestra_espera_a_cerrarse(tmp_path):
+    archivo = tmp_path / "entrada" / "muestra.csv"
+    _vigilante(tmp_path)
+    archivo.write_text("componente,fraccion\nCH4,0.95\n", encoding="utf-8")
+    assert _vigilante(tmp_path).procesar_pendientes() == []
+    with open(archivo, "a", encoding="utf-8") as f:
+        f.write("CO2,0.05\n")
+    cerrado = _vigilante(tmp_path)
+    cerrado.cierre = 0
+    [resumen] = cerrado.procesar_pendientes()
+    assert resumen["registros"] == 1
+    assert _archivadas(tmp_path)["CO2"].tolist() == [0.05]